@@ -5,3 +5,6 @@ class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
 
+    def ready(self):
+        # Registers the signal handlers that keep the cached JWT user and the revocation filter fresh
+        from . import authentication, revocation  # noqa: F401
@@ -0,0 +1,69 @@
+"""
+JWT authentication with a cached user lookup.
+
+simplejwt's JWTAuthentication loads the User row on every authenticated
+request. The token itself is still fully verified here (signature, expiry,
+token type), but the user it points at is served from the cache for
+AUTH_USER_CACHE_TTL seconds. Any save or delete of a User drops its entry (see
+the signal handlers below), so profile edits, password changes and
+deactivation take effect on the next request in this process - and across
+processes too when CACHES points at a shared backend such as Redis. With the
+default in-process cache, other workers may serve a stale user for at most one
+TTL.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .models import User
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def _cache():
+    return caches[settings.AUTH_USER_CACHE_ALIAS]
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """Drop-in replacement for JWTAuthentication that skips the per-request user query."""
+
+    def get_user(self, validated_token):
+        ttl = settings.AUTH_USER_CACHE_TTL
+        if ttl <= 0:
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        key = user_cache_key(user_id)
+        user = _cache().get(key)
+        if user is None:
+            # Cache miss: the parent does the lookup and all of its checks
+            user = super().get_user(validated_token)
+            _cache().set(key, user, ttl)
+            return user
+
+        # Cache hit: repeat the parent's per-user checks against the cached copy
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Any change to a user (profile, password, is_active, last_login) drops the cached copy."""
+    _cache().delete(user_cache_key(instance.pk))
@@ -0,0 +1,30 @@
+from django.contrib.auth.backends import ModelBackend
+
+from .models import User
+
+
+class EmailBackend(ModelBackend):
+    """
+    Authenticates with email + password in a single indexed lookup.
+
+    Unlike ModelBackend it returns inactive users too, so LoginSerializer can
+    tell them their account is disabled instead of "invalid password".
+    Username logins (e.g. the admin) still go through ModelBackend.
+    """
+
+    def authenticate(self, request, email=None, password=None, **kwargs):
+        if email is None or password is None:
+            return None
+
+        users = list(User.objects.filter(email=email)[:2])
+        if len(users) != 1:
+            # Run the hasher once anyway so unknown emails take as long as wrong passwords
+            User().set_password(password)
+            return None
+
+        # check_password re-hashes and saves the password when the configured
+        # hasher or iteration count has changed - that's the transparent upgrade
+        user = users[0]
+        if user.check_password(password):
+            return user
+        return None
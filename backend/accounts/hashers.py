@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 with the iteration count taken from PASSWORD_HASH_ITERATIONS.
+
+    It keeps the 'pbkdf2_sha256' algorithm name, so existing hashes are still
+    recognised. Any stored hash with a different iteration count is reported
+    by must_update(), and Django re-hashes it on the user's next successful login.
+    """
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_HASH_ITERATIONS
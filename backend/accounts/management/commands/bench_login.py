@@ -0,0 +1,67 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.test import Client
+from django.test.utils import override_settings
+
+from accounts.models import User
+
+BENCH_PREFIX = 'bench-login-'
+
+
+class Command(BaseCommand):
+    """
+    Login throughput benchmark - simulates a shift-start rush.
+    Creates throwaway users, fires POST /api/auth/login/ at them from a thread
+    pool, prints latency percentiles and logins/second, then removes the users.
+    Point it at a scratch database; try different PASSWORD_HASH_ITERATIONS values
+    to see the hashing cost.
+    """
+    help = 'Measure /api/auth/login/ throughput and latency.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50, help='Distinct accounts to log in as.')
+        parser.add_argument('--logins', type=int, default=200, help='Total login requests.')
+        parser.add_argument('--concurrency', type=int, default=8, help='Parallel clients.')
+        parser.add_argument('--password', default='Bench-pass-123', help='Password for the bench accounts.')
+
+    def handle(self, *args, **options):
+        password = options['password']
+        self.stdout.write(f'Creating {options["users"]} bench users ({settings.PASSWORD_HASH_ITERATIONS} PBKDF2 iterations)...')
+        template = User(username='template')
+        template.set_password(password)
+        User.objects.bulk_create([
+            User(username=f'{BENCH_PREFIX}{i}', email=f'{BENCH_PREFIX}{i}@example.com', password=template.password)
+            for i in range(options['users'])
+        ])
+
+        def login(i):
+            client = Client()
+            email = f'{BENCH_PREFIX}{i % options["users"]}@example.com'
+            started = time.perf_counter()
+            response = client.post('/api/auth/login/', {'email': email, 'password': password}, content_type='application/json')
+            elapsed = time.perf_counter() - started
+            close_old_connections()
+            return elapsed, response.status_code
+
+        try:
+            # The test client talks to 'testserver'
+            with override_settings(ALLOWED_HOSTS=['*']):
+                started = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+                    results = list(pool.map(login, range(options['logins'])))
+                wall = time.perf_counter() - started
+        finally:
+            User.objects.filter(username__startswith=BENCH_PREFIX).delete()
+
+        latencies = sorted(elapsed * 1000 for elapsed, _ in results)
+        failures = sum(1 for _, status in results if status != 200)
+        quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        self.stdout.write(
+            f'{len(results)} logins in {wall:.2f}s -> {len(results) / wall:.1f} logins/s '
+            f'(p50 {quantiles[49]:.1f} ms, p95 {quantiles[94]:.1f} ms, p99 {quantiles[98]:.1f} ms, {failures} failed)'
+        )
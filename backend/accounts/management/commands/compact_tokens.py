@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+from accounts.revocation import rebuild_everywhere
+
+
+class Command(BaseCommand):
+    """
+    Scheduled token compaction.
+    Every refresh rotation leaves an OutstandingToken + BlacklistedToken pair
+    behind. Once a token has expired it can never be used again, so both rows
+    can go. Deleting in small batches keeps each transaction (and its locks) short.
+    Run it daily from cron.
+    """
+    help = 'Delete expired outstanding and blacklisted JWT refresh tokens in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows deleted per statement.')
+        parser.add_argument('--pause', type=float, default=0.0, help='Seconds to sleep between batches.')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now()
+        batch_size = options['batch_size']
+        total = 0
+        while True:
+            ids = list(
+                OutstandingToken.objects.filter(expires_at__lte=cutoff)
+                .order_by('id').values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            # BlacklistedToken rows go with their OutstandingToken (on_delete=CASCADE)
+            OutstandingToken.objects.filter(id__in=ids).delete()
+            total += len(ids)
+            if options['pause']:
+                time.sleep(options['pause'])
+
+        # Expired jtis no longer belong in any worker's bloom filter (this command runs in its own process)
+        rebuild_everywhere()
+        self.stdout.write(self.style.SUCCESS(f'Removed {total} expired token(s).'))
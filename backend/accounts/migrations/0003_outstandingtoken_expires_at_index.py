@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    compact_tokens scans OutstandingToken by expires_at, which simplejwt leaves
+    unindexed. The table belongs to a third-party app, so the index is added
+    with plain SQL from here.
+    """
+
+    dependencies = [
+        ('accounts', '0002_user_avatar'),
+        ('token_blacklist', '0012_alter_outstandingtoken_user'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS token_blacklist_outstandingtoken_expires_at_idx '
+            'ON token_blacklist_outstandingtoken (expires_at);',
+            'DROP INDEX IF EXISTS token_blacklist_outstandingtoken_expires_at_idx;',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_outstandingtoken_expires_at_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='email',
+            field=models.EmailField(blank=True, db_index=True, max_length=254, verbose_name='email address'),
+        ),
+    ]
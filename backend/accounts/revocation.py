@@ -0,0 +1,231 @@
+"""
+Fast refresh-token revocation checks.
+
+simplejwt asks the database "is this jti blacklisted?" on every refresh and
+logout, against a BlacklistedToken table that only ever grows. With a shared
+cache (REDIS_URL) the answer usually comes from memory instead:
+
+  1. A revoked jti is in the shared cache as soon as it's blacklisted here.
+  2. Otherwise an in-process bloom filter of every live blacklisted jti is
+     asked. "Definitely not revoked" - the overwhelmingly common answer -
+     needs no query at all.
+  3. Only a bloom hit (a real revocation or a rare false positive) falls
+     through to the database, and the answer is cached.
+
+The filter is never trusted when it may be behind the database. Every
+committed BlacklistedToken write - from any worker, the admin or simplejwt's
+own views - stores a new blacklist version in the shared cache, and a worker
+whose filter was synced at an older version pulls the new rows before it
+answers. `manage.py compact_tokens` bumps a shared epoch so every worker
+rebuilds its filter without the expired tokens.
+
+With a process-local cache (the LocMem default) none of that can be shared,
+so every check goes to the database (an indexed lookup by jti).
+"""
+import hashlib
+import math
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+VERSION_KEY = 'auth:blacklist:version'  # Changes after every committed blacklist write
+EPOCH_KEY = 'auth:blacklist:epoch'  # Changes when every filter should be rebuilt
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+# Blacklist rows can commit out of id order; rows younger than this are re-read on every sync
+COMMIT_GRACE_SECONDS = 60
+
+
+def revoked_cache_key(jti):
+    return f'auth:revoked:{jti}'
+
+
+def cache_is_shared():
+    """Whether every worker sees the same cache - the in-memory checks depend on it."""
+    return settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_CACHES
+
+
+def shared_marker(key):
+    """The current value of a version/epoch key, created if the cache lost it."""
+    cache.add(key, uuid.uuid4().hex, None)
+    return cache.get(key)
+
+
+def bump_marker(key):
+    cache.set(key, uuid.uuid4().hex, None)
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over strings, sized for `capacity` items at `error_rate`."""
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = max(capacity, 1)
+        self.size = max(8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # Double hashing: two 64-bit halves of one blake2b digest give every probe position
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationIndex:
+    """
+    Process-wide bloom filter of blacklisted jtis. It only answers for the
+    blacklist version it was last synced at; the caller brings the current one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bloom = None
+        self._stable_id = 0  # Every blacklist row up to this id is in the filter
+        self._recent = set()  # jtis of newer rows already added
+        self._version = None
+        self._epoch = None
+        self._built_at = 0.0
+
+    def _live_blacklist(self):
+        # Expired tokens fail signature/expiry checks anyway, so they don't need to be in the filter
+        return BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+
+    def _rebuild(self, now):
+        live = self._live_blacklist()
+        capacity = max(live.count() * 2, settings.TOKEN_BLOOM_MIN_CAPACITY)
+        self._bloom = BloomFilter(capacity)
+        self._stable_id, self._recent = 0, set()
+        self._add_rows(live.values_list('id', 'token__jti', 'blacklisted_at').order_by('id').iterator(chunk_size=10000))
+        self._built_at = now
+
+    def _sync(self, now):
+        self._add_rows(
+            BlacklistedToken.objects.filter(id__gt=self._stable_id)
+            .values_list('id', 'token__jti', 'blacklisted_at').order_by('id')
+        )
+        # A filter filled past its capacity loses accuracy - start over with a bigger one
+        if self._bloom.count > self._bloom.capacity:
+            self._rebuild(now)
+
+    def _add_rows(self, rows):
+        # The id watermark only moves past rows old enough that no lower id can still be uncommitted
+        settled = timezone.now() - timedelta(seconds=COMMIT_GRACE_SECONDS)
+        moving = True
+        for row_id, jti, blacklisted_at in rows:
+            if jti not in self._recent:
+                self._bloom.add(jti)
+            if moving and blacklisted_at <= settled:
+                self._stable_id = row_id
+            else:
+                moving = False
+                self._recent.add(jti)
+        if moving:
+            self._recent.clear()
+
+    def might_contain(self, jti, version, epoch):
+        now = time.monotonic()
+        with self._lock:
+            if (self._bloom is None or epoch != self._epoch
+                    or now - self._built_at > settings.TOKEN_BLOOM_REBUILD_SECONDS):
+                self._rebuild(now)
+            elif version != self._version:
+                self._sync(now)
+            self._version, self._epoch = version, epoch
+            return jti in self._bloom
+
+    def add(self, jti):
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(jti)
+
+    def reset(self):
+        with self._lock:
+            self._bloom = None
+
+
+revocation_index = RevocationIndex()
+
+
+def is_revoked(jti):
+    """True if the refresh token with this jti has been blacklisted."""
+    if cache_is_shared():
+        key = revoked_cache_key(jti)
+        cached = cache.get_many([key, VERSION_KEY, EPOCH_KEY])
+        if cached.get(key):
+            return True
+        # Read before the filter syncs: any write that bumped this version is already committed
+        version = cached.get(VERSION_KEY) or shared_marker(VERSION_KEY)
+        epoch = cached.get(EPOCH_KEY) or shared_marker(EPOCH_KEY)
+        if not revocation_index.might_contain(jti, version, epoch):
+            return False
+    revoked = BlacklistedToken.objects.filter(token__jti=jti).exists()
+    if revoked and cache_is_shared():
+        cache.set(revoked_cache_key(jti), True, settings.TOKEN_REVOKED_CACHE_TTL)
+    return revoked
+
+
+def mark_revoked(jti):
+    """Record a fresh revocation in the shared cache and the local filter."""
+    if cache_is_shared():
+        cache.set(revoked_cache_key(jti), True, settings.TOKEN_REVOKED_CACHE_TTL)
+    revocation_index.add(jti)
+
+
+def blacklist_written(sender, instance, created, **kwargs):
+    # After commit, so a worker that sees the new version can also see the row
+    if created and cache_is_shared():
+        transaction.on_commit(lambda: bump_marker(VERSION_KEY))
+
+
+def rebuild_everywhere():
+    """Make every worker rebuild its filter on its next check (e.g. after expired rows were deleted)."""
+    if cache_is_shared():
+        bump_marker(EPOCH_KEY)
+    revocation_index.reset()
+
+
+post_save.connect(blacklist_written, sender=BlacklistedToken, dispatch_uid='accounts.revocation.blacklist_written')
+
+
+class FastRefreshToken(RefreshToken):
+    """RefreshToken whose blacklist check goes through the revocation index."""
+
+    def check_blacklist(self):
+        if is_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        result = super().blacklist()
+        mark_revoked(self.payload[api_settings.JTI_CLAIM])
+        return result
+
+
+class FastTokenRefreshSerializer(TokenRefreshSerializer):
+    """Used by /api/auth/token/refresh/ via SIMPLE_JWT['TOKEN_REFRESH_SERIALIZER']."""
+    token_class = FastRefreshToken
@@ -1,14 +1,17 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
+from images.fields import SrcsetField
 from .models import User
 
 
 class UserSerializer(serializers.ModelSerializer):
     """User serializer for profile data."""
+    avatar_srcset = SrcsetField(source='avatar_variants')
+
     class Meta:
         model = User
-        fields = ('id', 'username', 'email', 'first_name', 'last_name', 'company', 'phone', 'avatar', 'date_joined')
+        fields = ('id', 'username', 'email', 'first_name', 'last_name', 'company', 'phone', 'avatar', 'avatar_srcset', 'date_joined')
         read_only_fields = ('id', 'date_joined')
 
 
@@ -50,12 +53,8 @@ class LoginSerializer(serializers.Serializer):
         password = attrs.get('password')
 
         if email and password:
-            try:
-                user = User.objects.get(email=email)
-            except User.DoesNotExist:
-                raise serializers.ValidationError('Invalid email or password.')
-
-            user = authenticate(username=user.username, password=password)
+            # One indexed lookup by email (accounts.backends.EmailBackend) instead of two
+            user = authenticate(self.context.get('request'), email=email, password=password)
             if not user:
                 raise serializers.ValidationError('Invalid email or password.')
             if not user.is_active:
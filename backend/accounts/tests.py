@@ -0,0 +1,151 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from config.testing import make_user
+
+from . import revocation
+from .revocation import EPOCH_KEY, FastRefreshToken, RevocationIndex, is_revoked
+
+
+class CachedJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_user('cached')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+
+    def user_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/auth/profile/')
+        self.assertEqual(response.status_code, 200)
+        return [q['sql'] for q in queries if 'FROM "accounts_user"' in q['sql']]
+
+    def test_user_is_loaded_once(self):
+        self.assertEqual(len(self.user_queries()), 1)
+        self.assertEqual(self.user_queries(), [])
+
+    def test_saving_the_user_drops_the_cached_copy(self):
+        self.user_queries()
+        self.user.first_name = 'Renamed'
+        self.user.save()
+        self.assertEqual(len(self.user_queries()), 1)
+        self.assertEqual(self.client.get('/api/auth/profile/').data['first_name'], 'Renamed')
+
+    def test_deactivated_user_is_refused(self):
+        self.user_queries()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, 401)
+
+
+class RevocationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        revocation.revocation_index.reset()
+        self.user = make_user('revoked')
+
+    def issue(self):
+        token = FastRefreshToken.for_user(self.user)
+        return token, token.payload['jti']
+
+    def blacklist_elsewhere(self, jti, **fields):
+        # What another worker (or the admin) does: just the row, nothing in this process
+        with self.captureOnCommitCallbacks(execute=True):
+            return BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=jti), **fields)
+
+    def test_rotated_refresh_token_cannot_be_replayed(self):
+        refresh, _ = self.issue()
+        response = self.client.post('/api/auth/token/refresh/', {'refresh': str(refresh)})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post('/api/auth/token/refresh/', {'refresh': str(refresh)})
+        self.assertEqual(response.status_code, 401)
+
+    def test_process_local_cache_asks_the_database(self):
+        _, jti = self.issue()
+        self.assertFalse(is_revoked(jti))
+        self.blacklist_elsewhere(jti)
+        self.assertTrue(is_revoked(jti))
+
+
+class SharedCacheRevocationTests(RevocationTests):
+    """Two workers sharing one cache (as with REDIS_URL); each has its own filter."""
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch('accounts.revocation.cache_is_shared', return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.other_worker = RevocationIndex()
+
+    def check_in_other_worker(self, jti):
+        with mock.patch.object(revocation, 'revocation_index', self.other_worker):
+            return is_revoked(jti)
+
+    def test_not_revoked_needs_no_query(self):
+        _, jti = self.issue()
+        self.assertFalse(self.check_in_other_worker(jti))
+        with self.assertNumQueries(0):
+            self.assertFalse(self.check_in_other_worker(jti))
+
+    def test_blacklist_write_reaches_every_worker(self):
+        _, jti = self.issue()
+        self.assertFalse(self.check_in_other_worker(jti))
+        self.blacklist_elsewhere(jti)
+        self.assertTrue(self.check_in_other_worker(jti))
+
+    def test_rows_committing_out_of_id_order_are_not_missed(self):
+        _, late_jti = self.issue()
+        _, early_jti = self.issue()
+        self.assertFalse(self.check_in_other_worker(late_jti))
+        self.blacklist_elsewhere(early_jti, id=100)
+        self.assertTrue(self.check_in_other_worker(early_jti))
+        # A lower id committing after the filter already saw 100
+        self.blacklist_elsewhere(late_jti, id=50)
+        self.assertTrue(self.check_in_other_worker(late_jti))
+
+    def test_compaction_rebuilds_every_filter(self):
+        _, jti = self.issue()
+        self.blacklist_elsewhere(jti)
+        self.assertTrue(self.check_in_other_worker(jti))
+        epoch = cache.get(EPOCH_KEY)
+
+        OutstandingToken.objects.filter(jti=jti).update(expires_at=timezone.now() - timedelta(minutes=1))
+        call_command('compact_tokens', stdout=StringIO())
+        self.assertNotEqual(cache.get(EPOCH_KEY), epoch)
+
+        _, fresh_jti = self.issue()
+        self.assertFalse(self.check_in_other_worker(fresh_jti))
+        self.assertNotIn(jti, self.other_worker._bloom)
+
+
+class LoginTests(APITestCase):
+    def setUp(self):
+        self.user = make_user('login')
+
+    def login(self, email, password):
+        return self.client.post('/api/auth/login/', {'email': email, 'password': password})
+
+    def test_email_login(self):
+        response = self.login('login@example.com', 'pass-12345')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access', response.data['tokens'])
+        self.assertEqual(self.login('login@example.com', 'wrong-pass').status_code, 400)
+        self.assertEqual(self.login('nobody@example.com', 'pass-12345').status_code, 400)
+
+    def test_iteration_count_change_rehashes_on_login(self):
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$600000$'))
+        with override_settings(PASSWORD_HASH_ITERATIONS=1000):
+            self.assertEqual(self.login('login@example.com', 'pass-12345').status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$1000$'))
+        self.assertTrue(self.user.check_password('pass-12345'))
@@ -4,6 +4,7 @@ from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from .serializers import RegisterSerializer, LoginSerializer, UserSerializer
 from .models import User
+from .revocation import FastRefreshToken
 
 
 # This endpoint lets new users create an account
@@ -34,7 +35,7 @@ def register(request):
 @permission_classes([permissions.AllowAny])  # Anyone can try to login
 def login(request):
     """Login user and return JWT tokens."""
-    serializer = LoginSerializer(data=request.data)
+    serializer = LoginSerializer(data=request.data, context={'request': request})
     if serializer.is_valid():
         # The serializer already checked the password, so we can trust this user
         user = serializer.validated_data['user']
@@ -60,7 +61,8 @@ def logout(request):
     try:
         refresh_token = request.data.get('refresh')
         if refresh_token:
-            token = RefreshToken(refresh_token)
+            # FastRefreshToken checks revocation in memory instead of hitting the blacklist table
+            token = FastRefreshToken(refresh_token)
             token.blacklist()  # Mark this token as invalid - can't be used anymore
             return Response({'message': 'Successfully logged out.'}, status=status.HTTP_200_OK)
         return Response({'error': 'Refresh token required.'}, status=status.HTTP_400_BAD_REQUEST)
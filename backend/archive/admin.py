@@ -0,0 +1,25 @@
+from django.contrib import admin
+from .models import ArchivedOrder, ArchivedOrderItem
+
+
+class ArchivedOrderItemInline(admin.TabularInline):
+    model = ArchivedOrderItem
+    fields = ('product', 'warehouse', 'quantity', 'unit_price', 'subtotal')
+    readonly_fields = fields
+    can_delete = False
+    extra = 0
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(admin.ModelAdmin):
+    """Read-only - archived orders are history."""
+    list_display = ('order_number', 'customer', 'status', 'total_amount', 'created_at', 'archived_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('order_number', 'customer__name')
+    inlines = [ArchivedOrderItemInline]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,76 @@
+"""
+Moving old, finished orders out of the live tables.
+
+Delivered and cancelled orders older than the cutoff are copied into
+ArchivedOrder/ArchivedOrderItem (same ids) and deleted from Order/OrderItem,
+a batch at a time, each batch in its own transaction. Lists, searches, change
+feeds and order creation then only ever touch the recent working set, while
+reports add the archive back in (see archive/reads.py).
+
+An archived order is finished and never changes again, so moving it writes
+no sync tombstone: change-feed clients keep their copy. It drops out of
+/api/orders/ and is served read-only from /api/archive/orders/ instead;
+customer order totals count both tables.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from orders.models import Order, OrderItem
+from sync.signals import without_tombstones
+from .models import ArchivedOrder, ArchivedOrderItem
+
+FINISHED_STATUSES = ['delivered', 'cancelled']
+
+
+def archivable(cutoff):
+    return Order.objects.filter(status__in=FINISHED_STATUSES, created_at__lt=cutoff)
+
+
+def archive_batch(cutoff, batch_size):
+    """Archive up to batch_size orders. Returns (orders, items) moved - (0, 0) when nothing is left."""
+    with transaction.atomic():
+        # SKIP LOCKED so a second archiver (or a user updating an order) never blocks this one
+        orders = list(archivable(cutoff).select_for_update(skip_locked=True).order_by('id')[:batch_size])
+        if not orders:
+            return 0, 0
+        ids = [order.id for order in orders]
+        items = list(OrderItem.objects.filter(order_id__in=ids))
+
+        ArchivedOrder.objects.bulk_create([
+            ArchivedOrder(
+                id=order.id, order_number=order.order_number, tracking_number=order.tracking_number,
+                customer_id=order.customer_id, user_id=order.user_id, status=order.status,
+                total_amount=order.total_amount, created_at=order.created_at, updated_at=order.updated_at,
+            )
+            for order in orders
+        ])
+        ArchivedOrderItem.objects.bulk_create([
+            ArchivedOrderItem(
+                id=item.id, order_id=item.order_id, product_id=item.product_id, warehouse_id=item.warehouse_id,
+                quantity=item.quantity, unit_price=item.unit_price, subtotal=item.subtotal,
+            )
+            for item in items
+        ])
+        # Lines first, so deleting the orders has nothing left to cascade
+        with without_tombstones():
+            OrderItem.objects.filter(order_id__in=ids).delete()
+            Order.objects.filter(id__in=ids).delete()
+    return len(orders), len(items)
+
+
+def archive_orders(older_than_days, batch_size, max_batches=None, log=None):
+    """Archive every finished order older than older_than_days. Returns (orders, items) moved."""
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    total_orders = total_items = batches = 0
+    while max_batches is None or batches < max_batches:
+        orders, items = archive_batch(cutoff, batch_size)
+        if not orders:
+            break
+        total_orders += orders
+        total_items += items
+        batches += 1
+        if log:
+            log(f'  {total_orders} orders / {total_items} lines archived')
+    return total_orders, total_items
@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from archive.archiver import archivable, archive_orders
+
+
+class Command(BaseCommand):
+    """
+    Move delivered/cancelled orders older than ARCHIVE_AFTER_DAYS into the archive tables.
+    Works in batches of ARCHIVE_BATCH_SIZE, one transaction each, so it can be
+    stopped at any point and picks up where it left off. Scheduled daily through
+    the job worker; the first run on a big database is best done by hand.
+    """
+    help = 'Archive old finished orders out of the live order tables.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, default=settings.ARCHIVE_AFTER_DAYS,
+                            help='Age in days (by creation date) before a finished order is archived.')
+        parser.add_argument('--batch-size', type=int, default=settings.ARCHIVE_BATCH_SIZE,
+                            help='Orders moved per transaction.')
+        parser.add_argument('--max-batches', type=int, help='Stop after this many batches.')
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be archived.')
+
+    def handle(self, *args, **options):
+        # Recent windows (weekly charts, forecast history) only read the live tables
+        if options['older_than'] < settings.FORECAST_HISTORY_DAYS:
+            raise CommandError(
+                f'--older-than must be at least FORECAST_HISTORY_DAYS ({settings.FORECAST_HISTORY_DAYS}) '
+                'so forecasting still sees all the sales it uses.'
+            )
+
+        if options['dry_run']:
+            count = archivable(timezone.now() - timedelta(days=options['older_than'])).count()
+            self.stdout.write(f'{count} order(s) would be archived.')
+            return
+
+        orders, items = archive_orders(
+            options['older_than'], options['batch_size'], options['max_batches'], log=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS(f'Archived {orders} order(s) with {items} line(s).'))
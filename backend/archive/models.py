@@ -0,0 +1,47 @@
+from django.db import models
+from django.contrib.auth import get_user_model
+
+from orders.models import Order
+
+User = get_user_model()
+
+
+class ArchivedOrder(models.Model):
+    """
+    A finished order moved out of the live orders table by `manage.py archive_orders`.
+    Keeps the original id, so links from webhooks, logs and idempotency keys still line up.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    order_number = models.CharField(max_length=50, unique=True)
+    tracking_number = models.CharField(max_length=100, blank=True, null=True)
+    customer = models.ForeignKey('customers.Customer', on_delete=models.CASCADE, related_name='archived_orders')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_orders')
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    total_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # Reports read one user's history, usually over a date range
+            models.Index(fields=['user', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.order_number} (archived)"
+
+
+class ArchivedOrderItem(models.Model):
+    """A line of an archived order - same fields and id as the OrderItem it came from."""
+    id = models.BigIntegerField(primary_key=True)
+    order = models.ForeignKey(ArchivedOrder, on_delete=models.CASCADE, related_name='items')
+    product = models.ForeignKey('inventory.Product', on_delete=models.CASCADE, related_name='+')
+    warehouse = models.ForeignKey('warehouses.Warehouse', on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_order_items')
+    quantity = models.PositiveIntegerField()
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2)
+    subtotal = models.DecimalField(max_digits=10, decimal_places=2)
+
+    def __str__(self):
+        return f"{self.order.order_number} - {self.product_id} x{self.quantity}"
@@ -0,0 +1,43 @@
+"""
+Reading order history across the live and archive tables.
+
+The archive only holds finished orders older than ARCHIVE_AFTER_DAYS, so
+anything about a recent window (the weekly chart, recent orders, forecasting)
+reads the live tables alone. All-time and long-range figures run the same
+query against every source from history_sources() and merge the results;
+for users with nothing archived that's just the live tables, at the cost of
+one EXISTS query.
+"""
+from orders.models import Order, OrderItem
+from .models import ArchivedOrder, ArchivedOrderItem
+
+
+def history_sources(user=None):
+    """
+    [(order_model, item_model), ...] holding the user's orders (everyone's when
+    user is None) - the archive only when it has some.
+    """
+    sources = [(Order, OrderItem)]
+    archived = ArchivedOrder.objects.all() if user is None else ArchivedOrder.objects.filter(user=user)
+    if archived.exists():
+        sources.append((ArchivedOrder, ArchivedOrderItem))
+    return sources
+
+
+def sum_aggregates(results):
+    """Add up .aggregate() dicts from several sources (every value must be summable)."""
+    return {key: sum(result[key] for result in results) for key in results[0]}
+
+
+def sum_rows(rowsets, key, fields):
+    """Merge grouped .values() rows from several sources, adding up `fields` on rows with the same `key`."""
+    merged = {}
+    for rows in rowsets:
+        for row in rows:
+            existing = merged.get(row[key])
+            if existing is None:
+                merged[row[key]] = dict(row)
+            else:
+                for field in fields:
+                    existing[field] += row[field]
+    return list(merged.values())
@@ -0,0 +1,24 @@
+from rest_framework import serializers
+from .models import ArchivedOrder, ArchivedOrderItem
+
+
+class ArchivedOrderItemSerializer(serializers.ModelSerializer):
+    product_name = serializers.CharField(source='product.name', read_only=True)
+    product_sku = serializers.CharField(source='product.sku', read_only=True)
+
+    class Meta:
+        model = ArchivedOrderItem
+        fields = ('id', 'product', 'product_name', 'product_sku', 'warehouse', 'quantity', 'unit_price', 'subtotal')
+        read_only_fields = fields
+
+
+class ArchivedOrderSerializer(serializers.ModelSerializer):
+    """Same shape as an order from /api/orders/, minus the nested product details."""
+    items = ArchivedOrderItemSerializer(many=True, read_only=True)
+    customer_name = serializers.CharField(source='customer.name', read_only=True)
+
+    class Meta:
+        model = ArchivedOrder
+        fields = ('id', 'order_number', 'tracking_number', 'customer', 'customer_name', 'status', 'total_amount',
+                  'items', 'created_at', 'updated_at', 'archived_at')
+        read_only_fields = fields
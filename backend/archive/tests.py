@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from config.testing import FixtureTestCase, days_ago, make_order, make_user
+from orders.models import Order
+from sync.models import Tombstone
+from .archiver import archive_batch
+from .models import ArchivedOrder
+
+
+class ArchiveTests(FixtureTestCase):
+    username = 'archive'
+
+    def order(self, number, status, quantity, days_old, user=None):
+        return make_order(user or self.user, self.customer, [(self.product, quantity)], status=status,
+                          created_at=days_ago(days_old), order_number=number)
+
+    def archive(self):
+        return archive_batch(timezone.now() - timedelta(days=365), 100)
+
+    def test_moves_old_finished_orders_without_tombstones(self):
+        old = self.order('ORD-OLD', 'delivered', 4, days_old=400)
+        self.order('ORD-NEW', 'delivered', 1, days_old=5)
+        self.order('ORD-OPEN', 'pending', 1, days_old=400)
+
+        self.assertEqual(self.archive(), (1, 1))
+        self.assertEqual(list(ArchivedOrder.objects.values_list('id', flat=True)), [old.id])
+        self.assertEqual(set(Order.objects.values_list('order_number', flat=True)), {'ORD-NEW', 'ORD-OPEN'})
+        # Change-feed clients keep their copy of a finished order
+        self.assertFalse(Tombstone.objects.exists())
+
+    def test_customer_totals_count_archived_orders(self):
+        self.order('ORD-OLD', 'delivered', 4, days_old=400)
+        self.order('ORD-NEW', 'delivered', 1, days_old=5)
+        self.order('ORD-GONE', 'cancelled', 9, days_old=400)
+        before = self.client.get(f'/api/customers/{self.customer.id}/').data
+
+        self.archive()
+        listed = self.client.get('/api/customers/').data['results'][0]
+        detail = self.client.get(f'/api/customers/{self.customer.id}/').data
+
+        for data in (before, listed, detail):
+            self.assertEqual((data['total_orders'], data['total_spent']), (3, '50.00'))
+        # Recent orders stay live-only
+        self.assertEqual([order['order_number'] for order in detail['recent_orders']], ['ORD-NEW'])
+
+    def test_archived_orders_endpoint_is_read_only_and_per_user(self):
+        mine = self.order('ORD-MINE', 'delivered', 4, days_old=400)
+        other = make_user('other')
+        self.order('ORD-THEIRS', 'delivered', 4, days_old=400, user=other)
+        self.archive()
+
+        response = self.client.get('/api/archive/orders/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([order['order_number'] for order in response.data['results']], ['ORD-MINE'])
+        self.assertEqual(response.data['results'][0]['items'][0]['product_sku'], 'SKU-1')
+        self.assertEqual(response.data['results'][0]['customer_name'], 'Acme')
+
+        self.assertEqual(self.client.get(f'/api/archive/orders/{mine.id}/').status_code, 200)
+        self.assertEqual(self.client.delete(f'/api/archive/orders/{mine.id}/').status_code, 405)
+        self.assertEqual(self.client.get('/api/archive/orders/?search=THEIRS').data['count'], 0)
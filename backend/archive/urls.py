@@ -0,0 +1,10 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import ArchivedOrderViewSet
+
+router = DefaultRouter()
+router.register(r'orders', ArchivedOrderViewSet, basename='archived-order')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
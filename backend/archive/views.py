@@ -0,0 +1,28 @@
+from django.db.models import Prefetch, Q
+from rest_framework import viewsets
+from rest_framework.permissions import IsAuthenticated
+from .models import ArchivedOrder, ArchivedOrderItem
+from .serializers import ArchivedOrderSerializer
+
+
+# GET /archive/orders/ - the user's archived orders, newest first (?status=, ?search=, ?customer=)
+# GET /archive/orders/{id}/ - one archived order (same id it had as a live order)
+class ArchivedOrderViewSet(viewsets.ReadOnlyModelViewSet):
+    """Read-only access to orders moved out of /api/orders/ by `manage.py archive_orders`."""
+    serializer_class = ArchivedOrderSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = ArchivedOrder.objects.filter(user=self.request.user).select_related('customer').prefetch_related(
+            Prefetch('items', queryset=ArchivedOrderItem.objects.select_related('product'))
+        )
+        status = self.request.query_params.get('status')
+        if status:
+            queryset = queryset.filter(status=status)
+        customer = self.request.query_params.get('customer')
+        if customer and customer.isdigit():
+            queryset = queryset.filter(customer_id=customer)
+        search = self.request.query_params.get('search')
+        if search:
+            queryset = queryset.filter(Q(order_number__icontains=search) | Q(customer__name__icontains=search))
+        return queryset
@@ -0,0 +1,199 @@
+import json
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.db.models import F, Q, Sum
+from django.test import Client
+from django.test.utils import override_settings
+
+from accounts.models import User
+from bench.seed import BENCH_PASSWORD, PREFIX
+from customers.models import Customer
+from inventory.models import Product
+
+# (label, weight, method, path) - roughly what the dashboard and order screens do all day.
+# {page} and {order} are filled in per request.
+TRAFFIC_MIX = [
+    ('orders list', 20, 'GET', '/api/orders/?page={page}'),
+    ('products list', 15, 'GET', '/api/inventory/products/?page={page}'),
+    ('customers list', 8, 'GET', '/api/customers/?page={page}'),
+    ('warehouses list', 5, 'GET', '/api/warehouses/'),
+    ('notifications', 10, 'GET', '/api/notifications/'),
+    ('order detail', 7, 'GET', '/api/orders/{order}/'),
+    ('dashboard report', 10, 'GET', '/api/reports/dashboard/'),
+    ('revenue report', 4, 'GET', '/api/reports/revenue/?months=6'),
+    ('product report', 4, 'GET', '/api/reports/products/'),
+    ('category report', 3, 'GET', '/api/reports/category/'),
+    ('warehouse report', 3, 'GET', '/api/reports/warehouses/'),
+    ('create order', 11, 'POST', '/api/orders/'),
+]
+
+
+class Command(BaseCommand):
+    """
+    Load test with a realistic traffic mix.
+    Logs in as the seed_bench users, then hammers list, report and
+    order-creation endpoints from --concurrency threads for --duration seconds
+    (or --requests total) and prints p50/p95/p99 latency and throughput per
+    endpoint. Runs in-process by default; pass --base-url to load a real server
+    (e.g. gunicorn) running against the same database.
+    Run `manage.py seed_bench` first. Creates real orders - scratch databases only.
+    """
+    help = 'Replay a mix of list/report/order traffic and report latency percentiles.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', help='e.g. http://localhost:8000 - load a running server over HTTP.')
+        parser.add_argument('--concurrency', type=int, default=8, help='Parallel virtual users.')
+        parser.add_argument('--duration', type=float, default=30, help='Seconds to run.')
+        parser.add_argument('--requests', type=int, help='Stop after this many requests instead of --duration.')
+        parser.add_argument('--seed', type=int, default=1, help='Random seed for the request mix.')
+        parser.add_argument('--no-writes', action='store_true', help='Skip order creation.')
+        parser.add_argument('--json', dest='json_path', help='Also write the results to this JSON file.')
+
+    def handle(self, *args, **options):
+        users = list(User.objects.filter(username__startswith=f'{PREFIX}-').order_by('id').values_list('email', 'id'))
+        if not users:
+            raise CommandError('No bench users - run `manage.py seed_bench` first.')
+        # Customers with credit headroom, so order creation isn't refused for going over the limit
+        self.customer_ids = list(
+            Customer.objects.filter(email__startswith=f'{PREFIX}-')
+            .filter(Q(credit_limit=0) | Q(open_balance__lt=F('credit_limit') * Decimal('0.8')))
+            .values_list('id', flat=True)
+        )
+        # Products with plenty of stock so order creation mostly succeeds
+        self.product_ids = list(
+            Product.objects.filter(sku__startswith='BENCH-')
+            .annotate(stock=Sum('inventory_items__quantity'))
+            .filter(stock__gte=200)
+            .values_list('id', flat=True)
+        )
+        self.order_ids = {
+            user_id: list(User.objects.get(pk=user_id).orders.values_list('id', flat=True)[:200])
+            for _, user_id in users
+        }
+
+        mix = [entry for entry in TRAFFIC_MIX if not (options['no_writes'] and entry[2] == 'POST')]
+        base_url = options['base_url'].rstrip('/') if options['base_url'] else None
+        deadline = time.monotonic() + options['duration']
+        budget = {'left': options['requests']}
+        budget_lock = threading.Lock()
+        results = {label: [] for label, *_ in mix}
+        errors = {label: 0 for label, *_ in mix}
+        results_lock = threading.Lock()
+
+        def more():
+            if budget['left'] is None:
+                return time.monotonic() < deadline
+            with budget_lock:
+                budget['left'] -= 1
+                return budget['left'] >= 0
+
+        def virtual_user(worker):
+            rng = random.Random(options['seed'] * 1000 + worker)
+            email, user_id = users[worker % len(users)]
+            send = self.http_sender(base_url) if base_url else self.client_sender()
+            send.login(email)
+            labels, weights = zip(*[(entry, entry[1]) for entry in mix])
+            try:
+                while more():
+                    label, _, method, path = rng.choices(labels, weights=weights)[0]
+                    path = path.format(page=rng.randint(1, 5), order=rng.choice(self.order_ids[user_id] or [0]))
+                    body = self.order_body(rng) if method == 'POST' else None
+                    started = time.perf_counter()
+                    status = send(method, path, body)
+                    elapsed = (time.perf_counter() - started) * 1000
+                    with results_lock:
+                        results[label].append(elapsed)
+                        if status >= 400:
+                            errors[label] += 1
+            finally:
+                close_old_connections()
+
+        self.stdout.write(f'{options["concurrency"]} virtual users against {base_url or "in-process client"}...')
+        # The in-process client talks to 'testserver'
+        with override_settings(ALLOWED_HOSTS=['*']):
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+                for future in [pool.submit(virtual_user, worker) for worker in range(options['concurrency'])]:
+                    future.result()
+            wall = time.perf_counter() - started
+
+        report = self.summarize(results, errors, wall)
+        if options['json_path']:
+            with open(options['json_path'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f'Wrote {options["json_path"]}')
+
+    def order_body(self, rng):
+        products = rng.sample(self.product_ids, k=min(len(self.product_ids), rng.randint(1, 3)))
+        return {
+            'customer': rng.choice(self.customer_ids),
+            'items': [{'product_id': product_id, 'quantity': rng.randint(1, 3), 'unit_price': 0} for product_id in products],
+        }
+
+    def client_sender(self):
+        client = Client()
+        headers = {}
+
+        def send(method, path, body):
+            if method == 'POST':
+                response = client.post(path, body, content_type='application/json', **headers)
+            else:
+                response = client.get(path, **headers)
+            return response.status_code
+
+        def login(email):
+            response = client.post('/api/auth/login/', {'email': email, 'password': BENCH_PASSWORD}, content_type='application/json')
+            if response.status_code != 200:
+                raise CommandError(f'Login failed for {email}: {response.status_code}')
+            headers['HTTP_AUTHORIZATION'] = f'Bearer {response.json()["tokens"]["access"]}'
+
+        send.login = login
+        return send
+
+    def http_sender(self, base_url):
+        session = requests.Session()
+
+        def send(method, path, body):
+            response = session.request(method, base_url + path, json=body, timeout=60)
+            return response.status_code
+
+        def login(email):
+            response = session.post(f'{base_url}/api/auth/login/', json={'email': email, 'password': BENCH_PASSWORD}, timeout=60)
+            if response.status_code != 200:
+                raise CommandError(f'Login failed for {email}: {response.status_code}')
+            session.headers['Authorization'] = f'Bearer {response.json()["tokens"]["access"]}'
+
+        send.login = login
+        return send
+
+    def summarize(self, results, errors, wall):
+        self.stdout.write(f'\n{"endpoint":<18} {"reqs":>6} {"err":>5} {"req/s":>7} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8}')
+        report = {'wall_seconds': round(wall, 2), 'endpoints': {}}
+        total = 0
+        for label, latencies in results.items():
+            if not latencies:
+                continue
+            total += len(latencies)
+            latencies.sort()
+            q = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+            row = {
+                'requests': len(latencies), 'errors': errors[label], 'rps': round(len(latencies) / wall, 1),
+                'p50_ms': round(q[49], 1), 'p95_ms': round(q[94], 1), 'p99_ms': round(q[98], 1),
+            }
+            report['endpoints'][label] = row
+            self.stdout.write(
+                f'{label:<18} {row["requests"]:>6} {row["errors"]:>5} {row["rps"]:>7.1f} '
+                f'{row["p50_ms"]:>8.1f} {row["p95_ms"]:>8.1f} {row["p99_ms"]:>8.1f}'
+            )
+        report['total_requests'] = total
+        report['throughput_rps'] = round(total / wall, 1)
+        self.stdout.write(self.style.SUCCESS(f'\n{total} requests in {wall:.1f}s -> {total / wall:.1f} req/s'))
+        return report
@@ -0,0 +1,102 @@
+import json
+import platform
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from accounts.models import User
+from bench import seed as bench_seed
+from bench.suite import BENCHMARKS, DATASET_SEED, DATASETS, compare_queries, compare_timings, measure
+from orders.models import Order
+
+BASELINE_DIR = Path(__file__).resolve().parents[2] / 'baselines'
+
+
+class Command(BaseCommand):
+    """
+    Benchmark the report views and list serializers on a fixed dataset.
+    Seeds the requested dataset first (unless it's already loaded) and records
+    median/min time, query count and peak memory per benchmark.
+
+    The gate is the query count: more queries than bench/baselines/<dataset>.json
+    exits non-zero, on any machine. The committed baseline holds nothing else,
+    so it only changes when a change really does alter the queries.
+    Timings are opt-in: save a run with --json on one machine, then pass it as
+    --compare-timings to a later run on the same machine.
+    Replaces the bench rows in the database - scratch databases only.
+    """
+    help = 'Run the report/serializer benchmarks and compare them with the stored baseline.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dataset', choices=list(DATASETS), default='1k', help='Seeded dataset size (orders).')
+        parser.add_argument('--rounds', type=int, default=5, help='Timed runs per benchmark.')
+        parser.add_argument('-k', dest='match', help='Only run benchmarks whose name contains this.')
+        parser.add_argument('--baseline', help='Baseline JSON (default: bench/baselines/<dataset>.json).')
+        parser.add_argument('--save-baseline', action='store_true', help='Write the query counts as the new baseline.')
+        parser.add_argument('--compare-timings', metavar='JSON',
+                            help='Also fail on time/memory regressions against an earlier --json run from this machine.')
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='Allowed slowdown/memory growth for --compare-timings, as a fraction.')
+        parser.add_argument('--json', dest='json_path', help='Also write the results to this JSON file.')
+
+    def handle(self, *args, **options):
+        dataset = options['dataset']
+        volumes = DATASETS[dataset]
+        if Order.objects.filter(order_number__startswith='BENCH-').count() != volumes['orders']:
+            self.stdout.write(f'Seeding the {dataset} dataset...')
+            bench_seed.flush()
+            bench_seed.seed(seed=DATASET_SEED, log=lambda line: None, **volumes)
+        # The staff bench user, who owns a fifth of the orders
+        user = User.objects.get(username=f'{bench_seed.PREFIX}-user-0')
+
+        selected = [(name, setup) for name, setup in BENCHMARKS if not options['match'] or options['match'] in name]
+        if not selected:
+            raise CommandError(f'No benchmark matches {options["match"]!r}.')
+        baseline_path = Path(options['baseline']) if options['baseline'] else BASELINE_DIR / f'{dataset}.json'
+        baseline = json.loads(baseline_path.read_text())['benchmarks'] if baseline_path.exists() else {}
+
+        previous = json.loads(Path(options['compare_timings']).read_text())['benchmarks'] if options['compare_timings'] else {}
+
+        self.stdout.write(f'{"benchmark":<30} {"median ms":>10} {"min ms":>9} {"queries":>8} {"peak KB":>9}  baseline')
+        results = {}
+        with override_settings(REPORTS_PARALLEL_WORKERS=1):
+            for name, setup in selected:
+                result = results[name] = measure(setup(user), options['rounds'])
+                before = baseline.get(name)
+                line = (f'{name:<30} {result["median_ms"]:>10.2f} {result["min_ms"]:>9.2f} '
+                        f'{result["queries"]:>8} {result["peak_kb"]:>9.1f}  {before["queries"] if before else "-":>8}')
+                if name in previous and previous[name]['min_ms']:
+                    line += f'  {(result["min_ms"] / previous[name]["min_ms"] - 1) * 100:+.0f}% time'
+                self.stdout.write(line)
+
+        report = {
+            'dataset': dataset,
+            'recorded_at': timezone.now().isoformat(timespec='seconds'),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'benchmarks': results,
+        }
+        if options['json_path']:
+            Path(options['json_path']).write_text(json.dumps(report, indent=2) + '\n')
+        if options['save_baseline']:
+            # Query counts only, and entries for benchmarks that weren't run this time (-k) are kept
+            counts = {name: {'queries': entry['queries']} for name, entry in {**baseline, **results}.items()}
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps({'dataset': dataset, 'benchmarks': counts}, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(self.style.SUCCESS(f'Saved baseline {baseline_path}'))
+            return
+
+        if not baseline:
+            self.stdout.write(f'No baseline at {baseline_path} - run with --save-baseline to record one.')
+        regressions = compare_queries(results, baseline)
+        if previous:
+            regressions += compare_timings(results, previous, options['tolerance'])
+        if regressions:
+            for line in regressions:
+                self.stderr.write(f'  {line}')
+            raise CommandError(f'{len(regressions)} performance regression(s).')
+        self.stdout.write(self.style.SUCCESS('No regressions.'))
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from bench.seed import DEFAULT_VOLUMES, flush, seed
+
+
+class Command(BaseCommand):
+    """
+    Fill a scratch database with synthetic data for benchmarks and load tests.
+    The same --seed and volumes always produce the same data. Every bench user
+    can log in as bench-user-N@example.com / Bench-pass-123 (bench-user-0 is staff).
+    """
+    help = 'Generate deterministic synthetic users, stock, orders and notifications.'
+
+    def add_arguments(self, parser):
+        for name, default in DEFAULT_VOLUMES.items():
+            parser.add_argument(f'--{name}', type=int, default=default, help=f'How many {name} (default {default}).')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed.')
+        parser.add_argument('--flush', action='store_true', help='Delete existing bench data first.')
+
+    def handle(self, *args, **options):
+        if options['flush']:
+            self.stdout.write('Removing previous bench data...')
+            flush()
+
+        self.stdout.write(f'Seeding (seed={options["seed"]})...')
+        started = time.perf_counter()
+        counts = seed(
+            seed=options['seed'], log=self.stdout.write,
+            **{name: options[name] for name in DEFAULT_VOLUMES},
+        )
+        elapsed = time.perf_counter() - started
+        summary = ', '.join(f'{count} {name}' for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f'Done in {elapsed:.1f}s: {summary}'))
@@ -0,0 +1,219 @@
+"""
+Deterministic synthetic data for benchmarks and load tests.
+
+Everything is generated from one random seed and bulk_created in batches,
+so the same arguments always give the same rows (dates are relative to
+midnight today, so "last 7 days" reports always have data). All bench rows
+are recognisable by the 'bench' prefix, so flush() can clear them out again.
+Only run this against a scratch database.
+"""
+import contextlib
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import User
+from archive.models import ArchivedOrder, ArchivedOrderItem
+from customers.credit import recompute_open_balances
+from customers.models import Customer
+from inventory.models import Category, InventoryItem, Product
+from inventory.stock import refresh_stock_status
+from notifications.models import Notification
+from orders.models import Order, OrderItem
+from warehouses.models import Warehouse
+
+PREFIX = 'bench'
+BENCH_PASSWORD = 'Bench-pass-123'
+BATCH_SIZE = 5000
+ORDER_CHUNK = 10000  # Orders generated (and held in memory) at a time
+
+DEFAULT_VOLUMES = {
+    'users': 5,
+    'customers': 500,
+    'warehouses': 5,
+    'categories': 12,
+    'products': 1000,
+    'orders': 10000,
+    'notifications': 2000,
+}
+
+ORDER_STATUS_WEIGHTS = {'delivered': 45, 'shipped': 20, 'processing': 15, 'pending': 12, 'cancelled': 8}
+CITIES = [
+    ('Chicago', 'IL', 41.8781, -87.6298), ('Dallas', 'TX', 32.7767, -96.7970),
+    ('Newark', 'NJ', 40.7357, -74.1724), ('Reno', 'NV', 39.5296, -119.8138),
+    ('Atlanta', 'GA', 33.7490, -84.3880), ('Columbus', 'OH', 39.9612, -82.9988),
+    ('Memphis', 'TN', 35.1495, -90.0490), ('Ontario', 'CA', 34.0633, -117.6509),
+]
+
+
+@contextlib.contextmanager
+def manual_timestamps(*models):
+    """Let bulk_create keep the created_at/updated_at values we generate instead of 'now'."""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def flush():
+    """Delete every bench row (children first so nothing cascades row by row)."""
+    users = User.objects.filter(username__startswith=f'{PREFIX}-')
+    Notification.objects.filter(user__in=users).delete()
+    OrderItem.objects.filter(order__order_number__startswith='BENCH-').delete()
+    Order.objects.filter(order_number__startswith='BENCH-').delete()
+    ArchivedOrderItem.objects.filter(order__order_number__startswith='BENCH-').delete()
+    ArchivedOrder.objects.filter(order_number__startswith='BENCH-').delete()
+    InventoryItem.objects.filter(product__sku__startswith='BENCH-').delete()
+    Product.objects.filter(sku__startswith='BENCH-').delete()
+    Customer.objects.filter(email__startswith=f'{PREFIX}-').delete()
+    Warehouse.objects.filter(name__startswith='Bench ').delete()
+    Category.objects.filter(name__startswith='Bench ').delete()
+    users.delete()
+
+
+def seed(seed=42, log=print, **volumes):
+    """Generate a full dataset. volumes override DEFAULT_VOLUMES. Returns the row counts."""
+    volumes = {**DEFAULT_VOLUMES, **{k: v for k, v in volumes.items() if v is not None}}
+    rng = random.Random(seed)
+    anchor = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    history_days = 180
+
+    def when(max_days=history_days):
+        return anchor - timedelta(days=rng.randrange(max_days), seconds=rng.randrange(86400))
+
+    with manual_timestamps(User, Customer, Warehouse, Category, Product, InventoryItem, Order, Notification), \
+            transaction.atomic():
+        # Users - the first one is staff so it can see admin-only endpoints
+        password = make_password(BENCH_PASSWORD)
+        users = User.objects.bulk_create([
+            User(
+                username=f'{PREFIX}-user-{i}', email=f'{PREFIX}-user-{i}@example.com', password=password,
+                company=f'Bench Co {i}', is_staff=(i == 0), created_at=anchor, updated_at=anchor,
+            )
+            for i in range(volumes['users'])
+        ], batch_size=BATCH_SIZE)
+        log(f'  {len(users)} users')
+
+        # Customer coordinates come from their own generator, so the rest of the dataset stays the same
+        places = random.Random(seed + 1)
+        customers = Customer.objects.bulk_create([
+            Customer(
+                name=f'Bench Customer {i}', company=f'Bench Buyer {i % 97}', email=f'{PREFIX}-customer-{i}@example.com',
+                phone=f'555-{i:07d}', address=f'{i} Market St',
+                latitude=Decimal(f'{CITIES[i % len(CITIES)][2] + places.uniform(-1, 1):.6f}'),
+                longitude=Decimal(f'{CITIES[i % len(CITIES)][3] + places.uniform(-1, 1):.6f}'),
+                status='active' if rng.random() < 0.9 else 'inactive',
+                credit_limit=Decimal(rng.choice([0, 50000, 100000, 250000, 500000])),
+                created_by=rng.choice(users), created_at=(t := when()), updated_at=t,
+            )
+            for i in range(volumes['customers'])
+        ], batch_size=BATCH_SIZE)
+        log(f'  {len(customers)} customers')
+
+        warehouses = Warehouse.objects.bulk_create([
+            Warehouse(
+                name=f'Bench WH {i}', address=f'{100 + i} Logistics Way', city=city, state=state, zip_code=f'{10000 + i}',
+                latitude=Decimal(f'{lat + rng.uniform(-0.2, 0.2):.6f}'), longitude=Decimal(f'{lng + rng.uniform(-0.2, 0.2):.6f}'),
+                capacity=rng.randrange(20000, 200000, 1000), created_at=anchor, updated_at=anchor,
+            )
+            for i, (city, state, lat, lng) in ((i, CITIES[i % len(CITIES)]) for i in range(volumes['warehouses']))
+        ], batch_size=BATCH_SIZE)
+        log(f'  {len(warehouses)} warehouses')
+
+        categories = Category.objects.bulk_create([
+            Category(name=f'Bench Category {i}', updated_at=anchor) for i in range(volumes['categories'])
+        ], batch_size=BATCH_SIZE)
+
+        products = []
+        for i in range(volumes['products']):
+            price = Decimal(rng.randrange(199, 49999)) / 100
+            products.append(Product(
+                sku=f'BENCH-{i:07d}', name=f'Bench Product {i}', description='Synthetic benchmark product',
+                category=rng.choice(categories) if rng.random() < 0.95 else None,
+                price=price, cost=(price * Decimal('0.6')).quantize(Decimal('0.01')),
+                created_at=(t := when()), updated_at=t,
+            ))
+        products = Product.objects.bulk_create(products, batch_size=BATCH_SIZE)
+        log(f'  {len(products)} products in {len(categories)} categories')
+
+        # Each product is stocked in 1-3 warehouses
+        stocked_in = {}
+        items = []
+        for product in products:
+            for warehouse in rng.sample(warehouses, k=min(len(warehouses), rng.randint(1, 3))):
+                stocked_in.setdefault(product.id, []).append(warehouse.id)
+                # Bins from the row number rather than rng, so the rest of the dataset stays the same
+                n = len(items)
+                items.append(InventoryItem(
+                    product=product, warehouse=warehouse,
+                    quantity=rng.choice([0, rng.randint(1, 20), rng.randint(20, 2000), rng.randint(20, 2000)]),
+                    low_stock_threshold=20, location=f'{chr(65 + n % 12)}-{n // 12 % 40 + 1:02d}-{n // 480 % 5 + 1}',
+                    updated_at=anchor,
+                ))
+        InventoryItem.objects.bulk_create(items, batch_size=BATCH_SIZE)
+        log(f'  {len(items)} inventory rows')
+
+        # Orders in chunks, with a long-tail product popularity (a few best sellers, many slow movers)
+        weights = [1 / (rank + 1) ** 0.8 for rank in range(len(products))]
+        statuses, status_weights = zip(*ORDER_STATUS_WEIGHTS.items())
+        order_count = line_count = 0
+        for start in range(0, volumes['orders'], ORDER_CHUNK):
+            size = min(ORDER_CHUNK, volumes['orders'] - start)
+            orders, lines = [], []
+            for i in range(start, start + size):
+                created = when()
+                picked = rng.choices(products, weights=weights, k=rng.randint(1, 5))
+                order_lines = []
+                for product in {p.id: p for p in picked}.values():
+                    quantity = rng.randint(1, 10)
+                    order_lines.append(OrderItem(
+                        product=product, warehouse_id=rng.choice(stocked_in[product.id]),
+                        quantity=quantity, unit_price=product.price, subtotal=product.price * quantity,
+                    ))
+                orders.append(Order(
+                    order_number=f'BENCH-{i:09d}', customer=rng.choice(customers), user=rng.choice(users),
+                    status=rng.choices(statuses, weights=status_weights)[0],
+                    total_amount=sum(line.subtotal for line in order_lines),
+                    created_at=created, updated_at=min(created + timedelta(hours=rng.randint(0, 72)), anchor),
+                ))
+                lines.append(order_lines)
+            orders = Order.objects.bulk_create(orders, batch_size=BATCH_SIZE)
+            for order, order_lines in zip(orders, lines):
+                for line in order_lines:
+                    line.order = order
+            flat = [line for order_lines in lines for line in order_lines]
+            OrderItem.objects.bulk_create(flat, batch_size=BATCH_SIZE)
+            order_count += len(orders)
+            line_count += len(flat)
+            log(f'  {order_count}/{volumes["orders"]} orders')
+
+        types = ['info', 'success', 'alert', 'error']
+        notifications = Notification.objects.bulk_create([
+            Notification(
+                user=rng.choice(users), title=f'Bench notification {i}', message='Synthetic benchmark notification',
+                type=rng.choice(types), read=rng.random() < 0.6, created_at=when(30),
+            )
+            for i in range(volumes['notifications'])
+        ], batch_size=BATCH_SIZE)
+        log(f'  {len(notifications)} notifications')
+
+    # Settle product statuses from the generated stock (quietly), and the customers' open balances
+    refresh_stock_status(notify=False)
+    recompute_open_balances()
+    return {
+        'users': len(users), 'customers': len(customers), 'warehouses': len(warehouses),
+        'categories': len(categories), 'products': len(products), 'inventory_items': len(items),
+        'orders': order_count, 'order_items': line_count, 'notifications': len(notifications),
+    }
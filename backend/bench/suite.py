@@ -0,0 +1,200 @@
+"""
+Benchmarks for the code that burns our CPU: the report views, the nested
+list serializers and pick-wave planning.
+
+Each benchmark is a setup function registered with @benchmark. It gets the
+bench user to run as and returns a zero-argument callable doing one full
+unit of work (render a report, serialize a page). measure() times that
+callable over several rounds, then runs it once more with query capture and
+tracemalloc on for the query count and peak Python memory, so the tracing
+overhead never shows up in the timings.
+
+Reports run with REPORTS_PARALLEL_WORKERS=1 while benchmarked: the pool would
+hide queries on other connections from the query count and make timings depend
+on the machine's core count.
+"""
+import statistics
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.db import connection
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from customers.serializers import CustomerSerializer
+from customers.views import CustomerViewSet
+from inventory.serializers import ProductSerializer
+from inventory.views import ProductViewSet
+from orders.serializers import OrderSerializer
+from orders.views import OrderViewSet
+from picking.waves import plan_waves
+from reports import views as reports
+
+# Fixed datasets (seed_bench volumes). Same seed, same rows - only "today" moves.
+DATASETS = {
+    '1k': {'users': 5, 'customers': 100, 'warehouses': 5, 'categories': 8, 'products': 200, 'orders': 1000, 'notifications': 200},
+    '100k': {'users': 5, 'customers': 2000, 'warehouses': 10, 'categories': 20, 'products': 5000, 'orders': 100000, 'notifications': 5000},
+    '1m': {'users': 5, 'customers': 20000, 'warehouses': 20, 'categories': 40, 'products': 20000, 'orders': 1000000, 'notifications': 20000},
+}
+DATASET_SEED = 42
+# Differences smaller than this are noise, whatever the percentage
+NOISE_FLOOR = {'min_ms': 2, 'peak_kb': 64}
+
+BENCHMARKS = []
+factory = APIRequestFactory()
+
+
+def benchmark(name):
+    def register(setup):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return register
+
+
+def report_call(view, path, user):
+    def run():
+        request = factory.get(path)
+        force_authenticate(request, user=user)
+        response = view(request)
+        assert response.status_code == 200, f'{path} returned {response.status_code}'
+        return response.render()
+    return run
+
+
+def list_queryset(viewset_class, user):
+    """The queryset the list endpoint would serialize (same select/prefetch_related), plus its request."""
+    request = Request(factory.get('/'))
+    request.user = user
+    view = viewset_class(request=request, action='list', kwargs={}, format_kwarg=None)
+    return view.filter_queryset(view.get_queryset()), request
+
+
+def serializer_call(serializer_class, viewset_class, user, rows):
+    def run():
+        queryset, request = list_queryset(viewset_class, user)
+        return serializer_class(queryset[:rows], many=True, context={'request': request}).data
+    return run
+
+
+@benchmark('report.dashboard')
+def dashboard(user):
+    return report_call(reports.dashboard_stats, '/api/reports/dashboard/', user)
+
+
+@benchmark('report.revenue')
+def revenue(user):
+    return report_call(reports.revenue_report, '/api/reports/revenue/?months=12', user)
+
+
+@benchmark('report.products')
+def product_performance(user):
+    return report_call(reports.product_performance, '/api/reports/products/', user)
+
+
+@benchmark('report.warehouses')
+def warehouse_performance(user):
+    return report_call(reports.warehouse_performance, '/api/reports/warehouses/', user)
+
+
+@benchmark('report.category')
+def category_performance(user):
+    return report_call(reports.category_performance, '/api/reports/category/', user)
+
+
+@benchmark('report.reorder')
+def reorder_suggestions(user):
+    return report_call(reports.reorder_suggestions, '/api/reports/reorder/', user)
+
+
+@benchmark('picking.plan')
+def pick_wave_plan(user):
+    # Planning only - nothing is saved, so every round sees the same open orders
+    return lambda: plan_waves(user)
+
+
+@benchmark('serializer.product.page')
+def product_page(user):
+    return serializer_call(ProductSerializer, ProductViewSet, user, settings.REST_FRAMEWORK['PAGE_SIZE'])
+
+
+@benchmark('serializer.product.sync_page')
+def product_sync_page(user):
+    return serializer_call(ProductSerializer, ProductViewSet, user, settings.SYNC_PAGE_SIZE)
+
+
+@benchmark('serializer.order.page')
+def order_page(user):
+    return serializer_call(OrderSerializer, OrderViewSet, user, settings.REST_FRAMEWORK['PAGE_SIZE'])
+
+
+@benchmark('serializer.order.sync_page')
+def order_sync_page(user):
+    return serializer_call(OrderSerializer, OrderViewSet, user, settings.SYNC_PAGE_SIZE)
+
+
+@benchmark('serializer.customer.page')
+def customer_page(user):
+    return serializer_call(CustomerSerializer, CustomerViewSet, user, settings.REST_FRAMEWORK['PAGE_SIZE'])
+
+
+def measure(func, rounds):
+    """Warm up once, time `rounds` runs, then one traced run for queries and peak memory."""
+    func()
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    # Count with an execute wrapper - the debug query log is capped at 9000 entries
+    queries = 0
+
+    def count(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    tracemalloc.start()
+    try:
+        with connection.execute_wrapper(count):
+            func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        'median_ms': round(statistics.median(timings), 2),
+        'min_ms': round(min(timings), 2),
+        'queries': queries,
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def compare_queries(results, baseline):
+    """
+    Any benchmark running more queries than the baseline. Query counts don't
+    depend on the machine, so this is the hard gate. Returns messages.
+    """
+    return [
+        f'{name}: {baseline[name]["queries"]} -> {result["queries"]} queries'
+        for name, result in results.items()
+        if name in baseline and result['queries'] > baseline[name]['queries']
+    ]
+
+
+def compare_timings(results, previous, tolerance):
+    """
+    Best-of-rounds time or peak memory more than `tolerance` (a fraction) above
+    an earlier run's. Only meaningful when both runs come from the same machine.
+    The minimum is compared rather than the median because it's far less
+    sensitive to a busy machine. Returns messages.
+    """
+    regressions = []
+    for name, result in results.items():
+        before = previous.get(name)
+        if before is None:
+            continue
+        for key, unit in (('min_ms', 'ms'), ('peak_kb', 'KB')):
+            if result[key] > max(before[key] * (1 + tolerance), before[key] + NOISE_FLOOR[key]):
+                regressions.append(f'{name}: {key} {before[key]}{unit} -> {result[key]}{unit}')
+    return regressions
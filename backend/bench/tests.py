@@ -0,0 +1,107 @@
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import User
+from config.testing import make_user
+from customers.models import Customer
+from inventory.models import InventoryItem, Product
+from notifications.models import Notification
+from orders.models import Order, OrderItem
+from customers.serializers import CustomerSerializer
+from customers.views import CustomerViewSet
+from inventory.serializers import ProductSerializer
+from inventory.views import ProductViewSet
+from orders.serializers import OrderSerializer
+from orders.views import OrderViewSet
+from .seed import PREFIX, flush, seed
+from .suite import compare_queries, compare_timings, serializer_call
+
+SMALL = {'users': 2, 'customers': 6, 'warehouses': 2, 'categories': 2, 'products': 8, 'orders': 25, 'notifications': 5}
+
+
+def quiet(*args):
+    pass
+
+
+class SeedTests(TestCase):
+    def snapshot(self):
+        return (
+            list(Order.objects.order_by('order_number').values_list('order_number', 'status', 'total_amount', 'customer__email')),
+            list(InventoryItem.objects.order_by('product__sku', 'warehouse__name').values_list('product__sku', 'quantity', 'location')),
+        )
+
+    def test_same_seed_same_data(self):
+        counts = seed(seed=7, log=quiet, **SMALL)
+        self.assertEqual(counts['orders'], 25)
+        self.assertEqual(counts['order_items'], OrderItem.objects.count())
+        self.assertEqual(Product.objects.count(), 8)
+        first = self.snapshot()
+        # Order totals add up to their lines
+        for order in Order.objects.prefetch_related('items')[:5]:
+            self.assertEqual(order.total_amount, sum(item.subtotal for item in order.items.all()))
+
+        flush()
+        seed(seed=7, log=quiet, **SMALL)
+        self.assertEqual(self.snapshot(), first)
+
+        flush()
+        seed(seed=8, log=quiet, **SMALL)
+        self.assertNotEqual(self.snapshot(), first)
+
+    def test_flush_leaves_other_data_alone(self):
+        user = make_user('real')
+        Customer.objects.create(name='Real', company='Real Inc', email='real-customer@example.com')
+        seed(log=quiet, **SMALL)
+        flush()
+        self.assertEqual(list(User.objects.all()), [user])
+        self.assertEqual(Customer.objects.count(), 1)
+        self.assertFalse(Order.objects.exists() or Product.objects.exists() or Notification.objects.exists())
+
+
+class ListQueryTests(TestCase):
+    """The list serializers cost the same number of queries for 2 rows as for a page of them."""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed(log=quiet, **SMALL)
+        cls.user = User.objects.get(username=f'{PREFIX}-user-0')
+
+    def queries(self, serializer_class, viewset_class, rows):
+        with CaptureQueriesContext(connection) as queries:
+            data = serializer_call(serializer_class, viewset_class, self.user, rows)()
+        self.assertEqual(len(data), rows)
+        return len(queries)
+
+    def test_no_per_row_queries(self):
+        for serializer_class, viewset_class in (
+            (ProductSerializer, ProductViewSet),
+            (OrderSerializer, OrderViewSet),
+            (CustomerSerializer, CustomerViewSet),
+        ):
+            with self.subTest(serializer_class.__name__):
+                self.assertEqual(
+                    self.queries(serializer_class, viewset_class, 2),
+                    self.queries(serializer_class, viewset_class, 6),
+                )
+
+    def test_customer_figures(self):
+        customer = Customer.objects.filter(orders__isnull=False).first()
+        data = serializer_call(CustomerSerializer, CustomerViewSet, self.user, 6)()
+        row = next(row for row in data if row['id'] == customer.id)
+        # Same figures as a customer serialized on its own, which queries them directly
+        self.assertEqual(row, CustomerSerializer(customer).data)
+        self.assertLessEqual(len(row['recent_orders']), 5)
+        self.assertEqual(row['total_orders'], customer.orders.count())
+
+
+class CompareTests(SimpleTestCase):
+    def test_queries_are_the_gate(self):
+        baseline = {'a': {'queries': 3}, 'b': {'queries': 3}}
+        results = {'a': {'queries': 4}, 'b': {'queries': 2}, 'new': {'queries': 50}}
+        self.assertEqual(compare_queries(results, baseline), ['a: 3 -> 4 queries'])
+
+    def test_timings_allow_tolerance_and_noise(self):
+        previous = {'a': {'min_ms': 10, 'peak_kb': 100}}
+        self.assertEqual(compare_timings({'a': {'min_ms': 12, 'peak_kb': 120}}, previous, 0.25), [])
+        self.assertEqual(compare_timings({'a': {'min_ms': 20, 'peak_kb': 100}}, previous, 0.25), ['a: min_ms 10ms -> 20ms'])
@@ -0,0 +1,134 @@
+"""
+Negotiated gzip/brotli compression for API responses.
+
+Django's GZipMiddleware only does gzip and compresses anything over 200 bytes.
+This picks brotli when the client accepts it (and the `brotli` package is
+installed), falls back to gzip, skips small bodies (COMPRESSION_MIN_BYTES)
+and compresses streaming responses chunk by chunk. Only JSON under /api/ is
+compressed - admin and other HTML pages, with their CSRF tokens, go out as-is.
+Static files are left to WhiteNoise, which serves them pre-compressed.
+
+Both encodings get a random amount of padding, as GZipMiddleware does for
+gzip, so the compressed length alone doesn't leak the body (BREACH).
+"""
+import secrets
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:  # Optional - gzip only without it
+    brotli = None
+
+COMPRESSIBLE_PREFIX = '/api/'
+COMPRESSIBLE_TYPES = ('application/json',)
+
+
+def accepted_encodings(header):
+    """Content codings from an Accept-Encoding header, minus any the client refused with q=0."""
+    accepted = set()
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        params = params.replace(' ', '')
+        if coding and params not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            accepted.add(coding.lower())
+    return accepted
+
+
+# Flush the brotli stream once this much input is buffered. Flushing every tiny
+# chunk costs a few bytes each time and can make the output bigger than the input.
+BROTLI_FLUSH_BYTES = 16 * 1024
+
+
+def brotli_padding(compressor, max_random_bytes):
+    """
+    The stream header plus a metadata block of 1-max_random_bytes random bytes, which
+    decoders skip. gzip gets the same from a random file name in its header.
+    """
+    size = secrets.randbelow(min(max_random_bytes, 256)) + 1
+    # Flushing byte-aligns the stream; then ISLAST=0, MNIBBLES=0, reserved 0, MSKIPBYTES=1, MSKIPLEN-1
+    block = ((3 << 1) | (1 << 4) | ((size - 1) << 6)).to_bytes(2, 'little')
+    return compressor.flush() + block + secrets.token_bytes(size)
+
+
+def brotli_compress(data, quality, max_random_bytes):
+    compressor = brotli.Compressor(quality=quality)
+    return brotli_padding(compressor, max_random_bytes) + compressor.process(data) + compressor.finish()
+
+
+def brotli_compress_sequence(sequence, quality, max_random_bytes):
+    compressor = brotli.Compressor(quality=quality)
+    yield brotli_padding(compressor, max_random_bytes)
+    pending = 0
+    for chunk in sequence:
+        data = compressor.process(chunk)
+        pending += len(chunk)
+        if pending >= BROTLI_FLUSH_BYTES:
+            data += compressor.flush()
+            pending = 0
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    # Upper bound on the BREACH padding, same as Django's GZipMiddleware
+    max_random_bytes = 100
+
+    def choose_encoding(self, request):
+        accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if brotli is not None and 'br' in accepted:
+            return 'br'
+        if 'gzip' in accepted:
+            return 'gzip'
+        return None
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding') or not request.path.startswith(COMPRESSIBLE_PREFIX):
+            return response
+        if not response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES):
+            return response
+        # Not worth the CPU for small bodies (streaming sizes aren't known up front)
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_BYTES:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = self.choose_encoding(request)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                # Async streams are rare here (nothing in the API produces them) - leave them alone
+                return response
+            if encoding == 'br':
+                response.streaming_content = brotli_compress_sequence(
+                    response.streaming_content, settings.COMPRESSION_BROTLI_QUALITY, self.max_random_bytes
+                )
+            else:
+                response.streaming_content = compress_sequence(
+                    response.streaming_content, max_random_bytes=self.max_random_bytes
+                )
+            del response.headers['Content-Length']
+        else:
+            if encoding == 'br':
+                compressed = brotli_compress(
+                    response.content, settings.COMPRESSION_BROTLI_QUALITY, self.max_random_bytes
+                )
+            else:
+                compressed = compress_string(response.content, max_random_bytes=self.max_random_bytes)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # The body bytes differ per encoding, so a strong ETag has to become weak
+        # (If-None-Match still matches it - see config/conditional.py)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,66 @@
+"""
+Conditional GET (ETag / Last-Modified) for rarely-changing list and detail endpoints.
+
+Before serializing anything, ConditionalGetMixin runs one aggregate query over
+the filtered queryset - row counts plus Max(updated_at) across the model and
+whatever nested data the serializer embeds - and turns it into an ETag and
+Last-Modified. If the client already has that version it gets a bodyless
+304 Not Modified and the expensive queryset/serializer work is skipped.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalGetMixin:
+    # updated_at lookups whose newest value marks the data as changed
+    fingerprint_timestamps = ('updated_at',)
+    # Reverse relations to count too, so deletes also change the fingerprint
+    fingerprint_counts = ()
+
+    def _fingerprint(self, queryset):
+        aggregates = {'rows': Count('pk', distinct=True)}
+        for i, lookup in enumerate(self.fingerprint_timestamps):
+            aggregates[f'ts{i}'] = Max(lookup)
+        for i, lookup in enumerate(self.fingerprint_counts):
+            aggregates[f'n{i}'] = Count(lookup, distinct=True)
+        values = queryset.order_by().aggregate(**aggregates)
+
+        timestamps = [values[f'ts{i}'] for i in range(len(self.fingerprint_timestamps))]
+        timestamps = [ts for ts in timestamps if ts is not None]
+        last_modified = max(timestamps) if timestamps else None
+
+        # The full path is part of the tag, so every page/filter combination gets its own
+        raw = '|'.join([self.request.get_full_path()] + [str(values[key]) for key in sorted(values)])
+        etag = quote_etag(hashlib.sha1(raw.encode()).hexdigest())
+        return etag, last_modified
+
+    def _conditional(self, queryset, render):
+        etag, last_modified = self._fingerprint(queryset)
+        last_modified_ts = int(last_modified.timestamp()) if last_modified else None
+
+        not_modified = get_conditional_response(self.request, etag=etag, last_modified=last_modified_ts)
+        if not_modified is not None:
+            return not_modified
+
+        response = render()
+        if response.status_code == 200:
+            response['ETag'] = etag
+            if last_modified_ts is not None:
+                response['Last-Modified'] = http_date(last_modified_ts)
+            # Let browsers keep a copy but always check back with us first
+            response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self._conditional(queryset, lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: kwargs[lookup_url_kwarg]}
+        )
+        return self._conditional(queryset, lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs))
@@ -0,0 +1,21 @@
+"""
+Query-string parsing shared by API views.
+
+Bad values are the client's mistake, so they come back as a 400 naming the
+parameter instead of surfacing as a 500 from int() or a negative slice.
+"""
+from rest_framework.exceptions import ValidationError
+
+
+def positive_int(request, name, default, maximum=None):
+    """?name= as an integer of at least 1, capped at maximum when given."""
+    value = request.query_params.get(name)
+    if value in (None, ''):
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValidationError({name: 'Must be an integer.'})
+    if value < 1:
+        raise ValidationError({name: 'Must be at least 1.'})
+    return min(value, maximum) if maximum else value
@@ -0,0 +1,105 @@
+"""
+Read-replica routing.
+
+When DATABASE_REPLICA_URL is set, a 'replica' alias is added next to
+'default' and heavy read traffic is moved onto it:
+
+  - ReplicaRoutingMiddleware marks safe-method (GET/HEAD/OPTIONS) requests to
+    the reports and list/retrieve endpoints (REPLICA_READ_PREFIXES) as
+    replica-eligible.
+  - ReplicaRouter sends their reads to 'replica'. Every write goes to
+    'default', and once a request has written anything, the rest of its reads
+    stay on 'default' too.
+  - A client that just wrote is pinned to the primary for REPLICA_STICKY_SECONDS,
+    so it reads its own writes even if the replica is lagging.
+
+The pin lives in the cache, so every worker process has to see the same one:
+with a process-local cache (the LocMem default) a client that wrote through
+one worker could read a lagging replica through another. The middleware
+refuses to start in that case - configure REDIS_URL along with the replica.
+
+Without a replica configured the middleware switches itself off and the
+router always answers 'default'.
+"""
+import contextvars
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+
+REPLICA_ALIAS = 'replica'
+PRIMARY_ALIAS = 'default'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class RoutingState:
+    """Per-request routing flags, shared with any report worker threads via contextvars."""
+
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.wrote = False
+
+
+_routing_state = contextvars.ContextVar('db_routing_state', default=None)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _routing_state.get()
+        if state is not None and state.use_replica and not state.wrote:
+            return REPLICA_ALIAS
+        return PRIMARY_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _routing_state.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data, so objects from either can be related
+        return True
+
+
+def _client_key(request):
+    """Identify the client (bearer token or session cookie) for read-your-writes pinning."""
+    credential = request.META.get('HTTP_AUTHORIZATION') or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if not credential:
+        return None
+    return 'db:pin:' + hashlib.sha256(credential.encode()).hexdigest()
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        if not replica_configured():
+            raise MiddlewareNotUsed()
+        from accounts.revocation import cache_is_shared
+        if not cache_is_shared():
+            raise ImproperlyConfigured(
+                'DATABASE_REPLICA_URL needs a cache shared by every worker (REDIS_URL) to pin clients '
+                'to the primary after a write; the default cache is local to each process.'
+            )
+        self.get_response = get_response
+
+    def __call__(self, request):
+        client_key = _client_key(request)
+        use_replica = (
+            request.method in SAFE_METHODS
+            and request.path.startswith(tuple(settings.REPLICA_READ_PREFIXES))
+            and not (client_key and cache.get(client_key))
+        )
+        state = RoutingState(use_replica)
+        token = _routing_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing_state.reset(token)
+
+        if state.wrote and client_key:
+            cache.set(client_key, True, settings.REPLICA_STICKY_SECONDS)
+        return response
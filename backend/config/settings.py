@@ -4,6 +4,7 @@ This is where all the magic happens - configuration for our entire backend.
 """
 
 from pathlib import Path
+from urllib.parse import urlparse
 from datetime import timedelta
 from decouple import config
 import dj_database_url
@@ -45,12 +46,25 @@ INSTALLED_APPS = [
     'warehouses',  # Warehouse locations and details
     'reports',  # Analytics and reporting
     'notifications',  # Real-time user notifications
+    'monitoring',  # Opt-in request timing and metrics
+    'sync',  # Change feeds and delete tombstones for offline clients
+    'idempotency',  # Idempotency-Key replay for order and stock writes
+    'jobs',  # Database-backed background jobs (manage.py run_worker)
+    'webhooks',  # Signed partner webhooks sent from a transactional outbox
+    'bench',  # seed_bench / load_test tooling (no models)
+    'archive',  # Old finished orders moved out of the live order tables
+    'images',  # Resized WebP/JPEG variants of product images and avatars
+    'picking',  # Pick waves and consolidated pick lists per warehouse
+    'reservations',  # Time-limited stock holds and available-to-promise
 ]
 
 # Middleware runs on every request - think of it as layers of processing
 # Order matters here! They execute top to bottom on request, then bottom to top on response
 MIDDLEWARE = [
+    'monitoring.middleware.PerformanceMiddleware',  # Outermost so it times everything below (no-op unless enabled)
     'django.middleware.security.SecurityMiddleware',
+    'config.replica.ReplicaRoutingMiddleware',  # Sends safe reads to the replica (no-op without one)
+    'config.compression.CompressionMiddleware',  # brotli/gzip for API JSON - above anything that touches the body
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Serve static files in production
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -59,6 +73,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'monitoring.middleware.ProfilingMiddleware',  # Staff-triggered/sampled profiling (no-op unless enabled)
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -91,6 +106,30 @@ DATABASES = {
     )
 }
 
+# Optional read replica - reports and list/detail GETs read from it (see config/replica.py)
+# Two SQLite files work too, e.g. DATABASE_REPLICA_URL=sqlite:///replica.sqlite3
+# Needs REDIS_URL as well: read-your-writes pins are kept in the cache, which every worker must share
+DATABASE_REPLICA_URL = config('DATABASE_REPLICA_URL', default='')
+if DATABASE_REPLICA_URL:
+    DATABASES['replica'] = dj_database_url.parse(
+        DATABASE_REPLICA_URL,
+        conn_max_age=600,
+        conn_health_checks=True,
+        # A test database of its own rather than a mirror of the primary's, so routing and lag are real in tests
+        test_options={'NAME': f"test_replica_{Path(urlparse(DATABASE_REPLICA_URL).path).name or 'db'}"},
+    )
+DATABASE_ROUTERS = ['config.replica.ReplicaRouter']
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=10, cast=int)  # Read-your-writes window after a write
+REPLICA_READ_PREFIXES = (
+    '/api/reports/',
+    '/api/orders/',
+    '/api/archive/',
+    '/api/inventory/',
+    '/api/customers/',
+    '/api/warehouses/',
+    '/api/notifications/',
+)
+
 # These validators check passwords when users register
 # They make sure passwords aren't too weak or similar to username
 AUTH_PASSWORD_VALIDATORS = [
@@ -108,6 +147,24 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Login looks users up by email; username logins (admin) fall back to the default backend
+AUTHENTICATION_BACKENDS = [
+    'accounts.backends.EmailBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
+# Password hashing - PBKDF2 with a tunable work factor. Stored hashes are
+# upgraded (or downgraded) to the configured iteration count on next login.
+PASSWORD_HASH_ITERATIONS = config('PASSWORD_HASH_ITERATIONS', default=600000, cast=int)
+PASSWORD_HASHERS = [
+    'accounts.hashers.TunablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -132,7 +189,7 @@ AUTH_USER_MODEL = 'accounts.User'
 REST_FRAMEWORK = {
     # How we authenticate users - JWT tokens in this case
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',  # Bearer token auth
+        'accounts.authentication.CachedJWTAuthentication',  # Bearer token auth, with the user lookup cached
     ),
     # By default, require users to be logged in to access any endpoint
     # Individual views can override this if needed
@@ -148,6 +205,27 @@ REST_FRAMEWORK = {
     ),
 }
 
+# Cache - in-process by default; set REDIS_URL (needs the `redis` package) to share it across workers
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'shipra',
+        }
+    }
+
+# How long an authenticated user stays cached between requests (0 turns the cache off)
+AUTH_USER_CACHE_TTL = config('AUTH_USER_CACHE_TTL', default=60, cast=int)
+AUTH_USER_CACHE_ALIAS = 'default'
+
 # JWT token configuration
 # JWTs are like temporary ID cards - they prove who you are without storing sessions
 SIMPLE_JWT = {
@@ -164,6 +242,113 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',  # What to call it in the token
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.revocation.FastTokenRefreshSerializer',  # In-memory blacklist checks (with REDIS_URL)
+}
+
+# Refresh-token revocation index (see accounts/revocation.py) - only used with a shared cache (REDIS_URL)
+TOKEN_BLOOM_REBUILD_SECONDS = config('TOKEN_BLOOM_REBUILD_SECONDS', default=3600, cast=int)  # Full rebuild drops expired tokens
+TOKEN_BLOOM_MIN_CAPACITY = 10000
+TOKEN_REVOKED_CACHE_TTL = int(SIMPLE_JWT['REFRESH_TOKEN_LIFETIME'].total_seconds())
+
+# Threads used to run independent report queries side by side (1 = run them one after another)
+REPORTS_PARALLEL_WORKERS = config('REPORTS_PARALLEL_WORKERS', default=4, cast=int)
+
+# Demand forecasting - defaults for `manage.py forecast_reorder` (see reports/forecasting.py)
+FORECAST_HISTORY_DAYS = config('FORECAST_HISTORY_DAYS', default=90, cast=int)  # How much sales history to load
+FORECAST_WINDOW_DAYS = config('FORECAST_WINDOW_DAYS', default=28, cast=int)  # Moving-average window
+FORECAST_METHOD = config('FORECAST_METHOD', default='sma')  # 'sma' or 'ses'
+FORECAST_SMOOTHING_ALPHA = config('FORECAST_SMOOTHING_ALPHA', default=0.3, cast=float)
+FORECAST_LEAD_TIME_DAYS = config('FORECAST_LEAD_TIME_DAYS', default=7, cast=int)  # Supplier lead time
+FORECAST_SERVICE_LEVEL_Z = config('FORECAST_SERVICE_LEVEL_Z', default=1.65, cast=float)  # ~95% service level
+
+# Change feeds - /changes/?updated_since=... (see sync/feeds.py)
+SYNC_PAGE_SIZE = config('SYNC_PAGE_SIZE', default=500, cast=int)
+SYNC_MAX_PAGE_SIZE = 2000
+SYNC_OVERLAP_SECONDS = config('SYNC_OVERLAP_SECONDS', default=5, cast=int)  # Re-send recent rows in case of late commits
+SYNC_TOMBSTONE_RETENTION_DAYS = config('SYNC_TOMBSTONE_RETENTION_DAYS', default=90, cast=int)  # `manage.py prune_tombstones`
+
+# Order archival - `manage.py archive_orders` (see archive/archiver.py)
+ARCHIVE_AFTER_DAYS = config('ARCHIVE_AFTER_DAYS', default=365, cast=int)  # Finished orders older than this leave the live tables
+ARCHIVE_BATCH_SIZE = config('ARCHIVE_BATCH_SIZE', default=2000, cast=int)  # Orders moved per transaction
+
+# Customer analytics - `manage.py refresh_customer_analytics` (see customers/analytics.py)
+ANALYTICS_MAX_INCREMENTAL_CUSTOMERS = config('ANALYTICS_MAX_INCREMENTAL_CUSTOMERS', default=5000, cast=int)  # More changed than this and a full pass is cheaper
+
+# Image variants - generated by a background job on upload (see images/variants.py)
+IMAGE_VARIANT_WIDTHS = [64, 160, 320, 640]  # Pixel widths generated for every product image and avatar
+IMAGE_VARIANT_QUALITY = config('IMAGE_VARIANT_QUALITY', default=80, cast=int)  # WebP/JPEG encoder quality
+IMAGE_VARIANT_MAX_AGE = config('IMAGE_VARIANT_MAX_AGE', default=31536000, cast=int)  # Cache lifetime for variants (names change with content)
+
+# Pick waves - POST /api/picking/waves/plan/ (see picking/waves.py)
+PICK_WAVE_MAX_ORDERS = config('PICK_WAVE_MAX_ORDERS', default=30, cast=int)  # Orders per wave (about one cart of totes)
+PICK_WAVE_MAX_UNITS = config('PICK_WAVE_MAX_UNITS', default=400, cast=int)  # Units per wave
+
+# Delivery routing - GET /api/warehouses/{id}/routes/ (see warehouses/routing.py)
+ROUTE_VEHICLE_CAPACITY = config('ROUTE_VEHICLE_CAPACITY', default=300, cast=int)  # Units one vehicle carries
+
+# Stock holds - /api/reservations/holds/ (see reservations/holds.py)
+STOCK_HOLD_TTL_SECONDS = config('STOCK_HOLD_TTL_SECONDS', default=900, cast=int)  # Default hold lifetime
+STOCK_HOLD_MAX_TTL_SECONDS = config('STOCK_HOLD_MAX_TTL_SECONDS', default=7 * 24 * 3600, cast=int)  # Longest hold (partner holds can run for days)
+STOCK_HOLD_SWEEP_BATCH = config('STOCK_HOLD_SWEEP_BATCH', default=5000, cast=int)  # Expired holds deleted per statement
+
+# Background jobs (see jobs/worker.py)
+# Without a `manage.py run_worker` process, set JOBS_RUN_INLINE=True so jobs run right after the request commits
+JOBS_RUN_INLINE = config('JOBS_RUN_INLINE', default=False, cast=bool)
+JOB_WORKER_CONCURRENCY = config('JOB_WORKER_CONCURRENCY', default=4, cast=int)
+JOB_POLL_SECONDS = config('JOB_POLL_SECONDS', default=1.0, cast=float)
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_BASE_SECONDS = 10  # First retry after ~10s, then 20s, 40s...
+JOB_RETRY_MAX_SECONDS = 3600
+JOB_HEARTBEAT_SECONDS = 30  # How often a worker refreshes locked_at on the jobs it is running
+JOB_TIMEOUT_SECONDS = config('JOB_TIMEOUT_SECONDS', default=900, cast=int)  # A running job with no heartbeat for this long is assumed lost
+JOB_KEEP_FINISHED_DAYS = 7
+
+# Outbound webhooks (see webhooks/delivery.py)
+WEBHOOK_BATCH_SIZE = config('WEBHOOK_BATCH_SIZE', default=50, cast=int)  # Events per POST
+WEBHOOK_MAX_CONCURRENCY = config('WEBHOOK_MAX_CONCURRENCY', default=8, cast=int)  # Endpoints served at once
+WEBHOOK_TIMEOUT_SECONDS = 10
+WEBHOOK_LEASE_SECONDS = 60  # How long a claimed delivery stays with its sender without being renewed
+WEBHOOK_CLAIM_LIMIT = 1000  # Deliveries picked up per pass
+WEBHOOK_MAX_ATTEMPTS = 12
+WEBHOOK_RETRY_BASE_SECONDS = 30  # 30s, 1m, 2m... up to WEBHOOK_RETRY_MAX_SECONDS
+WEBHOOK_RETRY_MAX_SECONDS = 6 * 3600
+
+# Response compression (see config/compression.py)
+COMPRESSION_MIN_BYTES = config('COMPRESSION_MIN_BYTES', default=1024, cast=int)  # Smaller bodies go out as-is
+COMPRESSION_BROTLI_QUALITY = config('COMPRESSION_BROTLI_QUALITY', default=5, cast=int)  # 0-11; higher is smaller but slower
+
+# Idempotency-Key handling (see idempotency/decorators.py)
+IDEMPOTENCY_KEY_TTL_HOURS = config('IDEMPOTENCY_KEY_TTL_HOURS', default=24, cast=int)  # `manage.py purge_idempotency_keys`
+
+# Performance instrumentation (see monitoring/middleware.py)
+# Off by default - adds Server-Timing headers, JSON request logs and /api/_metrics
+PERF_INSTRUMENTATION = config('PERF_INSTRUMENTATION', default=False, cast=bool)
+PERF_METRICS_TOKEN = config('PERF_METRICS_TOKEN', default='')  # Bearer token for Prometheus scrapes
+
+# Request profiling (see monitoring/profiling.py)
+# When enabled, staff can send `X-Profile: 1` (or ?_profile=1) to capture a profile of that request
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=False, cast=bool)
+PROFILING_MODE = config('PROFILING_MODE', default='cprofile')  # 'cprofile' (.prof) or 'sampling' (collapsed stacks)
+PROFILING_SAMPLE_RATE = config('PROFILING_SAMPLE_RATE', default=0.0, cast=float)  # Fraction of all requests to profile
+PROFILING_SAMPLE_INTERVAL = config('PROFILING_SAMPLE_INTERVAL', default=0.005, cast=float)  # Seconds between stack samples
+PROFILING_MAX_CAPTURES = config('PROFILING_MAX_CAPTURES', default=50, cast=int)
+PROFILING_DIR = config('PROFILING_DIR', default=str(BASE_DIR / 'profiles'))
+
+# Logging - request metrics go out as one JSON line per request
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'plain': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'plain'},
+    },
+    'loggers': {
+        'monitoring': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+        'jobs': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+        'webhooks': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
 }
 
 # CORS (Cross-Origin Resource Sharing) settings
@@ -197,8 +382,13 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
+    'if-none-match',  # Conditional GETs from src/lib/api.ts
+    'idempotency-key',  # Safe retries of order/stock writes
 ]
 
+# Response headers the frontend is allowed to read
+CORS_EXPOSE_HEADERS = ['ETag', 'Last-Modified', 'Idempotent-Replayed']
+
 # Media files - user-uploaded content like product images
 # These are different from static files (which are part of the codebase)
 MEDIA_URL = '/media/'  # URL prefix for accessing media files
@@ -0,0 +1,84 @@
+"""
+Fixtures shared by the apps' tests.py files.
+
+Most API tests need the same few rows - a user, the Acme customer, the East
+and West warehouses, the SKU-1 widget and some orders - so they're built here
+instead of in every file. Everything else about a test's data stays in the
+test itself.
+"""
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from customers.models import Customer
+from inventory.models import InventoryItem, Product
+from orders.models import Order, OrderItem
+from warehouses.models import Warehouse
+
+User = get_user_model()
+
+WAREHOUSE_ADDRESSES = {
+    'East': {'address': '1 Main St', 'city': 'Boston', 'state': 'MA', 'zip_code': '02101'},
+    'West': {'address': '2 Main St', 'city': 'Austin', 'state': 'TX', 'zip_code': '73301'},
+}
+
+
+def make_user(username='tester', **extra):
+    return User.objects.create_user(username, f'{username}@example.com', 'pass-12345', **extra)
+
+
+def make_customer(name='Acme', **extra):
+    return Customer.objects.create(name=name, company=f'{name} Inc', email=f'{name.lower()}@example.com', **extra)
+
+
+def make_warehouse(name='East', **extra):
+    return Warehouse.objects.create(name=name, **{**WAREHOUSE_ADDRESSES[name], **extra})
+
+
+def make_product(sku='SKU-1', name='Widget', price=10, **extra):
+    return Product.objects.create(sku=sku, name=name, price=price, **extra)
+
+
+def make_stock(product, warehouse, quantity, **extra):
+    return InventoryItem.objects.create(product=product, warehouse=warehouse, quantity=quantity, **extra)
+
+
+def make_order(user, customer, lines=(), status='pending', warehouse=None, created_at=None, order_number=None):
+    """
+    An order written straight to the tables - no stock, credit or webhook side
+    effects. lines are (product, quantity) pairs priced at product.price, drawn
+    from `warehouse`; created_at backdates it.
+    """
+    order = Order.objects.create(
+        order_number=order_number or f'ORD-{uuid.uuid4().hex[:8].upper()}', customer=customer, user=user, status=status,
+        total_amount=sum(product.price * quantity for product, quantity in lines),
+    )
+    OrderItem.objects.bulk_create([
+        OrderItem(order=order, product=product, warehouse=warehouse, quantity=quantity,
+                  unit_price=product.price, subtotal=product.price * quantity)
+        for product, quantity in lines
+    ])
+    if created_at is not None:
+        Order.objects.filter(pk=order.pk).update(created_at=created_at)
+        order.created_at = created_at
+    return order
+
+
+def days_ago(days):
+    return timezone.now() - timedelta(days=days)
+
+
+class FixtureTestCase(APITestCase):
+    """An API client signed in as self.user, with the Acme customer, both warehouses and the SKU-1 widget."""
+    username = 'tester'
+
+    def setUp(self):
+        self.user = make_user(self.username)
+        self.client.force_authenticate(self.user)
+        self.customer = make_customer()
+        self.east = make_warehouse('East')
+        self.west = make_warehouse('West')
+        self.product = make_product()
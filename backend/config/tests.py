@@ -0,0 +1,169 @@
+import gzip
+import json
+import tempfile
+from pathlib import Path
+
+import brotli
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, router
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.core.exceptions import ImproperlyConfigured
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from customers.models import Customer
+from .compression import CompressionMiddleware
+from .replica import (
+    PRIMARY_ALIAS, REPLICA_ALIAS, ReplicaRoutingMiddleware, RoutingState, _routing_state, replica_configured,
+)
+from .testing import make_user
+
+
+class ReplicaTestCase(TestCase):
+    """
+    Primary and replica as two separate SQLite files. Nothing replicates
+    between them, so a row written to the primary and not copied over with
+    replicate() is exactly what a lagging replica looks like.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        # Stand up a replica unless DATABASE_REPLICA_URL already gave the test run one. Declared
+        # here rather than as a class attribute, which the runner would check before it exists.
+        cls.databases = {PRIMARY_ALIAS, REPLICA_ALIAS}
+        cls.own_replica = not replica_configured()
+        if cls.own_replica:
+            cls.replica_dir = tempfile.TemporaryDirectory()
+            path = str(Path(cls.replica_dir.name) / 'replica.sqlite3')
+            settings.DATABASES[REPLICA_ALIAS] = {
+                'ENGINE': 'django.db.backends.sqlite3', 'NAME': path, 'TEST': {'NAME': path},
+            }
+            connections.configure_settings(settings.DATABASES)
+            connections[REPLICA_ALIAS].creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        if cls.own_replica:
+            connections[REPLICA_ALIAS].close()
+            del connections[REPLICA_ALIAS]
+            del settings.DATABASES[REPLICA_ALIAS]
+            cls.replica_dir.cleanup()
+
+    def replicate(self, *objects):
+        for obj in objects:
+            obj.save(using=REPLICA_ALIAS, force_insert=True)
+
+
+class ReplicaRouterTests(ReplicaTestCase):
+    def route(self, state):
+        token = _routing_state.set(state)
+        try:
+            return router.db_for_read(Customer), router.db_for_write(Customer), router.db_for_read(Customer)
+        finally:
+            _routing_state.reset(token)
+
+    def test_writes_always_go_to_the_primary(self):
+        self.assertEqual(router.db_for_write(Customer), PRIMARY_ALIAS)
+        self.assertEqual(router.db_for_read(Customer), PRIMARY_ALIAS)
+
+    def test_reads_after_a_write_stay_on_the_primary(self):
+        self.assertEqual(self.route(RoutingState(use_replica=True)), (REPLICA_ALIAS, PRIMARY_ALIAS, PRIMARY_ALIAS))
+        self.assertEqual(self.route(RoutingState(use_replica=False)), (PRIMARY_ALIAS, PRIMARY_ALIAS, PRIMARY_ALIAS))
+
+
+class ReplicaRoutingMiddlewareTests(ReplicaTestCase):
+    def setUp(self):
+        # Pins have to be visible to every worker, so the middleware wants a shared cache
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        shared_cache = override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': cache_dir.name,
+        }})
+        shared_cache.enable()
+        self.addCleanup(shared_cache.disable)
+        self.user = make_user('replica')
+        self.other = make_user('other')
+        self.replicate(self.user, self.other)
+        self.client = self.client_for(self.user)
+
+    def client_for(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+        return client
+
+    def queries(self, client, method, path, **kwargs):
+        """Response plus how many queries went to each database."""
+        with CaptureQueriesContext(connections[PRIMARY_ALIAS]) as primary, \
+                CaptureQueriesContext(connections[REPLICA_ALIAS]) as replica:
+            response = getattr(client, method)(path, **kwargs)
+        return response, len(primary), len(replica)
+
+    def test_safe_reads_under_the_prefixes_use_the_replica(self):
+        customer = Customer.objects.create(name='Lagging', company='Acme', email='lag@example.com')
+        response, primary, replica = self.queries(self.client, 'get', '/api/customers/')
+        self.assertEqual((response.status_code, response.data['count']), (200, 0))
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+        # Once the replica catches up the row shows
+        self.replicate(customer)
+        self.assertEqual(self.client.get('/api/customers/').data['count'], 1)
+
+    def test_other_paths_read_the_primary(self):
+        response, primary, replica = self.queries(self.client, 'get', '/api/auth/profile/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(replica, 0)
+
+    def test_client_that_wrote_reads_its_writes(self):
+        response, primary, replica = self.queries(self.client, 'post', '/api/customers/', data={
+            'name': 'Fresh', 'company': 'Acme', 'email': 'fresh@example.com',
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(replica, 0)
+
+        # Pinned to the primary for REPLICA_STICKY_SECONDS, so the new row is there straight away...
+        response, primary, replica = self.queries(self.client, 'get', '/api/customers/')
+        self.assertEqual((response.data['count'], replica), (1, 0))
+        # ...while a client that didn't write still reads the (lagging) replica
+        response, primary, replica = self.queries(self.client_for(self.other), 'get', '/api/customers/')
+        self.assertEqual((response.data['count'], primary), (0, 0))
+
+    def test_refuses_a_process_local_cache(self):
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            with self.assertRaises(ImproperlyConfigured):
+                ReplicaRoutingMiddleware(lambda request: None)
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    body = {'rows': [{'id': i, 'name': f'Product {i}'} for i in range(200)]}
+
+    def compress(self, response, path='/api/inventory/products/', encoding='br, gzip'):
+        request = RequestFactory().get(path, HTTP_ACCEPT_ENCODING=encoding)
+        return CompressionMiddleware(lambda request: response).process_response(request, response)
+
+    def test_brotli_and_gzip_are_padded(self):
+        for encoding, decompress in (('br', brotli.decompress), ('gzip', gzip.decompress)):
+            sizes = set()
+            for _ in range(10):
+                response = self.compress(JsonResponse(self.body), encoding=encoding)
+                self.assertEqual(response['Content-Encoding'], encoding)
+                self.assertEqual(json.loads(decompress(response.content)), self.body)
+                sizes.add(len(response.content))
+            # The same body comes out at different lengths
+            self.assertGreater(len(sizes), 1, encoding)
+
+    def test_streaming_brotli(self):
+        chunks = [json.dumps(self.body).encode()] * 3
+        response = self.compress(StreamingHttpResponse(iter(chunks), content_type='application/json'), encoding='br')
+        self.assertEqual(brotli.decompress(b''.join(response.streaming_content)), b''.join(chunks))
+
+    def test_only_api_json_is_compressed(self):
+        html = '<html>' + 'x' * 5000 + '</html>'
+        self.assertFalse(self.compress(HttpResponse(html)).has_header('Content-Encoding'))
+        self.assertFalse(self.compress(JsonResponse(self.body), path='/admin/').has_header('Content-Encoding'))
+        self.assertFalse(self.compress(JsonResponse({'tiny': 1})).has_header('Content-Encoding'))
@@ -2,19 +2,26 @@
 URL configuration for B2B OMS Platform.
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
+from images.views import serve_variant
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/auth/', include('accounts.urls')),
     path('api/orders/', include('orders.urls')),
+    path('api/archive/', include('archive.urls')),
     path('api/inventory/', include('inventory.urls')),
     path('api/customers/', include('customers.urls')),
     path('api/warehouses/', include('warehouses.urls')),
     path('api/reports/', include('reports.urls')),
+    path('api/picking/', include('picking.urls')),
+    path('api/reservations/', include('reservations.urls')),
     path('api/notifications/', include('notifications.urls')),
+    path('api/', include('monitoring.urls')),
+    # Resized images - served in production too, with immutable cache headers
+    re_path(rf'^{settings.MEDIA_URL.strip("/")}/variants/(?P<path>.+)$', serve_variant),
 ]
 
 if settings.DEBUG:
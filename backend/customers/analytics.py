@@ -0,0 +1,193 @@
+"""
+Customer analytics: RFM segmentation and monthly cohort retention.
+
+Orders (live and archived, cancelled ones left out) are pulled as columns -
+customer id, creation time in epoch seconds, total - into NumPy arrays, and
+every figure comes out of a few sorts and bincounts instead of per-customer
+queries:
+
+  - per customer: order count, total spent, first and last order
+  - recency/frequency/monetary scores, 1-5 by quintile across all customers
+  - a segment from those scores (champions, loyal, at risk, ...)
+  - monthly acquisition cohorts and how many of each came back N months later
+
+Results are stored in CustomerAnalytics/CustomerCohort and served from there.
+A refresh is incremental by default: only customers with orders updated since
+the last run are re-aggregated, then everyone is re-scored from the stored
+figures (quintiles are relative, and recency moves every day). A full refresh
+(nightly, or when too many customers changed) re-reads every order, picks up
+deletes and rebuilds the cohort table.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from archive.models import ArchivedOrder
+from orders.models import Order
+from .models import CustomerAnalytics, CustomerCohort
+
+# Re-read a little before the watermark in case of transactions that committed late
+WATERMARK_OVERLAP = timedelta(minutes=1)
+MONTH_BITS = 12  # Months since 1970 fit in 12 bits until the year 2311
+
+
+def load_orders(customer_ids=None):
+    """(customer, epoch seconds, amount) arrays for every non-cancelled order, optionally for some customers only."""
+    customers, stamps, amounts = [], [], []
+    for model in (Order, ArchivedOrder):
+        queryset = model.objects.exclude(status='cancelled')
+        if customer_ids is not None:
+            queryset = queryset.filter(customer_id__in=customer_ids)
+        rows = list(queryset.values_list('customer_id', 'created_at', 'total_amount').order_by())
+        customers.append(np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows)))
+        stamps.append(np.fromiter((r[1].timestamp() for r in rows), dtype=np.int64, count=len(rows)))
+        amounts.append(np.fromiter((r[2] for r in rows), dtype=np.float64, count=len(rows)))
+    return np.concatenate(customers), np.concatenate(stamps), np.concatenate(amounts)
+
+
+def group_starts(sorted_keys):
+    """Index of the first element of each run of equal keys in a sorted array."""
+    return np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+
+
+def aggregate(customer, ts, amount):
+    """Per-customer (ids, orders, monetary, first_ts, last_ts)."""
+    if not len(customer):
+        return customer, customer, amount, ts, ts
+    order = np.lexsort((ts, customer))
+    customer, ts, amount = customer[order], ts[order], amount[order]
+    starts = group_starts(customer)
+    ends = np.r_[starts[1:], len(customer)] - 1
+    orders = np.diff(np.r_[starts, len(customer)])
+    monetary = np.add.reduceat(amount, starts)
+    return customer[starts], orders, monetary, ts[starts], ts[ends]
+
+
+def quintile_scores(values):
+    """1-5 by quintile (higher value, higher score). Ties share the lower score."""
+    if not len(values):
+        return np.empty(0, dtype=np.int64)
+    below = np.searchsorted(np.sort(values), values, side='left')
+    return 1 + (below * 5) // len(values)
+
+
+def segments(recency, frequency, orders):
+    """Segment names from the scores (first matching rule wins)."""
+    return np.select(
+        [
+            (recency >= 4) & (frequency >= 4),
+            (recency >= 3) & (frequency >= 3),
+            (recency >= 4) & (orders == 1),
+            recency >= 4,
+            (recency <= 2) & (frequency >= 3),
+            (recency == 1) & (frequency <= 2),
+        ],
+        ['champions', 'loyal', 'new', 'promising', 'at_risk', 'lost'],
+        default='needs_attention',
+    )
+
+
+def cohort_counts(customer, ts):
+    """[(cohort month as a date, period, customers)] from every order's customer and time."""
+    month = ts.astype('datetime64[s]').astype('datetime64[M]').astype(np.int64)
+    # Distinct (customer, month) pairs, sorted by customer then month
+    pairs = np.unique((customer << MONTH_BITS) | month)
+    pair_customer, pair_month = pairs >> MONTH_BITS, pairs & ((1 << MONTH_BITS) - 1)
+    starts = group_starts(pair_customer)
+    first_month = np.repeat(pair_month[starts], np.diff(np.r_[starts, len(pairs)]))
+    period = pair_month - first_month
+    keys, counts = np.unique((first_month << MONTH_BITS) | period, return_counts=True)
+    return [
+        (np.datetime64(int(key >> MONTH_BITS), 'M').astype('datetime64[D]').item(), int(key & ((1 << MONTH_BITS) - 1)), int(count))
+        for key, count in zip(keys.tolist(), counts.tolist())
+    ]
+
+
+def rescore(now):
+    """Re-score every stored customer from their stored figures; only rows whose scores moved are written."""
+    rows = list(CustomerAnalytics.objects.values_list(
+        'customer_id', 'last_order_at', 'orders', 'monetary',
+        'recency_score', 'frequency_score', 'monetary_score', 'segment',
+    ))
+    if not rows:
+        return 0
+    ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+    last = np.fromiter((r[1].timestamp() for r in rows), dtype=np.int64, count=len(rows))
+    orders = np.fromiter((r[2] for r in rows), dtype=np.int64, count=len(rows))
+    monetary = np.fromiter((r[3] for r in rows), dtype=np.float64, count=len(rows))
+
+    recency = quintile_scores(last)  # Later last order = higher score
+    frequency = quintile_scores(orders)
+    spend = quintile_scores(monetary)
+    segment = segments(recency, frequency, orders)
+
+    changed = [
+        CustomerAnalytics(
+            customer_id=customer_id, recency_score=r, frequency_score=f, monetary_score=m, segment=s, scored_at=now,
+        )
+        for customer_id, r, f, m, s, old in zip(
+            ids.tolist(), recency.tolist(), frequency.tolist(), spend.tolist(), segment.tolist(), rows,
+        )
+        if (r, f, m, s) != old[4:]
+    ]
+    CustomerAnalytics.objects.bulk_update(
+        changed, ['recency_score', 'frequency_score', 'monetary_score', 'segment', 'scored_at'], batch_size=1000,
+    )
+    return len(changed)
+
+
+def refresh(full=False):
+    """Bring the stored analytics up to date. Returns (customers re-aggregated, whether it was a full pass)."""
+    now = timezone.now()
+    latest = CustomerAnalytics.objects.aggregate(latest=Max('aggregated_at'))['latest']
+    scope = None
+    if not full and latest is not None:
+        scope = list(
+            Order.objects.filter(updated_at__gte=latest - WATERMARK_OVERLAP)
+            .values_list('customer_id', flat=True).distinct().order_by()
+        )
+        # Past a point re-reading everything is cheaper than a huge IN list
+        full = len(scope) > settings.ANALYTICS_MAX_INCREMENTAL_CUSTOMERS
+    if full or latest is None:
+        full, scope = True, None
+
+    customer, ts, amount = load_orders(scope)
+    ids, orders, monetary, first, last = aggregate(customer, ts, amount)
+    with transaction.atomic():
+        CustomerAnalytics.objects.bulk_create(
+            [
+                CustomerAnalytics(
+                    customer_id=customer_id, orders=count,
+                    monetary=Decimal(f'{total:.2f}'),
+                    first_order_at=datetime.fromtimestamp(first_ts, dt_timezone.utc),
+                    last_order_at=datetime.fromtimestamp(last_ts, dt_timezone.utc),
+                    aggregated_at=now, scored_at=now,
+                )
+                for customer_id, count, total, first_ts, last_ts in zip(
+                    ids.tolist(), orders.tolist(), monetary.tolist(), first.tolist(), last.tolist(),
+                )
+            ],
+            update_conflicts=True,
+            unique_fields=['customer'],
+            update_fields=['orders', 'monetary', 'first_order_at', 'last_order_at', 'aggregated_at'],
+            batch_size=2000,
+        )
+        # Rows in scope the upsert didn't touch: customers whose last counted order was cancelled or deleted
+        gone = CustomerAnalytics.objects.filter(aggregated_at__lt=now)
+        if scope is not None:
+            gone = gone.filter(customer_id__in=scope)
+        gone.delete()
+
+        rescore(now)
+        if full:
+            CustomerCohort.objects.all().delete()
+            CustomerCohort.objects.bulk_create([
+                CustomerCohort(cohort=cohort, period=period, customers=count, computed_at=now)
+                for cohort, period, count in cohort_counts(customer, ts)
+            ], batch_size=5000)
+    return len(ids), full
@@ -0,0 +1,84 @@
+"""
+Customer credit exposure.
+
+Customer.open_balance is a running total of the customer's open orders
+(pending, processing or shipped). It's moved with a single UPDATE whenever an
+order is created, changes status or customer, or is deleted, so checking a
+new order against the credit limit never adds up the customer's orders.
+Delivered and cancelled orders don't count. A credit_limit of 0 means no limit.
+
+Only new orders are checked against the limit - status changes always go
+through, so a reopened order or a lowered limit can leave a customer over it
+(see CustomerViewSet.over_limit). `manage.py recompute_open_balances` rebuilds
+every counter from the orders table if they ever drift (e.g. after edits in
+the Django admin).
+"""
+from decimal import Decimal
+
+from django.db.models import F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from orders.models import Order
+from .models import Customer
+
+OPEN_STATUSES = ['pending', 'processing', 'shipped']
+
+
+def open_amount(status, total_amount):
+    """What an order in this status adds to its customer's open balance."""
+    return total_amount if status in OPEN_STATUSES else Decimal('0')
+
+
+def reserve_credit(customer_id, amount):
+    """
+    Add a new order's total to the customer's open balance, unless that would
+    take it over the credit limit. Check and increment are one conditional
+    UPDATE, so concurrent checkouts can't both squeeze under the limit.
+    Returns False (and changes nothing) when the order is refused.
+    Call inside the transaction that creates the order.
+    """
+    return Customer.objects.filter(pk=customer_id).filter(
+        Q(credit_limit=0) | Q(open_balance__lte=F('credit_limit') - amount)
+    ).update(open_balance=F('open_balance') + amount, updated_at=timezone.now()) == 1
+
+
+def adjust_open_balance(customer_id, amount):
+    if amount:
+        Customer.objects.filter(pk=customer_id).update(open_balance=F('open_balance') + amount, updated_at=timezone.now())
+
+
+def order_changed(order, old_customer_id, old_status):
+    """Move an existing order's exposure after its status or customer changed (no limit check)."""
+    old = open_amount(old_status, order.total_amount)
+    new = open_amount(order.status, order.total_amount)
+    if old_customer_id == order.customer_id:
+        adjust_open_balance(order.customer_id, new - old)
+    else:
+        adjust_open_balance(old_customer_id, -old)
+        adjust_open_balance(order.customer_id, new)
+
+
+def order_deleted(order):
+    adjust_open_balance(order.customer_id, -open_amount(order.status, order.total_amount))
+
+
+def available_credit(customer):
+    """Credit left before new orders are refused, or None when the customer has no limit."""
+    if not customer.credit_limit:
+        return None
+    return customer.credit_limit - customer.open_balance
+
+
+def over_limit():
+    """Customers whose open balance is above their limit - served by the customers_over_limit_idx partial index."""
+    return Customer.objects.filter(credit_limit__gt=0, open_balance__gt=F('credit_limit'))
+
+
+def recompute_open_balances():
+    """Rebuild every customer's open balance from their open orders in one statement. Returns rows updated."""
+    open_totals = (
+        Order.objects.filter(customer=OuterRef('pk'), status__in=OPEN_STATUSES)
+        .values('customer').annotate(total=Sum('total_amount')).values('total')
+    )
+    return Customer.objects.update(open_balance=Coalesce(Subquery(open_totals), Value(Decimal('0'))))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from customers.models import Customer
+from customers.tasks import geocode_customer
+from jobs.queue import enqueue
+
+
+class Command(BaseCommand):
+    """
+    Queue geocoding jobs for customers with an address but no coordinates
+    (e.g. created before customers were geocoded). Jobs are spaced a second
+    apart - Nominatim's usage policy allows one request per second.
+    """
+    help = 'Queue background geocoding for customers without coordinates.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, help='Queue at most this many.')
+
+    def handle(self, *args, **options):
+        customers = Customer.objects.filter(latitude__isnull=True).exclude(address='').order_by('id')
+        ids = list(customers.values_list('id', flat=True)[:options['limit']])
+        for position, customer_id in enumerate(ids):
+            enqueue(geocode_customer, kwargs={'customer_id': customer_id}, delay=position)
+        self.stdout.write(self.style.SUCCESS(f'Queued geocoding for {len(ids)} customer(s).'))
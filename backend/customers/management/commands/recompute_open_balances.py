@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from customers.credit import recompute_open_balances
+
+
+class Command(BaseCommand):
+    """
+    Rebuild every customer's open balance from their open orders.
+    The counters are kept up to date as orders change, so this is only needed
+    after bulk imports or edits made outside the API (e.g. in the Django admin).
+    Best run while no orders are being placed.
+    """
+    help = 'Recompute Customer.open_balance from the orders table.'
+
+    def handle(self, *args, **options):
+        updated = recompute_open_balances()
+        self.stdout.write(self.style.SUCCESS(f'Recomputed open balances for {updated} customer(s).'))
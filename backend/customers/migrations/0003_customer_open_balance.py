@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:18
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_open_balances(apps, schema_editor):
+    # Same as customers.credit.recompute_open_balances, against the historical models
+    Customer = apps.get_model('customers', 'Customer')
+    Order = apps.get_model('orders', 'Order')
+    open_totals = (
+        Order.objects.filter(customer=OuterRef('pk'), status__in=['pending', 'processing', 'shipped'])
+        .values('customer').annotate(total=Sum('total_amount')).values('total')
+    )
+    Customer.objects.update(open_balance=Coalesce(Subquery(open_totals), Value(Decimal('0'))))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_customer_updated_at_index'),
+        ('orders', '0005_order_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='open_balance',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.RunPython(backfill_open_balances, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(condition=models.Q(('credit_limit__gt', 0), ('open_balance__gt', models.F('credit_limit'))), fields=['open_balance'], name='customers_over_limit_idx'),
+        ),
+    ]
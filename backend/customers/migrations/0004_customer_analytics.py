@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0003_customer_open_balance'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerAnalytics',
+            fields=[
+                ('customer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='analytics', serialize=False, to='customers.customer')),
+                ('first_order_at', models.DateTimeField()),
+                ('last_order_at', models.DateTimeField()),
+                ('orders', models.PositiveIntegerField()),
+                ('monetary', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('recency_score', models.PositiveSmallIntegerField(default=1)),
+                ('frequency_score', models.PositiveSmallIntegerField(default=1)),
+                ('monetary_score', models.PositiveSmallIntegerField(default=1)),
+                ('segment', models.CharField(choices=[('champions', 'Champions'), ('loyal', 'Loyal'), ('new', 'New'), ('promising', 'Promising'), ('needs_attention', 'Needs attention'), ('at_risk', 'At risk'), ('lost', 'Lost')], default='needs_attention', max_length=20)),
+                ('aggregated_at', models.DateTimeField()),
+                ('scored_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CustomerCohort',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cohort', models.DateField()),
+                ('period', models.PositiveSmallIntegerField()),
+                ('customers', models.PositiveIntegerField()),
+                ('computed_at', models.DateTimeField()),
+            ],
+            options={
+                'ordering': ['cohort', 'period'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='customercohort',
+            constraint=models.UniqueConstraint(fields=('cohort', 'period'), name='customers_cohort_period_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='customeranalytics',
+            index=models.Index(fields=['segment', 'monetary'], name='customers_c_segment_dfec3e_idx'),
+        ),
+    ]
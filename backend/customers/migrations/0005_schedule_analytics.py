@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:24
+
+from django.db import migrations
+
+SCHEDULE = [
+    ('Customer analytics (incremental)', {}, 15 * 60),
+    ('Customer analytics (full)', {'full': True}, 24 * 3600),
+]
+
+
+def add_schedule(apps, schema_editor):
+    PeriodicJob = apps.get_model('jobs', 'PeriodicJob')
+    for name, options, interval in SCHEDULE:
+        PeriodicJob.objects.get_or_create(name=name, defaults={
+            'task': 'jobs.tasks.run_command',
+            'kwargs': {'command': 'refresh_customer_analytics', 'options': options},
+            'interval_seconds': interval,
+        })
+
+
+def remove_schedule(apps, schema_editor):
+    PeriodicJob = apps.get_model('jobs', 'PeriodicJob')
+    PeriodicJob.objects.filter(name__in=[name for name, _, _ in SCHEDULE]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0004_customer_analytics'),
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_schedule, remove_schedule),
+    ]
@@ -16,16 +16,83 @@ class Customer(models.Model):
     email = models.EmailField(unique=True)
     phone = models.CharField(max_length=20, blank=True)
     address = models.TextField(blank=True)
+    # Filled in from address by a background geocoding job - delivery routing needs them
+    latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
     credit_limit = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     payment_terms = models.CharField(max_length=50, default='Net 30')
+    # Running total of open (pending/processing/shipped) orders - kept up to date by customers.credit
+    open_balance = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='customers_created')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            # Change feeds page through rows by (updated_at, id)
+            models.Index(fields=['updated_at', 'id']),
+            # Only customers over their limit are in here, so listing them is one small index read
+            models.Index(
+                fields=['open_balance'],
+                condition=models.Q(credit_limit__gt=0, open_balance__gt=models.F('credit_limit')),
+                name='customers_over_limit_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.company})"
 
+
+
+class CustomerAnalytics(models.Model):
+    """RFM snapshot for one customer, kept up to date by `manage.py refresh_customer_analytics`."""
+    SEGMENT_CHOICES = [
+        ('champions', 'Champions'),
+        ('loyal', 'Loyal'),
+        ('new', 'New'),
+        ('promising', 'Promising'),
+        ('needs_attention', 'Needs attention'),
+        ('at_risk', 'At risk'),
+        ('lost', 'Lost'),
+    ]
+
+    customer = models.OneToOneField(Customer, on_delete=models.CASCADE, primary_key=True, related_name='analytics')
+    # Raw figures over every non-cancelled order, live and archived
+    first_order_at = models.DateTimeField()
+    last_order_at = models.DateTimeField()
+    orders = models.PositiveIntegerField()
+    monetary = models.DecimalField(max_digits=14, decimal_places=2)
+    # 1-5 by quintile across all customers (5 = most recent / most frequent / biggest spender)
+    recency_score = models.PositiveSmallIntegerField(default=1)
+    frequency_score = models.PositiveSmallIntegerField(default=1)
+    monetary_score = models.PositiveSmallIntegerField(default=1)
+    segment = models.CharField(max_length=20, choices=SEGMENT_CHOICES, default='needs_attention')
+    aggregated_at = models.DateTimeField()  # Raw figures recomputed - the incremental refresh watermark
+    scored_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['segment', 'monetary']),
+        ]
+
+    def __str__(self):
+        return f"{self.customer_id}: {self.segment}"
+
+
+class CustomerCohort(models.Model):
+    """Of the customers whose first order was in `cohort`, how many ordered `period` months later."""
+    cohort = models.DateField()  # First day of the month
+    period = models.PositiveSmallIntegerField()
+    customers = models.PositiveIntegerField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['cohort', 'period']
+        constraints = [
+            models.UniqueConstraint(fields=['cohort', 'period'], name='customers_cohort_period_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.cohort:%Y-%m} +{self.period}: {self.customers}"
@@ -1,28 +1,87 @@
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, OuterRef, Prefetch, Subquery, Sum, Value, Window
+from django.db.models.functions import Coalesce, RowNumber
 from rest_framework import serializers
 from .models import Customer
-from orders.serializers import OrderSerializer
+from .credit import available_credit
+from archive.reads import history_sources
+from orders.models import Order
+from orders.serializers import OrderSerializer, order_prefetches
+
+RECENT_ORDERS = 5
+CENTS = Decimal('0.01')
+MONEY = DecimalField(max_digits=14, decimal_places=2)
+
+
+def with_order_totals(queryset):
+    """
+    Annotate order_count and delivered_total, counting archived orders too
+    (one pair of subqueries per source in archive.reads.history_sources).
+    """
+    count, spent = Value(0), Value(Decimal('0'), output_field=MONEY)
+    for orders, _ in history_sources():
+        rows = orders.objects.filter(customer=OuterRef('pk')).order_by().values('customer')
+        count = count + Coalesce(Subquery(rows.annotate(n=Count('pk')).values('n')), 0)
+        delivered = rows.filter(status='delivered').annotate(total=Sum('total_amount')).values('total')
+        spent = spent + Coalesce(Subquery(delivered), Value(Decimal('0')), output_field=MONEY)
+    return queryset.annotate(order_count=count, delivered_total=spent)
+
+
+def with_order_summary(queryset):
+    """
+    Everything CustomerSerializer shows about orders: the totals, and each
+    customer's RECENT_ORDERS latest live orders - a fixed number of queries per
+    page instead of several per customer.
+    """
+    recent = Order.objects.annotate(
+        recency=Window(RowNumber(), partition_by='customer_id', order_by=['-created_at', '-id']),
+    ).filter(recency__lte=RECENT_ORDERS).order_by('-created_at', '-id')
+    return with_order_totals(queryset).prefetch_related(
+        Prefetch('orders', queryset=recent.prefetch_related(*order_prefetches()), to_attr='recent_order_list'),
+    )
 
 
 class CustomerSerializer(serializers.ModelSerializer):
     total_orders = serializers.SerializerMethodField()
     total_spent = serializers.SerializerMethodField()
     recent_orders = serializers.SerializerMethodField()
+    available_credit = serializers.SerializerMethodField()
 
     class Meta:
         model = Customer
-        fields = ('id', 'name', 'company', 'email', 'phone', 'address', 'status',
-                  'credit_limit', 'payment_terms', 'total_orders', 'total_spent',
-                  'recent_orders', 'created_at', 'updated_at')
-        read_only_fields = ('id', 'created_at', 'updated_at')
+        fields = ('id', 'name', 'company', 'email', 'phone', 'address', 'latitude', 'longitude', 'status',
+                  'credit_limit', 'payment_terms', 'open_balance', 'available_credit',
+                  'total_orders', 'total_spent', 'recent_orders', 'created_at', 'updated_at')
+        # open_balance is maintained by customers.credit as orders come and go
+        read_only_fields = ('id', 'open_balance', 'created_at', 'updated_at')
+
+    def get_available_credit(self, obj):
+        credit = available_credit(obj)
+        return None if credit is None else str(credit)
+
+    # Lists come from CustomerViewSet with these annotated/prefetched (see with_order_summary);
+    # a single customer fresh from a save is looked up on its own
+
+    def _totals(self, obj):
+        if not hasattr(obj, 'order_count'):
+            obj.order_count, obj.delivered_total = with_order_totals(Customer.objects.filter(pk=obj.pk)).values_list(
+                'order_count', 'delivered_total'
+            ).get()
+        return obj.order_count, obj.delivered_total
 
     def get_total_orders(self, obj):
-        return obj.orders.count()
+        return self._totals(obj)[0]
 
     def get_total_spent(self, obj):
-        total = sum(order.total_amount for order in obj.orders.filter(status='delivered'))
-        return str(total)
+        # SQLite's SUM comes back with extra decimal places
+        return str(Decimal(self._totals(obj)[1]).quantize(CENTS))
 
+    # Live orders only - archived ones are finished and over ARCHIVE_AFTER_DAYS old (see /api/archive/orders/)
     def get_recent_orders(self, obj):
-        orders = obj.orders.all().order_by('-created_at')[:5]
+        if hasattr(obj, 'recent_order_list'):
+            orders = obj.recent_order_list
+        else:
+            orders = obj.orders.all().order_by('-created_at')[:RECENT_ORDERS]
         return OrderSerializer(orders, many=True).data
 
@@ -0,0 +1,18 @@
+from django.utils import timezone
+
+from jobs.queue import task
+from warehouses.geocoding import geocode
+from .models import Customer
+
+
+@task
+def geocode_customer(customer_id):
+    """Look up and store coordinates for a customer's address (used by delivery routing)."""
+    customer = Customer.objects.filter(pk=customer_id).first()
+    if customer is None or not customer.address.strip():
+        return
+    coords = geocode(customer.address)
+    if coords:
+        Customer.objects.filter(pk=customer_id).update(
+            latitude=coords[0], longitude=coords[1], updated_at=timezone.now()
+        )
@@ -0,0 +1,48 @@
+from datetime import datetime, timezone as dt_timezone
+
+from rest_framework.test import APITestCase
+
+from config.testing import make_customer, make_order, make_product, make_user
+from .analytics import refresh
+from .models import CustomerAnalytics
+
+
+class AnalyticsTests(APITestCase):
+    def setUp(self):
+        self.user = make_user('analytics')
+        self.client.force_authenticate(self.user)
+        self.product = make_product()
+        self.regular, self.once = make_customer('Regular'), make_customer('Once')
+        self.order(self.regular, 2026, 1, 10)
+        self.order(self.regular, 2026, 2, 5)
+        self.order(self.once, 2026, 1, 2)
+        self.order(self.once, 2026, 3, 50, status='cancelled')  # Cancelled orders don't count
+        refresh(full=True)
+
+    def order(self, customer, year, month, quantity, status='delivered'):
+        make_order(self.user, customer, [(self.product, quantity)], status=status,
+                   created_at=datetime(year, month, 15, tzinfo=dt_timezone.utc))
+
+    def test_refresh_scores_customers(self):
+        regular = CustomerAnalytics.objects.get(customer=self.regular)
+        self.assertEqual((regular.orders, regular.monetary, regular.segment), (2, 150, 'loyal'))
+        once = CustomerAnalytics.objects.get(customer=self.once)
+        self.assertEqual((once.orders, once.monetary, once.segment), (1, 20, 'lost'))
+
+    def test_rfm_lists_a_segment(self):
+        response = self.client.get('/api/customers/rfm/?segment=loyal&limit=1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['name'] for row in response.data['customers']], ['Regular'])
+        loyal = next(row for row in response.data['segments'] if row['segment'] == 'loyal')
+        self.assertEqual((loyal['customers'], loyal['revenue']), (1, 150.0))
+
+    def test_cohorts(self):
+        response = self.client.get('/api/customers/cohorts/?months=1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['cohorts'], [{'cohort': '2026-01', 'size': 2, 'retention': [100.0, 50.0]}])
+
+    def test_bad_limits_are_rejected(self):
+        for url in ('/api/customers/rfm/?segment=loyal&limit=-1', '/api/customers/rfm/?segment=loyal&limit=x',
+                    '/api/customers/cohorts/?months=0', '/api/customers/cohorts/?months=-3'):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 400, url)
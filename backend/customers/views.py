@@ -2,18 +2,24 @@ from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from .models import Customer
-from .serializers import CustomerSerializer
+from .models import Customer, CustomerAnalytics, CustomerCohort
+from .serializers import CustomerSerializer, with_order_summary
+from .credit import over_limit
+from .tasks import geocode_customer
 from orders.models import Order
-from django.db.models import Sum, Avg, Q
+from django.db.models import Sum, Avg, Count, Max, Q, F
+from django.utils import timezone
+from config.params import positive_int
+from sync.feeds import ChangeFeedMixin
+from jobs.queue import enqueue
 
-class CustomerViewSet(viewsets.ModelViewSet):
+class CustomerViewSet(ChangeFeedMixin, viewsets.ModelViewSet):
     """ViewSet for Customer CRUD operations."""
     serializer_class = CustomerSerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        queryset = Customer.objects.all().prefetch_related('orders')
+        queryset = with_order_summary(Customer.objects.all())
         
         # Search functionality
         search = self.request.query_params.get('search')
@@ -26,8 +32,40 @@ class CustomerViewSet(viewsets.ModelViewSet):
             
         return queryset
 
+    # Geocoding calls out to Nominatim, so it runs as a background job after the save
     def perform_create(self, serializer):
-        serializer.save(created_by=self.request.user)
+        customer = serializer.save(created_by=self.request.user)
+        if customer.address and (customer.latitude is None or customer.longitude is None):
+            enqueue(geocode_customer, kwargs={'customer_id': customer.id})
+
+    def perform_update(self, serializer):
+        """Re-geocode when the address changes, unless coordinates came with it."""
+        address_changed = serializer.validated_data.get('address', serializer.instance.address) != serializer.instance.address
+        coords_given = 'latitude' in serializer.validated_data or 'longitude' in serializer.validated_data
+        if address_changed and not coords_given:
+            # The old coordinates point at the old address - routing skips the customer until the job is done
+            customer = serializer.save(latitude=None, longitude=None)
+            if customer.address:
+                enqueue(geocode_customer, kwargs={'customer_id': customer.id})
+        else:
+            serializer.save()
+
+    # GET /customers/over_limit/ - customers whose open orders exceed their credit limit
+    @action(detail=False, methods=['get'])
+    def over_limit(self, request):
+        """Customers over their credit limit, furthest over first."""
+        customers = over_limit().order_by(F('credit_limit') - F('open_balance'))
+        return Response([
+            {
+                'id': customer.id,
+                'name': customer.name,
+                'company': customer.company,
+                'credit_limit': customer.credit_limit,
+                'open_balance': customer.open_balance,
+                'over_by': customer.open_balance - customer.credit_limit,
+            }
+            for customer in customers
+        ])
 
     @action(detail=False, methods=['get'])
     def stats(self, request):
@@ -36,8 +74,10 @@ class CustomerViewSet(viewsets.ModelViewSet):
         # active_customers = Customer.objects.filter(is_active=True).count() # Assuming is_active exists, if not using total
         active_customers = total_customers # Placeholder if no inactive logic yet
         
-        total_revenue = Order.objects.aggregate(Sum('total_amount'))['total_amount__sum'] or 0
-        avg_value = Order.objects.aggregate(Avg('total_amount'))['total_amount__avg'] or 0
+        # Both figures in one pass over the orders
+        totals = Order.objects.aggregate(revenue=Sum('total_amount'), avg=Avg('total_amount'))
+        total_revenue = totals['revenue'] or 0
+        avg_value = totals['avg'] or 0
         
         return Response({
             'total': total_customers,
@@ -46,3 +86,69 @@ class CustomerViewSet(viewsets.ModelViewSet):
             'avgValue': avg_value
         })
 
+    # GET /customers/rfm/ - customers per RFM segment (?segment=at_risk lists that segment's biggest spenders)
+    @action(detail=False, methods=['get'])
+    def rfm(self, request):
+        """RFM segments from the last analytics refresh."""
+        analytics = CustomerAnalytics.objects.all()
+        summary = analytics.values('segment').annotate(
+            customers=Count('pk'), revenue=Sum('monetary'), avg_orders=Avg('orders'),
+        ).order_by()
+        by_segment = {row['segment']: row for row in summary}
+        data = {
+            'computed_at': analytics.aggregate(latest=Max('scored_at'))['latest'],
+            'segments': [
+                {
+                    'segment': segment,
+                    'label': label,
+                    'customers': by_segment.get(segment, {}).get('customers', 0),
+                    'revenue': float(by_segment.get(segment, {}).get('revenue') or 0),
+                    'avg_orders': round(by_segment.get(segment, {}).get('avg_orders') or 0, 1),
+                }
+                for segment, label in CustomerAnalytics.SEGMENT_CHOICES
+            ],
+        }
+
+        segment = request.query_params.get('segment')
+        if segment:
+            now = timezone.now()
+            limit = positive_int(request, 'limit', 50, maximum=500)
+            data['customers'] = [
+                {
+                    'id': row.customer_id,
+                    'name': row.customer.name,
+                    'company': row.customer.company,
+                    'recency_days': (now - row.last_order_at).days,
+                    'orders': row.orders,
+                    'monetary': float(row.monetary),
+                    'scores': f'{row.recency_score}{row.frequency_score}{row.monetary_score}',
+                }
+                for row in analytics.filter(segment=segment).select_related('customer').order_by('-monetary')[:limit]
+            ]
+        return Response(data)
+
+    # GET /customers/cohorts/?months=12 - retention of each monthly acquisition cohort
+    @action(detail=False, methods=['get'])
+    def cohorts(self, request):
+        """Cohort retention matrix from the last full analytics refresh (percent of each cohort ordering N months in)."""
+        months = positive_int(request, 'months', 12)
+        rows = list(CustomerCohort.objects.all())
+        cohorts = {}
+        for row in rows:
+            cohorts.setdefault(row.cohort, {})[row.period] = row.customers
+        data = []
+        for cohort in sorted(cohorts)[-months:]:
+            counts = cohorts[cohort]
+            size = counts.get(0, 0)
+            data.append({
+                'cohort': cohort.strftime('%Y-%m'),
+                'size': size,
+                'retention': [
+                    round(counts.get(period, 0) / size * 100, 1) if size else 0
+                    for period in range(max(counts) + 1)
+                ],
+            })
+        return Response({
+            'computed_at': rows[0].computed_at if rows else None,
+            'cohorts': data,
+        })
@@ -0,0 +1,88 @@
+"""
+Idempotency-Key support for write endpoints.
+
+Decorate a ViewSet method with @idempotent and a client can send
+`Idempotency-Key: <uuid>` with the request. The first request runs as usual
+and its response is stored; a retry with the same key gets the stored
+response back (marked `Idempotent-Replayed: true`) without running the
+view again - so a timed-out POST /api/orders/ can't create a second order
+or take the stock twice.
+"""
+import functools
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import IdempotencyKey
+
+MAX_KEY_LENGTH = 255
+
+
+def _sha256(value):
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+def _claim(key_hash, request_hash):
+    """
+    Insert the row for this key, or return the committed one if the key was already used.
+    Must run inside the request's transaction: a concurrent request with the same key
+    blocks on the insert until that transaction commits (and replays) or rolls back (and claims).
+    """
+    now = timezone.now()
+    # Expired but not purged yet - treat it as a fresh key
+    IdempotencyKey.objects.filter(key_hash=key_hash, expires_at__lte=now).delete()
+    try:
+        with transaction.atomic():
+            IdempotencyKey.objects.create(
+                key_hash=key_hash, request_hash=request_hash,
+                expires_at=now + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS),
+            )
+        return None
+    except IntegrityError:
+        return IdempotencyKey.objects.get(key_hash=key_hash)
+
+
+def idempotent(view_method):
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response({'error': f'Idempotency-Key must be at most {MAX_KEY_LENGTH} characters.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        key_hash = _sha256(f'{request.user.pk}:{request.method}:{request.path}:{key}')
+        request_hash = _sha256(json.dumps(request.data, sort_keys=True, cls=JSONEncoder))
+
+        # The key row commits with the view's writes or not at all, so there is never a
+        # claimed key without its response (or a write without its key) for a retry to trip over
+        with transaction.atomic():
+            existing = _claim(key_hash, request_hash)
+            if existing is not None:
+                if existing.request_hash != request_hash:
+                    return Response({'error': 'Idempotency-Key was already used with a different request.'},
+                                    status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+                body = bytes(existing.response_body)
+                replay = Response(json.loads(body) if body else None, status=existing.status_code)
+                replay['Idempotent-Replayed'] = 'true'
+                return replay
+
+            # An exception rolls the key back along with everything else, so the client can retry
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code >= 500:
+                IdempotencyKey.objects.filter(key_hash=key_hash).delete()
+            else:
+                body = json.dumps(response.data, cls=JSONEncoder).encode() if response.data is not None else b''
+                IdempotencyKey.objects.filter(key_hash=key_hash).update(
+                    status_code=response.status_code, response_body=body
+                )
+            return response
+    return wrapper
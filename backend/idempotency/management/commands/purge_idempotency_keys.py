@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from idempotency.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    """Delete expired idempotency keys. Run hourly or daily from cron."""
+    help = 'Delete idempotency keys past their TTL.'
+
+    def handle(self, *args, **options):
+        deleted, _ = IdempotencyKey.objects.filter(expires_at__lte=timezone.now()).delete()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired key(s).'))
@@ -0,0 +1,19 @@
+from django.db import models
+
+
+class IdempotencyKey(models.Model):
+    """
+    A client-supplied Idempotency-Key and the response we sent for it.
+    Rows are keyed by a hash of (user, method, path, key) and expire after
+    IDEMPOTENCY_KEY_TTL_HOURS. The row commits in the same transaction as the
+    request's writes, so a committed row always has its status_code and body.
+    """
+    key_hash = models.CharField(max_length=64, primary_key=True)
+    request_hash = models.CharField(max_length=64)  # Same key with a different body is rejected
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.BinaryField(blank=True, default=b'')
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.key_hash
@@ -0,0 +1,57 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.utils import timezone
+
+from inventory.models import InventoryItem
+from orders.models import Order
+from orders.tests import OrderTestCase
+from .models import IdempotencyKey
+
+
+class IdempotentOrderTests(OrderTestCase):
+    def setUp(self):
+        super().setUp()
+        self.item = self.stock(self.east, 10)
+
+    def create_order(self, quantity, key='submit-1'):
+        return self.client.post('/api/orders/', {
+            'customer': self.customer.id,
+            'items': [{'product_id': self.product.id, 'quantity': quantity, 'unit_price': '10.00'}],
+        }, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_the_first_order(self):
+        first = self.create_order(4)
+        self.assertEqual(first.status_code, 201)
+        retry = self.create_order(4)
+        self.assertEqual((retry.status_code, retry['Idempotent-Replayed']), (201, 'true'))
+        self.assertEqual(retry.data['id'], first.data['id'])
+        self.assertEqual(Order.objects.count(), 1)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.quantity, 6)
+
+        self.assertEqual(self.create_order(5).status_code, 422)
+        self.assertEqual(self.create_order(5, key='submit-2').status_code, 201)
+
+    def test_failed_request_leaves_neither_the_write_nor_the_key(self):
+        # Fails after the order row was written
+        with mock.patch('orders.views.create_notification', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.create_order(4)
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(IdempotencyKey.objects.exists())
+        self.assertEqual(InventoryItem.objects.get(pk=self.item.pk).quantity, 10)
+
+        response = self.create_order(4)
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn('Idempotent-Replayed', response)
+
+    def test_stored_key_always_has_its_response(self):
+        self.create_order(4)
+        key = IdempotencyKey.objects.get()
+        self.assertEqual(key.status_code, 201)
+
+        # Once expired, the key is free again
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.create_order(5).status_code, 201)
+        self.assertEqual(Order.objects.count(), 2)
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class ImagesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'images'
+
+    def ready(self):
+        # Registers the post_save handlers that queue variant generation
+        from . import signals  # noqa: F401
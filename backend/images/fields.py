@@ -0,0 +1,29 @@
+from django.core.files.storage import default_storage
+from rest_framework import serializers
+
+from .variants import FORMATS
+
+
+class SrcsetField(serializers.Field):
+    """
+    A variants map as srcset strings, one per format:
+        {"webp": "https://.../chair-64w.3f9c.webp 64w, ...", "jpeg": "..."}
+    None until the variants job has run (clients fall back to the original image).
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, variants):
+        if not variants or not variants.get('source'):
+            return None
+        request = self.context.get('request')
+        srcset = {}
+        for fmt in FORMATS:
+            entries = []
+            for width, name in sorted(variants.get(fmt, {}).items(), key=lambda item: int(item[0])):
+                url = default_storage.url(name)
+                entries.append(f'{request.build_absolute_uri(url) if request else url} {width}w')
+            srcset[fmt] = ', '.join(entries)
+        return srcset
@@ -0,0 +1,21 @@
+from django.db.models.signals import post_save
+
+from accounts.models import User
+from inventory.models import Product
+from jobs.queue import enqueue
+from .tasks import generate_image_variants
+from .variants import IMAGE_FIELDS
+
+
+def image_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    label = sender._meta.label_lower
+    image_field, variants_field = IMAGE_FIELDS[label]
+    if raw or (update_fields is not None and image_field not in update_fields):
+        return
+    # Only when the image differs from the one the variants were made from (new upload or cleared)
+    if (getattr(instance, image_field).name or '') != (getattr(instance, variants_field) or {}).get('source', ''):
+        enqueue(generate_image_variants, kwargs={'model': label, 'pk': instance.pk})
+
+
+for model in (Product, User):
+    post_save.connect(image_saved, sender=model, dispatch_uid=f'images.variants.{model._meta.label_lower}')
@@ -0,0 +1,35 @@
+from django.apps import apps
+from django.db import transaction
+
+from jobs.queue import task
+from .variants import IMAGE_FIELDS, build_variants, delete_variants, variant_files
+
+
+@task
+def generate_image_variants(model, pk, force=False):
+    """(Re)build the resized variants of a product image or avatar, and drop the ones it no longer uses."""
+    image_field, variants_field = IMAGE_FIELDS[model]
+    Model = apps.get_model(model)
+    obj = Model.objects.filter(pk=pk).only(image_field, variants_field).first()
+    if obj is None:
+        return
+    image = getattr(obj, image_field)
+    old = getattr(obj, variants_field) or {}
+    if not force and old.get('source', '') == (image.name or ''):
+        return
+
+    # Resizing happens outside the lock - it can take a second on a large upload
+    new = build_variants(image) if image else {}
+    with transaction.atomic():
+        current = Model.objects.select_for_update().filter(pk=pk).first()
+        if current is None or getattr(current, image_field).name != image.name:
+            # Deleted or replaced again meanwhile (the job queued for the newer upload takes it from
+            # here): drop the files just written, unless the row still points at them
+            kept = variant_files(getattr(current, variants_field) or {}) if current is not None else set()
+            delete_variants(variant_files(new) - kept)
+            return
+        old = getattr(current, variants_field) or {}
+        setattr(current, variants_field, new)
+        # A real save so post_save listeners (e.g. the cached auth user) see the change
+        current.save(update_fields=[variants_field, 'updated_at'])
+    delete_variants(variant_files(old) - variant_files(new))
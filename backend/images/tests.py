@@ -0,0 +1,112 @@
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from PIL import Image
+from rest_framework.test import APITestCase
+
+from config.testing import make_user
+from inventory.models import Product
+from jobs.models import Job
+from . import tasks
+from .tasks import generate_image_variants
+from .variants import build_variants, variant_files
+
+
+def upload(name='chair.png', size=(800, 400), mode='RGBA', fmt='PNG'):
+    buffer = BytesIO()
+    Image.new(mode, size, (200, 30, 30, 128) if mode == 'RGBA' else (200, 30, 30)).save(buffer, fmt)
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+class VariantTests(APITestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = make_user('images')
+        self.client.force_authenticate(self.user)
+
+    def product(self, image):
+        product = Product.objects.create(sku='SKU-1', name='Chair', price=10, image=image)
+        generate_image_variants(model='inventory.product', pk=product.pk)
+        product.refresh_from_db()
+        return product
+
+    def test_upload_queues_a_variants_job(self):
+        product = Product.objects.create(sku='SKU-1', name='Chair', price=10, image=upload())
+        job = Job.objects.get(task=generate_image_variants.task_name)
+        self.assertEqual(job.kwargs, {'model': 'inventory.product', 'pk': product.pk})
+
+        # Saving again without touching the image doesn't queue another
+        generate_image_variants(model='inventory.product', pk=product.pk)
+        Product.objects.get(pk=product.pk).save()
+        self.assertEqual(Job.objects.filter(task=generate_image_variants.task_name).count(), 1)
+
+    def test_variants_at_each_width_never_upscaled(self):
+        product = self.product(upload(size=(300, 150)))
+        variants = product.image_variants
+        self.assertEqual(variants['source'], product.image.name)
+        for fmt, pil_format in (('webp', 'WEBP'), ('jpeg', 'JPEG')):
+            self.assertEqual(sorted(variants[fmt], key=int), ['64', '160', '300'])
+            with default_storage.open(variants[fmt]['160']) as file:
+                image = Image.open(file)
+                self.assertEqual((image.format, image.size), (pil_format, (160, 80)))
+        # WebP keeps the alpha channel; JPEG is flattened
+        with default_storage.open(variants['webp']['64']) as file:
+            self.assertEqual(Image.open(file).mode, 'RGBA')
+
+    def test_replacing_the_image_deletes_old_variants(self):
+        product = self.product(upload())
+        old = variant_files(product.image_variants)
+        product.image = upload('table.jpg', mode='RGB', fmt='JPEG')
+        product.save()
+        generate_image_variants(model='inventory.product', pk=product.pk)
+        product.refresh_from_db()
+
+        self.assertTrue(product.image_variants['source'].startswith('products/table'))
+        self.assertFalse(any(default_storage.exists(name) for name in old))
+        self.assertTrue(all(default_storage.exists(name) for name in variant_files(product.image_variants)))
+
+    def test_variants_for_an_image_changed_mid_job_are_cleaned_up(self):
+        for change in (
+            lambda pk: Product.objects.filter(pk=pk).update(image='products/newer.png'),
+            lambda pk: Product.objects.filter(pk=pk).delete(),
+        ):
+            product = Product.objects.create(sku='SKU-1', name='Chair', price=10, image=upload())
+            written = []
+
+            def build_then_change(field_file):
+                # The row changes while the job is still resizing
+                variants = build_variants(field_file)
+                written.extend(variant_files(variants))
+                change(product.pk)
+                return variants
+
+            with mock.patch.object(tasks, 'build_variants', build_then_change):
+                generate_image_variants(model='inventory.product', pk=product.pk)
+            self.assertTrue(written)
+            self.assertFalse(any(default_storage.exists(name) for name in written))
+            Product.objects.filter(pk=product.pk).delete()
+
+    def test_srcset_and_immutable_serving(self):
+        product = self.product(upload())
+        data = self.client.get(f'/api/inventory/products/{product.pk}/').data
+        self.assertEqual(data['image_srcset']['webp'].count('w,'), 3)
+        self.assertIn(' 640w', data['image_srcset']['jpeg'])
+
+        url = default_storage.url(product.image_variants['webp']['64'])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response['Cache-Control'])
+
+    def test_products_without_an_image_have_no_srcset(self):
+        product = Product.objects.create(sku='SKU-2', name='Plain', price=10)
+        self.assertFalse(Job.objects.exists())
+        self.assertIsNone(self.client.get(f'/api/inventory/products/{product.pk}/').data['image_srcset'])
@@ -0,0 +1,110 @@
+"""
+Resized variants of uploaded images.
+
+Product.image and User.avatar keep the original upload. After every upload a
+background job (images.tasks.generate_image_variants) writes WebP and JPEG
+copies at each of IMAGE_VARIANT_WIDTHS (never wider than the original) and
+stores their names on the row:
+
+    product.image_variants == {
+        'source': 'products/chair.png',
+        'webp': {'64': 'variants/products/chair-64w.3f9c1a0b7e2d.webp', ...},
+        'jpeg': {'64': 'variants/products/chair-64w.b41d07c9a6e3.jpg', ...},
+    }
+
+Variant names include a hash of their bytes, so a name always means the same
+file and they're served with a year-long immutable Cache-Control
+(images.views.serve_variant). Serializers turn the map into srcset strings
+(images.fields.SrcsetField), so a list showing 40 px thumbnails fetches a few
+KB per product instead of the multi-megabyte original.
+"""
+import hashlib
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+VARIANT_DIR = 'variants'
+
+# label -> (image field, field holding its variants map)
+IMAGE_FIELDS = {
+    'inventory.product': ('image', 'image_variants'),
+    'accounts.user': ('avatar', 'avatar_variants'),
+}
+
+# format key -> (Pillow format, extension)
+FORMATS = {
+    'webp': ('WEBP', 'webp'),
+    'jpeg': ('JPEG', 'jpg'),
+}
+
+
+def target_widths(width):
+    """IMAGE_VARIANT_WIDTHS, with any wider than the image replaced by its own width (no upscaling)."""
+    return sorted({min(w, width) for w in settings.IMAGE_VARIANT_WIDTHS})
+
+
+def encode(image, fmt):
+    """Image bytes in one of FORMATS."""
+    pil_format = FORMATS[fmt][0]
+    buffer = BytesIO()
+    if fmt == 'jpeg':
+        if image.mode in ('RGBA', 'LA'):
+            # No alpha in JPEG: flatten transparent areas onto white
+            background = Image.new('RGB', image.size, 'white')
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        image.convert('RGB').save(buffer, pil_format, quality=settings.IMAGE_VARIANT_QUALITY,
+                                  optimize=True, progressive=True)
+    else:
+        image.save(buffer, pil_format, quality=settings.IMAGE_VARIANT_QUALITY, method=4)
+    return buffer.getvalue()
+
+
+def variant_name(source_name, width, data, fmt):
+    directory, filename = posixpath.split(source_name)
+    stem = posixpath.splitext(filename)[0]
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    return posixpath.join(VARIANT_DIR, directory, f'{stem}-{width}w.{digest}.{FORMATS[fmt][1]}')
+
+
+def build_variants(field_file, storage=default_storage):
+    """Write every variant of an uploaded image and return its variants map."""
+    with field_file.open('rb') as source:
+        image = Image.open(source)
+        # JPEG sources can be decoded straight at a fraction of their size (DCT scaling)
+        largest = max(settings.IMAGE_VARIANT_WIDTHS)
+        image.draft('RGB', (largest, largest * image.height // max(image.width, 1)))
+        image.load()
+    image = ImageOps.exif_transpose(image)
+    # Keep transparency for WebP, otherwise work in plain RGB
+    has_alpha = image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info)
+    image = image.convert('RGBA' if has_alpha else 'RGB')
+
+    variants = {'source': field_file.name, **{fmt: {} for fmt in FORMATS}}
+    # Largest first, each step resized from the one before - much cheaper than resampling the original every time
+    current = image
+    for width in reversed(target_widths(image.width)):
+        if width < current.width:
+            height = max(1, round(current.height * width / current.width))
+            current = current.resize((width, height), Image.LANCZOS)
+        for fmt in FORMATS:
+            data = encode(current, fmt)
+            name = variant_name(field_file.name, width, data, fmt)
+            if not storage.exists(name):  # Same name, same bytes
+                storage.save(name, ContentFile(data))
+            variants[fmt][str(width)] = name
+    return variants
+
+
+def variant_files(variants):
+    """Every file name in a variants map."""
+    return {name for fmt in FORMATS for name in (variants or {}).get(fmt, {}).values()}
+
+
+def delete_variants(names, storage=default_storage):
+    for name in names:
+        storage.delete(name)
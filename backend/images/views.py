@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.views.static import serve
+
+from .variants import VARIANT_DIR
+
+
+def serve_variant(request, path):
+    """
+    Variant files from MEDIA_ROOT. Their names change whenever their content
+    does, so browsers and CDNs may keep them for IMAGE_VARIANT_MAX_AGE without
+    ever revalidating. (With a remote storage backend the URLs point there
+    instead, and this view isn't used.)
+    """
+    response = serve(request, f'{VARIANT_DIR}/{path}', document_root=settings.MEDIA_ROOT)
+    response['Cache-Control'] = f'public, max-age={settings.IMAGE_VARIANT_MAX_AGE}, immutable'
+    return response
@@ -16,6 +16,7 @@ class ProductAdmin(admin.ModelAdmin):
 
 @admin.register(InventoryItem)
 class InventoryItemAdmin(admin.ModelAdmin):
-    list_display = ('product', 'warehouse', 'quantity', 'low_stock_threshold')
+    list_display = ('product', 'warehouse', 'location', 'quantity', 'low_stock_threshold')
     list_filter = ('warehouse',)
+    search_fields = ('product__sku', 'location')
 
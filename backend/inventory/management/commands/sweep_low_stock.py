@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from inventory.stock import refresh_stock_status
+
+
+class Command(BaseCommand):
+    """
+    Periodic low-stock sweep.
+    Run from cron (e.g. every 15 minutes) to catch anything the incremental
+    checks missed, such as thresholds edited in the admin.
+    """
+    help = 'Re-evaluate stock status for every product and alert on transitions.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--no-alerts', action='store_true',
+            help='Persist status changes without creating notifications.',
+        )
+
+    def handle(self, *args, **options):
+        transitions = refresh_stock_status(notify=not options['no_alerts'])
+        self.stdout.write(self.style.SUCCESS(f'{len(transitions)} product(s) changed status.'))
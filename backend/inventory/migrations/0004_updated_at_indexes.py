@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0003_category_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inventoryitem',
+            index=models.Index(fields=['updated_at', 'id'], name='inventory_i_updated_db4517_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['updated_at', 'id'], name='inventory_p_updated_af11c4_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_product_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventoryitem',
+            name='location',
+            field=models.CharField(blank=True, max_length=50),
+        ),
+    ]
@@ -6,6 +6,7 @@ class Category(models.Model):
     """Product category model."""
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -26,12 +27,18 @@ class Product(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     cost = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     image = models.ImageField(upload_to='products/', null=True, blank=True)
+    # Resized copies of image, written by the images app (see images/variants.py)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='in_stock')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            # Change feeds page through rows by (updated_at, id)
+            models.Index(fields=['updated_at', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.sku} - {self.name}"
@@ -43,11 +50,17 @@ class InventoryItem(models.Model):
     warehouse = models.ForeignKey(Warehouse, on_delete=models.CASCADE, related_name='inventory_items')
     quantity = models.PositiveIntegerField(default=0)
     low_stock_threshold = models.PositiveIntegerField(default=20)
+    # Bin location, e.g. "A-03-2" - pick lists walk bins in sort order, so zero-pad the numbers
+    location = models.CharField(max_length=50, blank=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ['product', 'warehouse']
         ordering = ['product__name']
+        indexes = [
+            # Change feeds page through rows by (updated_at, id)
+            models.Index(fields=['updated_at', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.product.name} - {self.warehouse.name}: {self.quantity}"
@@ -1,6 +1,8 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
 from .models import Product, Category, InventoryItem
 from warehouses.serializers import WarehouseSerializer
+from images.fields import SrcsetField
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -16,37 +18,30 @@ class InventoryItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = InventoryItem
         fields = ('id', 'warehouse', 'warehouse_id', 
-                  'quantity', 'low_stock_threshold', 'updated_at')
+                  'quantity', 'low_stock_threshold', 'location', 'updated_at')
         read_only_fields = ('id', 'updated_at')
 
 
+def stock_prefetch(lookup='inventory_items'):
+    """Prefetch for the stock rows ProductSerializer embeds, each with its warehouse."""
+    return Prefetch(lookup, queryset=InventoryItem.objects.select_related('warehouse'))
+
+
 class ProductSerializer(serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
     category_id = serializers.IntegerField(write_only=True, required=False, allow_null=True)
     total_stock = serializers.SerializerMethodField()
     inventory_items = InventoryItemSerializer(many=True, read_only=True)
-    status = serializers.SerializerMethodField()
+    # Resized WebP/JPEG copies of image - lists should use these, not the original
+    image_srcset = SrcsetField(source='image_variants')
 
     class Meta:
         model = Product
         fields = ('id', 'sku', 'name', 'description', 'category', 'category_id', 
-                  'price', 'cost', 'image', 'status', 'total_stock', 'inventory_items', 
+                  'price', 'cost', 'image', 'image_srcset', 'status', 'total_stock', 'inventory_items', 
                   'created_at', 'updated_at')
-        read_only_fields = ('id', 'created_at', 'updated_at')
+        # status is maintained by inventory.stock on every stock write, so it's never set by clients
+        read_only_fields = ('id', 'status', 'created_at', 'updated_at')
 
     def get_total_stock(self, obj):
         return sum(item.quantity for item in obj.inventory_items.all())
-    
-    def get_status(self, obj):
-        """Calculate status based on actual inventory levels."""
-        total_stock = self.get_total_stock(obj)
-        
-        if total_stock == 0:
-            return 'out_of_stock'
-        
-        # Check if any warehouse is below its threshold
-        for item in obj.inventory_items.all():
-            if item.quantity > 0 and item.quantity <= item.low_stock_threshold:
-                return 'low_stock'
-        
-        return 'in_stock'
@@ -0,0 +1,104 @@
+"""
+Low-stock engine.
+
+This is the one place that decides whether a product is in stock, low on stock
+or out of stock. Every inventory item is checked against its own
+low_stock_threshold inside a single aggregate query, and only products whose
+status actually changed get written back - so alerts fire once per crossing
+instead of on every read.
+"""
+from django.contrib.auth import get_user_model
+from django.db.models import Case, CharField, Count, F, Q, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from notifications.models import Notification
+from webhooks.events import publish_stock_changed
+from .models import Product
+
+User = get_user_model()
+
+
+def annotate_stock_status(queryset):
+    """
+    Annotate a Product queryset with total_stock, low_items and computed_status.
+
+    A product is out of stock when it has no units anywhere, low on stock when
+    any warehouse holds a non-zero quantity at or below its threshold, and in
+    stock otherwise.
+    """
+    low_item = Q(
+        inventory_items__quantity__gt=0,
+        inventory_items__quantity__lte=F('inventory_items__low_stock_threshold'),
+    )
+    return queryset.annotate(
+        total_stock=Coalesce(Sum('inventory_items__quantity'), 0),
+        low_items=Count('inventory_items', filter=low_item),
+    ).annotate(
+        computed_status=Case(
+            When(total_stock=0, then=Value('out_of_stock')),
+            When(low_items__gt=0, then=Value('low_stock')),
+            default=Value('in_stock'),
+            output_field=CharField(),
+        )
+    )
+
+
+def _build_alert(product, old_status, new_status, total_stock):
+    """Return (title, message, type) for a transition worth alerting on, else None."""
+    if new_status == 'out_of_stock':
+        return ("Alert: Product Out of Stock", f"{product} is now out of stock!", 'error')
+    if new_status == 'low_stock' and old_status == 'in_stock':
+        return ("Alert: Low Stock", f"{product} has low stock ({total_stock} units).", 'alert')
+    return None
+
+
+def refresh_stock_status(product_ids=None, user=None, notify=True):
+    """
+    Re-evaluate stock status and persist only the transitions.
+
+    product_ids limits the check to specific products (the incremental path used
+    after a write); leave it as None to sweep the whole catalog. Alerts go to
+    `user` when given, otherwise to every active staff member; pass notify=False
+    to persist the new statuses silently.
+    Also publishes stock.changed webhooks: for every product in product_ids (their
+    stock was just written), or only for the transitions on a full sweep.
+    Returns a list of (product_id, old_status, new_status) tuples.
+    """
+    products = Product.objects.all()
+    if product_ids is not None:
+        products = products.filter(id__in=product_ids)
+
+    changed = list(
+        annotate_stock_status(products)
+        .exclude(status=F('computed_status'))
+        .values_list('id', 'name', 'status', 'computed_status', 'total_stock')
+    )
+    if not changed:
+        publish_stock_changed(product_ids)
+        return []
+
+    # One UPDATE per target status - at most three statements no matter how many rows moved
+    now = timezone.now()
+    by_status = {}
+    for product_id, _, _, new_status, _ in changed:
+        by_status.setdefault(new_status, []).append(product_id)
+    for new_status, ids in by_status.items():
+        Product.objects.filter(id__in=ids).update(status=new_status, updated_at=now)
+
+    alerts = [] if not notify else [
+        alert for alert in (
+            _build_alert(name, old_status, new_status, total_stock)
+            for _, name, old_status, new_status, total_stock in changed
+        ) if alert
+    ]
+    if alerts:
+        recipients = [user] if user is not None else list(User.objects.filter(is_staff=True, is_active=True))
+        Notification.objects.bulk_create([
+            Notification(user=recipient, title=title, message=message, type=type)
+            for recipient in recipients
+            for title, message, type in alerts
+        ])
+
+    publish_stock_changed(product_ids if product_ids is not None else [product_id for product_id, *_ in changed])
+    return [(product_id, old_status, new_status) for product_id, _, old_status, new_status, _ in changed]
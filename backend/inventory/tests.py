@@ -0,0 +1,87 @@
+from django.test import TestCase
+from rest_framework.test import APITestCase
+
+from config.testing import make_product, make_stock, make_user, make_warehouse
+from notifications.models import Notification
+from .models import Category, InventoryItem, Product
+from .stock import annotate_stock_status, refresh_stock_status
+
+
+class StockEngineTests(TestCase):
+    def setUp(self):
+        self.user = make_user('stock')
+        self.east, self.west = make_warehouse('East'), make_warehouse('West')
+        self.product = make_product()
+        self.east_item = make_stock(self.product, self.east, 100, low_stock_threshold=20)
+        self.west_item = make_stock(self.product, self.west, 100, low_stock_threshold=20)
+
+    def computed(self):
+        return annotate_stock_status(Product.objects.filter(pk=self.product.pk)).get().computed_status
+
+    def test_status_follows_the_lowest_warehouse(self):
+        self.assertEqual(self.computed(), 'in_stock')
+        # One warehouse at its threshold is enough, even with plenty elsewhere
+        InventoryItem.objects.filter(pk=self.east_item.pk).update(quantity=20)
+        self.assertEqual(self.computed(), 'low_stock')
+        InventoryItem.objects.all().update(quantity=0)
+        self.assertEqual(self.computed(), 'out_of_stock')
+
+    def test_alerts_fire_once_per_crossing(self):
+        InventoryItem.objects.filter(pk=self.east_item.pk).update(quantity=5)
+        self.assertEqual(refresh_stock_status([self.product.id], user=self.user), [(self.product.id, 'in_stock', 'low_stock')])
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.status, 'low_stock')
+        self.assertEqual(Notification.objects.filter(user=self.user, type='alert').count(), 1)
+
+        # Still low - nothing written, no second alert
+        self.assertEqual(refresh_stock_status([self.product.id], user=self.user), [])
+        self.assertEqual(Notification.objects.filter(user=self.user).count(), 1)
+
+    def test_full_sweep_only_writes_transitions(self):
+        other = make_product('SKU-2', 'Gadget', 5, status='in_stock')
+        make_stock(other, self.east, 0)
+        changes = refresh_stock_status(notify=False)
+        self.assertEqual(changes, [(other.id, 'in_stock', 'out_of_stock')])
+        self.assertFalse(Notification.objects.exists())
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(make_user('etag'))
+        self.category = Category.objects.create(name='Tools')
+        self.warehouse = make_warehouse()
+        self.product = make_product(category=self.category)
+        self.item = make_stock(self.product, self.warehouse, 5)
+
+    def revalidate(self, path, etag):
+        return self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+
+    def test_unchanged_list_is_a_304_without_serializing(self):
+        response = self.client.get('/api/inventory/products/')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        with self.assertNumQueries(1):
+            response = self.revalidate('/api/inventory/products/', etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        # Another page/filter is another tag
+        self.assertNotEqual(self.client.get('/api/inventory/products/?page=1')['ETag'], etag)
+
+    def test_nested_changes_change_the_tag(self):
+        path = f'/api/inventory/products/{self.product.pk}/'
+        for change in (
+            lambda: self.category.save(),
+            lambda: self.item.save(),
+            lambda: self.warehouse.save(),
+            lambda: InventoryItem.objects.filter(pk=self.item.pk).delete(),
+        ):
+            etag = self.client.get(path)['ETag']
+            change()
+            self.assertEqual(self.revalidate(path, etag).status_code, 200)
+
+    def test_warehouses(self):
+        etag = self.client.get('/api/warehouses/')['ETag']
+        self.assertEqual(self.revalidate('/api/warehouses/', etag).status_code, 304)
+        self.warehouse.name = 'East 2'
+        self.warehouse.save()
+        self.assertEqual(self.revalidate('/api/warehouses/', etag).status_code, 200)
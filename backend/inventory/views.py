@@ -3,21 +3,42 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from .models import Product, InventoryItem
-from .serializers import ProductSerializer, InventoryItemSerializer
-from notifications.utils import create_notification
+from .serializers import ProductSerializer, InventoryItemSerializer, stock_prefetch
+from .stock import refresh_stock_status
+from config.conditional import ConditionalGetMixin
+from sync.feeds import ChangeFeedMixin
+from idempotency.decorators import idempotent
+from django.db import transaction
 
 
 # Handles all product operations - create, read, update, delete products
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(ConditionalGetMixin, ChangeFeedMixin, viewsets.ModelViewSet):
     """ViewSet for Product CRUD operations."""
     serializer_class = ProductSerializer
     permission_classes = [IsAuthenticated]
     # Optimize queries by fetching related data in one go
-    queryset = Product.objects.all().select_related('category').prefetch_related('inventory_items')
+    queryset = Product.objects.all().select_related('category').prefetch_related(stock_prefetch())
+    # Products embed their category, stock rows and warehouses, so any of those changing counts
+    fingerprint_timestamps = (
+        'updated_at',
+        'category__updated_at',
+        'inventory_items__updated_at',
+        'inventory_items__warehouse__updated_at',
+    )
+    fingerprint_counts = ('inventory_items',)
+
+    def perform_create(self, serializer):
+        # New products start with no stock anywhere, so settle their status right away
+        # (quietly - an empty new product isn't an out-of-stock emergency)
+        with transaction.atomic():
+            product = serializer.save()
+            refresh_stock_status([product.id], notify=False)
+        product.refresh_from_db(fields=['status', 'updated_at'])
 
     # Custom action to add stock to a product at a specific warehouse
     # POST /products/{id}/restock/
     @action(detail=True, methods=['post'])
+    @idempotent
     def restock(self, request, pk=None):
         """Restock product inventory."""
         product = self.get_object()
@@ -28,42 +49,22 @@ class ProductViewSet(viewsets.ModelViewSet):
             return Response({'error': 'warehouse_id required'}, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            # Find or create the inventory item for this product at this warehouse
-            # If it doesn't exist, create it with 0 quantity
-            inventory_item, created = InventoryItem.objects.get_or_create(
-                product=product,
-                warehouse_id=warehouse_id,
-                defaults={'quantity': 0}
-            )
-            # Add the new quantity to existing stock
-            inventory_item.quantity += int(quantity)
-            inventory_item.save()
-            
-            # Update the product's overall status based on total stock across all warehouses
-            total_stock = sum(item.quantity for item in product.inventory_items.all())
-            old_status = product.status
-            
-            if total_stock == 0:
-                product.status = 'out_of_stock'
-                if old_status != 'out_of_stock':
-                    create_notification(
-                        user=self.request.user,
-                        title="Alert: Product Out of Stock",
-                        message=f"{product.name} is now out of stock!",
-                        type="error"
-                    )
-            elif total_stock < 50:
-                product.status = 'low_stock'
-                if old_status != 'low_stock' and old_status != 'out_of_stock':
-                    create_notification(
-                        user=self.request.user,
-                        title="Alert: Low Stock",
-                        message=f"{product.name} has low stock ({total_stock} units).",
-                        type="alert"
-                    )
-            else:
-                product.status = 'in_stock'
-            product.save()
+            # Stock change, status refresh and stock.changed webhook commit together
+            with transaction.atomic():
+                # Find or create the inventory item for this product at this warehouse
+                # If it doesn't exist, create it with 0 quantity
+                inventory_item, created = InventoryItem.objects.get_or_create(
+                    product=product,
+                    warehouse_id=warehouse_id,
+                    defaults={'quantity': 0}
+                )
+                # Add the new quantity to existing stock
+                inventory_item.quantity += int(quantity)
+                inventory_item.save()
+
+                # Let the low-stock engine decide the new status and alert on any crossing
+                refresh_stock_status([product.id], user=request.user)
+            product = self.get_queryset().get(pk=product.pk)
             
             return Response(ProductSerializer(product).data)
         except Exception as e:
@@ -72,10 +73,31 @@ class ProductViewSet(viewsets.ModelViewSet):
 
 # Manages inventory items - the actual stock levels at each warehouse
 # This is the junction between products and warehouses
-class InventoryItemViewSet(viewsets.ModelViewSet):
+class InventoryItemViewSet(ChangeFeedMixin, viewsets.ModelViewSet):
     """ViewSet for InventoryItem operations."""
     serializer_class = InventoryItemSerializer
     permission_classes = [IsAuthenticated]
     # Optimize by fetching product and warehouse data together
     queryset = InventoryItem.objects.all().select_related('product', 'warehouse')
 
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
+    # Any change to a stock level or threshold is re-checked incrementally for that product
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            item = serializer.save()
+            refresh_stock_status([item.product_id], user=self.request.user)
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            item = serializer.save()
+            refresh_stock_status([item.product_id], user=self.request.user)
+
+    def perform_destroy(self, instance):
+        product_id = instance.product_id
+        with transaction.atomic():
+            instance.delete()
+            refresh_stock_status([product_id], user=self.request.user)
+
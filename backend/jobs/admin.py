@@ -0,0 +1,31 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import Job, PeriodicJob
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'task', 'status', 'priority', 'attempts', 'run_at', 'locked_by', 'created_at', 'finished_at')
+    list_filter = ('status', 'task')
+    search_fields = ('task', 'last_error')
+    readonly_fields = ('attempts', 'locked_by', 'locked_at', 'created_at', 'finished_at', 'last_error')
+    actions = ['retry_now', 'cancel']
+
+    @admin.action(description='Retry selected jobs now')
+    def retry_now(self, request, queryset):
+        count = queryset.exclude(status=Job.RUNNING).update(
+            status=Job.QUEUED, run_at=timezone.now(), attempts=0, finished_at=None
+        )
+        self.message_user(request, f'{count} job(s) queued.')
+
+    @admin.action(description='Cancel selected queued jobs')
+    def cancel(self, request, queryset):
+        count = queryset.filter(status=Job.QUEUED).update(status=Job.CANCELLED, finished_at=timezone.now())
+        self.message_user(request, f'{count} job(s) cancelled.')
+
+
+@admin.register(PeriodicJob)
+class PeriodicJobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'task', 'interval_seconds', 'next_run_at', 'last_enqueued_at', 'enabled')
+    list_editable = ('enabled',)
+    readonly_fields = ('last_enqueued_at',)
@@ -0,0 +1,95 @@
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from jobs import process
+from jobs.worker import claim_jobs, enqueue_periodic, execute_job, heartbeat, logger, requeue_stale
+
+STALE_CHECK_SECONDS = 60
+
+
+class Command(BaseCommand):
+    """
+    Background job worker.
+    Polls the jobs table, runs due jobs on a thread or process pool, retries
+    failures with exponential backoff and enqueues PeriodicJobs when they're due.
+    Run as many workers as you like - they never pick up the same job.
+    Stop with Ctrl+C / SIGTERM; jobs already running are allowed to finish.
+    """
+    help = 'Run queued background jobs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=settings.JOB_WORKER_CONCURRENCY,
+                            help='Jobs to run at the same time.')
+        parser.add_argument('--mode', choices=['thread', 'process'], default='thread',
+                            help='thread for I/O-bound jobs (HTTP, DB), process for CPU-heavy ones.')
+        parser.add_argument('--poll-interval', type=float, default=settings.JOB_POLL_SECONDS,
+                            help='Seconds to wait between polls when the queue is empty.')
+        parser.add_argument('--once', action='store_true',
+                            help='Run everything that is due, then exit (e.g. from cron).')
+        parser.add_argument('--no-schedule', action='store_true',
+                            help="Don't enqueue periodic jobs from this worker.")
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options['concurrency'])
+        worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        self.stopping = False
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+
+        if options['mode'] == 'process':
+            # Spawned (not forked) children, so they never share the parent's DB connection
+            executor = ProcessPoolExecutor(
+                max_workers=concurrency,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=process.init_process,
+            )
+            run = process.execute_job
+        else:
+            executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='jobs')
+            run = execute_job
+
+        self.stdout.write(f'Worker {worker_id} started ({concurrency} {options["mode"]} slots).')
+        in_flight = {}  # future -> job id
+        last_stale_check = last_heartbeat = 0
+        try:
+            while not self.stopping:
+                if not options['no_schedule']:
+                    enqueue_periodic()
+                if time.monotonic() - last_stale_check > STALE_CHECK_SECONDS:
+                    requeue_stale()
+                    last_stale_check = time.monotonic()
+                if time.monotonic() - last_heartbeat > settings.JOB_HEARTBEAT_SECONDS:
+                    heartbeat(worker_id, list(in_flight.values()))
+                    last_heartbeat = time.monotonic()
+
+                for future in [future for future in in_flight if future.done()]:
+                    del in_flight[future]
+                    if future.exception() is not None:
+                        # execute_job records task errors itself, so this is the worker's own plumbing failing
+                        logger.error('Worker failed to run a job: %r', future.exception())
+                free = concurrency - len(in_flight)
+                claimed = claim_jobs(worker_id, free) if free else []
+                for job_id in claimed:
+                    in_flight[executor.submit(run, job_id)] = job_id
+
+                if options['once'] and not claimed and not in_flight:
+                    break
+                if not claimed or len(in_flight) >= concurrency:
+                    # Wake up early if a slot frees up, otherwise poll again after the interval
+                    if in_flight:
+                        wait(in_flight, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                    else:
+                        time.sleep(options['poll_interval'])
+        finally:
+            executor.shutdown(wait=True)
+        self.stdout.write(f'Worker {worker_id} stopped.')
+
+    def stop(self, signum, frame):
+        self.stopping = True
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:00
+
+from django.db import migrations
+
+# The maintenance commands that used to need cron, now run by the job worker
+SCHEDULE = [
+    ('Low-stock sweep', 'sweep_low_stock', 15 * 60),
+    ('Reorder forecast', 'forecast_reorder', 24 * 3600),
+    ('Prune sync tombstones', 'prune_tombstones', 24 * 3600),
+    ('Purge idempotency keys', 'purge_idempotency_keys', 3600),
+    ('Compact JWT tokens', 'compact_tokens', 24 * 3600),
+]
+
+
+def add_schedule(apps, schema_editor):
+    PeriodicJob = apps.get_model('jobs', 'PeriodicJob')
+    for name, command, interval in SCHEDULE:
+        PeriodicJob.objects.get_or_create(name=name, defaults={
+            'task': 'jobs.tasks.run_command',
+            'kwargs': {'command': command},
+            'interval_seconds': interval,
+        })
+    PeriodicJob.objects.get_or_create(name='Purge finished jobs', defaults={
+        'task': 'jobs.tasks.purge_finished_jobs',
+        'interval_seconds': 24 * 3600,
+    })
+
+
+def remove_schedule(apps, schema_editor):
+    PeriodicJob = apps.get_model('jobs', 'PeriodicJob')
+    names = [name for name, _, _ in SCHEDULE] + ['Purge finished jobs']
+    PeriodicJob.objects.filter(name__in=names).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_schedule, remove_schedule),
+    ]
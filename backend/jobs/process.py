@@ -0,0 +1,16 @@
+"""
+Entry points for process-pool workers.
+Spawned children unpickle these before Django is set up, so nothing here may
+import models at module level.
+"""
+import django
+
+
+def init_process():
+    # Each child needs its own Django setup (and its own DB connections)
+    django.setup()
+
+
+def execute_job(job_id):
+    from .worker import execute_job
+    return execute_job(job_id)
@@ -0,0 +1,61 @@
+"""
+Task registry and enqueueing.
+
+    # warehouses/tasks.py
+    @task
+    def geocode_warehouse(warehouse_id): ...
+
+    # anywhere
+    enqueue(geocode_warehouse, kwargs={'warehouse_id': warehouse.id})
+
+The Job row is written in the caller's transaction, so a job never runs for
+a change that was rolled back, and the worker only sees it once it commits.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Job
+
+_registry = {}
+
+
+def task(func=None, *, max_attempts=None):
+    """Register a function as a background task. Its kwargs must be JSON-serializable."""
+    def register(func):
+        func.task_name = f'{func.__module__}.{func.__name__}'
+        func.max_attempts = max_attempts
+        _registry[func.task_name] = func
+        return func
+    return register(func) if func is not None else register
+
+
+def get_task(name):
+    try:
+        return _registry[name]
+    except KeyError:
+        raise LookupError(f"No task registered as '{name}'")
+
+
+def enqueue(func_or_name, *, kwargs=None, delay=None, run_at=None, priority=0, max_attempts=None):
+    """Queue a task and return the Job. `delay` is a timedelta or seconds."""
+    func = get_task(func_or_name) if isinstance(func_or_name, str) else func_or_name
+    if isinstance(delay, (int, float)):
+        delay = timedelta(seconds=delay)
+    if run_at is None:
+        run_at = timezone.now() + delay if delay else timezone.now()
+
+    job = Job.objects.create(
+        task=func.task_name,
+        kwargs=kwargs or {},
+        run_at=run_at,
+        priority=priority,
+        max_attempts=max_attempts or func.max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
+    if settings.JOBS_RUN_INLINE and run_at <= timezone.now():
+        # No worker (local dev, single free-tier dyno): run it as soon as the caller commits
+        from .worker import run_inline
+        transaction.on_commit(lambda: run_inline(job.pk))
+    return job
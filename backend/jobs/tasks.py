@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management import call_command
+from django.utils import timezone
+
+from .models import Job
+from .queue import task
+
+
+@task(max_attempts=1)
+def run_command(command, args=None, options=None):
+    """Run a management command - lets the cron-style commands be scheduled as PeriodicJobs."""
+    call_command(command, *(args or []), **(options or {}))
+
+
+@task
+def purge_finished_jobs():
+    """Drop finished jobs older than JOB_KEEP_FINISHED_DAYS."""
+    cutoff = timezone.now() - timedelta(days=settings.JOB_KEEP_FINISHED_DAYS)
+    Job.objects.filter(
+        status__in=[Job.DONE, Job.FAILED, Job.CANCELLED], finished_at__lt=cutoff
+    ).delete()
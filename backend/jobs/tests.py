@@ -0,0 +1,113 @@
+import threading
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.utils import timezone
+
+from .models import Job, PeriodicJob
+from .queue import enqueue, task
+from .worker import claim_jobs, enqueue_periodic, execute_job, heartbeat, requeue_stale
+
+calls = []
+
+
+@task
+def record(value):
+    calls.append(value)
+
+
+@task(max_attempts=2)
+def broken():
+    raise RuntimeError('nope')
+
+
+@override_settings(JOBS_RUN_INLINE=False)
+class ClaimTests(TestCase):
+    def test_claims_due_jobs_by_priority_once(self):
+        low = enqueue(record, kwargs={'value': 'low'})
+        high = enqueue(record, kwargs={'value': 'high'}, priority=5)
+        enqueue(record, kwargs={'value': 'later'}, delay=60)
+
+        self.assertEqual(claim_jobs('w1', 1), [high.pk])
+        self.assertEqual(claim_jobs('w2', 5), [low.pk])
+        self.assertEqual(claim_jobs('w3', 5), [])
+        high.refresh_from_db()
+        self.assertEqual((high.status, high.locked_by, high.attempts), (Job.RUNNING, 'w1', 1))
+
+    def test_failures_back_off_then_fail(self):
+        job = enqueue(broken)
+        self.assertEqual(job.max_attempts, 2)
+        claim_jobs('w1', 1)
+        with self.assertLogs('jobs', 'WARNING'):
+            execute_job(job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertGreater(job.run_at, timezone.now())
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        claim_jobs('w1', 1)
+        with self.assertLogs('jobs', 'ERROR'):
+            execute_job(job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIn('nope', job.last_error)
+
+    def test_periodic_jobs_use_the_tasks_max_attempts(self):
+        PeriodicJob.objects.all().delete()  # The maintenance schedule from the migrations
+        PeriodicJob.objects.create(name='broken', task=broken.task_name, interval_seconds=60)
+        PeriodicJob.objects.create(name='record', task=record.task_name, kwargs={'value': 1}, interval_seconds=60)
+        self.assertEqual(enqueue_periodic(), 2)
+        self.assertEqual(Job.objects.get(task=broken.task_name).max_attempts, 2)
+        self.assertEqual(Job.objects.get(task=record.task_name).max_attempts, 5)
+        # Not due again for another interval
+        self.assertEqual(enqueue_periodic(), 0)
+
+
+@override_settings(JOBS_RUN_INLINE=False, JOB_TIMEOUT_SECONDS=60)
+class StaleJobTests(TestCase):
+    def setUp(self):
+        self.job = enqueue(record, kwargs={'value': 'slow'})
+        claim_jobs('w1', 1)
+        # Started well over the timeout ago
+        Job.objects.filter(pk=self.job.pk).update(locked_at=timezone.now() - timedelta(minutes=10))
+
+    def test_job_with_a_heartbeat_is_left_running(self):
+        heartbeat('w1', [self.job.pk])
+        self.assertEqual(requeue_stale(), 0)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, Job.RUNNING)
+
+    def test_job_without_one_is_requeued(self):
+        # Another worker's heartbeat doesn't count
+        heartbeat('w2', [self.job.pk])
+        with self.assertLogs('jobs', 'WARNING'):
+            self.assertEqual(requeue_stale(), 1)
+        self.assertEqual(claim_jobs('w2', 1), [self.job.pk])
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.status, self.job.locked_by, self.job.attempts), (Job.RUNNING, 'w2', 2))
+
+
+@override_settings(JOBS_RUN_INLINE=False)
+@skipUnlessDBFeature('has_select_for_update_skip_locked')
+class ConcurrentClaimTests(TransactionTestCase):
+    def test_locked_jobs_are_skipped_not_waited_on(self):
+        first, second = enqueue(record, kwargs={'value': 1}), enqueue(record, kwargs={'value': 2})
+        locked, release = threading.Event(), threading.Event()
+
+        def hold_lock():
+            # Another worker halfway through claiming `first`
+            with transaction.atomic():
+                Job.objects.select_for_update().get(pk=first.pk)
+                locked.set()
+                release.wait(5)
+            connection.close()
+
+        thread = threading.Thread(target=hold_lock)
+        thread.start()
+        try:
+            locked.wait(5)
+            self.assertEqual(claim_jobs('w2', 5), [second.pk])
+        finally:
+            release.set()
+            thread.join()
@@ -0,0 +1,124 @@
+"""
+Job claiming and execution, used by `manage.py run_worker`.
+
+Workers claim jobs with SELECT ... FOR UPDATE SKIP LOCKED, so any number of
+them can poll the same table without handing out a job twice or waiting on
+each other's row locks. Claimed jobs are marked running before the claiming
+transaction commits. While a job runs its worker refreshes locked_at every
+JOB_HEARTBEAT_SECONDS, so a job whose worker died (and only such a job) is
+put back once locked_at is JOB_TIMEOUT_SECONDS old.
+"""
+import logging
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job, PeriodicJob
+from .queue import enqueue, get_task
+
+logger = logging.getLogger('jobs')
+
+
+def claim_jobs(worker_id, limit):
+    """Mark up to `limit` due jobs as running for this worker and return their ids."""
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.QUEUED, run_at__lte=now)
+            .order_by('-priority', 'run_at')
+            .values_list('id', flat=True)[:limit]
+        )
+        if ids:
+            Job.objects.filter(id__in=ids).update(
+                status=Job.RUNNING, locked_by=worker_id, locked_at=now, attempts=F('attempts') + 1
+            )
+    return ids
+
+
+def retry_delay(attempts):
+    """Exponential backoff with a little jitter so failed jobs don't all retry together."""
+    delay = min(settings.JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.JOB_RETRY_MAX_SECONDS)
+    return timedelta(seconds=delay * random.uniform(1, 1.25))
+
+
+def execute_job(job_id):
+    """Run a claimed job and record the outcome. Safe to call from a thread or a child process."""
+    try:
+        job = Job.objects.get(pk=job_id)
+        try:
+            get_task(job.task)(**job.kwargs)
+        except Exception:
+            error = traceback.format_exc()
+            now = timezone.now()
+            if job.attempts >= job.max_attempts:
+                logger.error('Job %s (%s) failed permanently after %s attempts\n%s', job.pk, job.task, job.attempts, error)
+                changes = {'status': Job.FAILED, 'finished_at': now}
+            else:
+                logger.warning('Job %s (%s) failed on attempt %s, will retry\n%s', job.pk, job.task, job.attempts, error)
+                changes = {'status': Job.QUEUED, 'run_at': now + retry_delay(job.attempts)}
+            # Only while it's still ours - a job requeued from under us may be running elsewhere by now
+            Job.objects.filter(pk=job.pk, status=Job.RUNNING, locked_by=job.locked_by).update(
+                last_error=error, locked_by='', **changes
+            )
+        else:
+            Job.objects.filter(pk=job.pk, status=Job.RUNNING, locked_by=job.locked_by).update(
+                status=Job.DONE, finished_at=timezone.now(), locked_by=''
+            )
+    finally:
+        # Long-lived pool threads/processes - tidy up the connection like the end of a request
+        close_old_connections()
+
+
+def run_inline(job_id):
+    """Claim and run one job in the current process (JOBS_RUN_INLINE)."""
+    claimed = Job.objects.filter(pk=job_id, status=Job.QUEUED).update(
+        status=Job.RUNNING, locked_by='inline', locked_at=timezone.now(), attempts=F('attempts') + 1
+    )
+    if claimed:
+        execute_job(job_id)
+
+
+def enqueue_periodic():
+    """Queue every enabled PeriodicJob that is due. Returns how many were queued."""
+    now = timezone.now()
+    with transaction.atomic():
+        due = list(
+            PeriodicJob.objects.select_for_update(skip_locked=True)
+            .filter(enabled=True, next_run_at__lte=now)
+        )
+        for periodic in due:
+            try:
+                # Through enqueue, so the task's own max_attempts applies
+                enqueue(periodic.task, kwargs=periodic.kwargs)
+            except LookupError:
+                logger.error("Periodic job '%s' names unknown task '%s'", periodic.name, periodic.task)
+            # Runs missed while no worker was up are skipped, not replayed one by one
+            periodic.next_run_at = now + timedelta(seconds=periodic.interval_seconds)
+            periodic.last_enqueued_at = now
+            periodic.save(update_fields=['next_run_at', 'last_enqueued_at'])
+    return len(due)
+
+
+def heartbeat(worker_id, job_ids):
+    """Tell requeue_stale() these jobs are still running on this worker."""
+    if job_ids:
+        Job.objects.filter(id__in=job_ids, status=Job.RUNNING, locked_by=worker_id).update(locked_at=timezone.now())
+
+
+def requeue_stale():
+    """Put back jobs whose worker stopped sending heartbeats (crashed or killed mid-job)."""
+    cutoff = timezone.now() - timedelta(seconds=settings.JOB_TIMEOUT_SECONDS)
+    stale = Job.objects.filter(status=Job.RUNNING, locked_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, finished_at=timezone.now(), locked_by='', last_error='Worker timed out'
+    )
+    requeued = stale.update(status=Job.QUEUED, locked_by='', run_at=timezone.now())
+    if failed or requeued:
+        logger.warning('Requeued %s stale job(s), failed %s', requeued, failed)
+    return requeued
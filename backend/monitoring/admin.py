@@ -0,0 +1,40 @@
+from django.contrib import admin
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
+from .models import ProfileCapture
+
+
+@admin.register(ProfileCapture)
+class ProfileCaptureAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'method', 'path', 'status_code', 'duration_ms', 'time_breakdown', 'kind', 'trigger', 'download_link')
+    list_filter = ('kind', 'trigger', 'route')
+    search_fields = ('path', 'route')
+    readonly_fields = [field.name for field in ProfileCapture._meta.fields] + ['download_link']
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.display(description='App / ORM / Serialization ms')
+    def time_breakdown(self, obj):
+        parts = (obj.breakdown.get(key, 0) for key in ('app', 'orm', 'serialization'))
+        return ' / '.join(f'{ms:.0f}' for ms in parts)
+
+    @admin.display(description='File')
+    def download_link(self, obj):
+        url = reverse('admin:monitoring_profilecapture_download', args=[obj.pk])
+        return format_html('<a href="{}">{}</a>', url, obj.get_kind_display())
+
+    def get_urls(self):
+        # Captures live outside MEDIA_ROOT, so they are only reachable through the admin
+        custom = [
+            path('<int:pk>/download/', self.admin_site.admin_view(self.download), name='monitoring_profilecapture_download'),
+        ]
+        return custom + super().get_urls()
+
+    def download(self, request, pk):
+        capture = get_object_or_404(ProfileCapture, pk=pk)
+        if not capture.file:
+            raise Http404
+        return FileResponse(capture.file.open('rb'), as_attachment=True, filename=capture.file.name)
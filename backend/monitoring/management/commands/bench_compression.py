@@ -0,0 +1,95 @@
+import statistics
+import time
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import User
+
+DEFAULT_ENDPOINTS = [
+    '/api/orders/',
+    '/api/customers/',
+    '/api/inventory/products/',
+    '/api/inventory/items/',
+    '/api/warehouses/',
+]
+ENCODINGS = ['identity', 'gzip', 'br']
+
+
+class Command(BaseCommand):
+    """
+    Response compression benchmark.
+    For each list endpoint and each Accept-Encoding, prints bytes on the wire and
+    request latency (median / p95). Runs in-process by default; pass --base-url to
+    hit a running server over HTTP so network transfer is included too.
+    Seed some data first (a few hundred orders makes the difference obvious).
+    """
+    help = 'Compare identity/gzip/brotli response sizes and latency for the list endpoints.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Email of the user to request as (default: first superuser).')
+        parser.add_argument('--runs', type=int, default=20, help='Requests per endpoint and encoding.')
+        parser.add_argument('--base-url', help='e.g. http://localhost:8000 - benchmark a live server instead.')
+        parser.add_argument('--endpoint', action='append', dest='endpoints', help='Path to test (repeatable).')
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(email=options['user']) if options['user'] else User.objects.filter(is_superuser=True)
+        user = users.order_by('id').first()
+        if user is None:
+            raise CommandError('No user to authenticate as - pass --user or create a superuser.')
+        token = str(RefreshToken.for_user(user).access_token)
+
+        if options['base_url']:
+            fetch = self.http_fetcher(options['base_url'].rstrip('/'), token)
+        else:
+            fetch = self.client_fetcher(token)
+
+        self.stdout.write(f'{"endpoint":<28} {"encoding":<9} {"bytes":>10} {"ratio":>6} {"p50 ms":>8} {"p95 ms":>8}')
+        # The test client talks to 'testserver'
+        with override_settings(ALLOWED_HOSTS=['*']):
+            for endpoint in options['endpoints'] or DEFAULT_ENDPOINTS:
+                baseline = None
+                for encoding in ENCODINGS:
+                    sizes, latencies, used = [], [], None
+                    for _ in range(options['runs']):
+                        started = time.perf_counter()
+                        size, used = fetch(endpoint, encoding)
+                        latencies.append((time.perf_counter() - started) * 1000)
+                        sizes.append(size)
+                    size = statistics.median(sizes)
+                    baseline = baseline or size
+                    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+                    label = encoding if used == encoding or encoding == 'identity' else f'{encoding}*'
+                    self.stdout.write(
+                        f'{endpoint:<28} {label:<9} {size:>10,.0f} {size / baseline:>6.2f} '
+                        f'{quantiles[49]:>8.1f} {quantiles[94]:>8.1f}'
+                    )
+        self.stdout.write('* = server answered without that encoding (e.g. brotli not installed, or body under COMPRESSION_MIN_BYTES)')
+
+    def client_fetcher(self, token):
+        client = Client()
+
+        def fetch(endpoint, encoding):
+            response = client.get(endpoint, HTTP_AUTHORIZATION=f'Bearer {token}', HTTP_ACCEPT_ENCODING=encoding)
+            if response.status_code != 200:
+                raise CommandError(f'{endpoint} returned {response.status_code}')
+            return len(response.content), response.get('Content-Encoding', 'identity')
+        return fetch
+
+    def http_fetcher(self, base_url, token):
+        session = requests.Session()
+
+        def fetch(endpoint, encoding):
+            response = session.get(
+                base_url + endpoint, stream=True,
+                headers={'Authorization': f'Bearer {token}', 'Accept-Encoding': encoding},
+            )
+            if response.status_code != 200:
+                raise CommandError(f'{endpoint} returned {response.status_code}')
+            # Read the raw (still compressed) bytes so we count what crossed the wire
+            size = len(response.raw.read(decode_content=False))
+            return size, response.headers.get('Content-Encoding', 'identity')
+        return fetch
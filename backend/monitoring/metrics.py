@@ -0,0 +1,94 @@
+"""
+In-memory request metrics, rendered in Prometheus text format.
+
+Each worker process keeps its own registry, so scrape every worker (or run a
+single worker) when you need exact numbers. That's plenty for spotting which
+endpoints are hot without attaching a profiler.
+"""
+import threading
+from bisect import bisect_left
+
+# Prometheus' default latency buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RouteStats:
+    """Latency histogram plus query counters for one (method, route) pair."""
+
+    def __init__(self):
+        self.bucket_counts = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.total_seconds = 0.0
+        self.db_seconds = 0.0
+        self.queries = 0
+        self.duplicate_queries = 0
+
+    def observe(self, seconds, db_seconds, queries, duplicate_queries):
+        # Buckets are stored non-cumulatively and summed up when rendering
+        index = bisect_left(LATENCY_BUCKETS, seconds)
+        if index < len(self.bucket_counts):
+            self.bucket_counts[index] += 1
+        self.count += 1
+        self.total_seconds += seconds
+        self.db_seconds += db_seconds
+        self.queries += queries
+        self.duplicate_queries += duplicate_queries
+
+
+class MetricsRegistry:
+    """Thread-safe collection of RouteStats keyed by (method, route, status class)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def observe(self, method, route, status, seconds, db_seconds, queries, duplicate_queries):
+        key = (method, route, f'{status // 100}xx')
+        with self._lock:
+            stats = self._routes.get(key)
+            if stats is None:
+                stats = self._routes[key] = RouteStats()
+            stats.observe(seconds, db_seconds, queries, duplicate_queries)
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+    def render(self):
+        """Return every metric in Prometheus text exposition format."""
+        lines = [
+            '# HELP http_request_duration_seconds Request wall time by route.',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        with self._lock:
+            snapshot = sorted(self._routes.items())
+            for (method, route, status), stats in snapshot:
+                labels = f'method="{method}",route="{_escape(route)}",status="{status}"'
+                cumulative = 0
+                for bound, bucket_count in zip(LATENCY_BUCKETS, stats.bucket_counts):
+                    cumulative += bucket_count
+                    lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats.count}')
+                lines.append(f'http_request_duration_seconds_sum{{{labels}}} {stats.total_seconds:.6f}')
+                lines.append(f'http_request_duration_seconds_count{{{labels}}} {stats.count}')
+
+            counters = (
+                ('http_request_db_seconds_total', 'Time spent in the database by route.', 'db_seconds', '{:.6f}'),
+                ('http_request_queries_total', 'SQL queries executed by route.', 'queries', '{}'),
+                ('http_request_duplicate_queries_total', 'Repeated identical SQL (likely N+1) by route.', 'duplicate_queries', '{}'),
+            )
+            for name, help_text, attr, fmt in counters:
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} counter')
+                for (method, route, status), stats in snapshot:
+                    labels = f'method="{method}",route="{_escape(route)}",status="{status}"'
+                    lines.append(f'{name}{{{labels}}} {fmt.format(getattr(stats, attr))}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,287 @@
+"""
+Per-request performance instrumentation and on-demand profiling.
+
+Opt-in with PERF_INSTRUMENTATION=True. For every request we record wall time,
+DB time, query count, duplicate queries (the usual N+1 signature) and time
+spent building serializer output, then:
+  - expose them in a Server-Timing header (visible in the browser dev tools),
+  - write one structured JSON log line to the 'monitoring.requests' logger,
+  - feed the per-route histograms served at /api/_metrics.
+"""
+import contextvars
+import json
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .metrics import registry
+
+logger = logging.getLogger('monitoring.requests')
+
+# Serializer time for the request currently being handled (None when not measuring)
+_serializer_timer = contextvars.ContextVar('serializer_timer', default=None)
+# Query recorder for the request currently being handled, so helper threads can report into it
+_query_recorder = contextvars.ContextVar('query_recorder', default=None)
+
+
+class _SerializerTimer:
+    def __init__(self):
+        self.seconds = 0.0
+        self.depth = 0
+
+
+def _instrument_serializers():
+    """
+    Time BaseSerializer.data so nested serializers that call .data themselves
+    (e.g. CustomerSerializer.get_recent_orders) are only counted once, at the
+    outermost level. Queries fired while serializing still count as DB time too.
+    """
+    from rest_framework.serializers import BaseSerializer
+
+    original = BaseSerializer.data
+    if getattr(original.fget, '_instrumented', False):
+        return
+
+    def timed_data(self):
+        timer = _serializer_timer.get()
+        if timer is None:
+            return original.fget(self)
+        timer.depth += 1
+        started = time.perf_counter()
+        try:
+            return original.fget(self)
+        finally:
+            timer.depth -= 1
+            if timer.depth == 0:
+                timer.seconds += time.perf_counter() - started
+
+    timed_data._instrumented = True
+    BaseSerializer.data = property(timed_data)
+
+
+class _QueryRecorder:
+    """connection.execute_wrapper hook that times every query and remembers its SQL."""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.statements = Counter()
+        self._merge_lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.statements[sql] += 1
+
+    def merge(self, other):
+        """Add another recorder's queries (one per helper thread) to this one."""
+        with self._merge_lock:
+            self.seconds += other.seconds
+            self.statements.update(other.statements)
+
+    @property
+    def count(self):
+        return sum(self.statements.values())
+
+    @property
+    def duplicates(self):
+        # Same SQL text run more than once - every extra run counts
+        return sum(n - 1 for n in self.statements.values() if n > 1)
+
+
+class PerformanceMiddleware:
+    """Records where the time goes for each request. See module docstring."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PERF_INSTRUMENTATION', False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        _instrument_serializers()
+
+    def __call__(self, request):
+        recorder = _QueryRecorder()
+        timer = _SerializerTimer()
+        token = _serializer_timer.set(timer)
+        recorder_token = _query_recorder.set(recorder)
+        started = time.perf_counter()
+        try:
+            with _wrap_all_connections(recorder):
+                response = self.get_response(request)
+        finally:
+            _query_recorder.reset(recorder_token)
+            _serializer_timer.reset(token)
+        wall = time.perf_counter() - started
+
+        response['Server-Timing'] = ', '.join([
+            f'total;dur={wall * 1000:.1f}',
+            f'db;dur={recorder.seconds * 1000:.1f};desc="{recorder.count} queries, {recorder.duplicates} dup"',
+            f'ser;dur={timer.seconds * 1000:.1f}',
+        ])
+
+        route = _route_name(request)
+        registry.observe(request.method, route, response.status_code, wall, recorder.seconds,
+                         recorder.count, recorder.duplicates)
+
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'route': route,
+            'status': response.status_code,
+            'wall_ms': round(wall * 1000, 2),
+            'db_ms': round(recorder.seconds * 1000, 2),
+            'queries': recorder.count,
+            'duplicate_queries': recorder.duplicates,
+            'serializer_ms': round(timer.seconds * 1000, 2),
+        }))
+        return response
+
+
+def _route_name(request):
+    """Low-cardinality label for the request - the URL name, never the raw path."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.view_name or match.route
+
+
+@contextmanager
+def worker_queries():
+    """
+    Count the queries a helper thread runs for the current request (e.g. the
+    reports thread pool): they go through that thread's own connections, which
+    the middleware never wrapped. Run the work inside this block in a copy of
+    the request's context; its DB time and queries are added to the request's
+    when the block ends. A no-op when the request isn't being measured.
+    """
+    recorder = _query_recorder.get()
+    if recorder is None:
+        yield
+        return
+    worker = _QueryRecorder()
+    try:
+        with _wrap_all_connections(worker):
+            yield
+    finally:
+        recorder.merge(worker)
+
+
+class _wrap_all_connections:
+    """Install a recorder on every configured database alias for the duration of a block."""
+
+    def __init__(self, recorder):
+        self.recorder = recorder
+        self.contexts = []
+
+    def __enter__(self):
+        for alias in connections:
+            context = connections[alias].execute_wrapper(self.recorder)
+            context.__enter__()
+            self.contexts.append(context)
+        return self.recorder
+
+    def __exit__(self, *exc_info):
+        while self.contexts:
+            self.contexts.pop().__exit__(*exc_info)
+        return False
+
+
+class ProfilingMiddleware:
+    """
+    Guarded request profiler (see monitoring/profiling.py).
+
+    A request is profiled when a staff user asks for it with an `X-Profile: 1`
+    header or `?_profile=1`, or at random with probability PROFILING_SAMPLE_RATE.
+    Everyone else pays only for a header lookup. Captures show up in the admin
+    under Monitoring > Profile captures.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        trigger, user = self._should_profile(request)
+        if trigger is None:
+            return self.get_response(request)
+
+        from .profiling import PROFILERS
+
+        profiler = PROFILERS[settings.PROFILING_MODE]()
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.stop()
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        try:
+            capture = _save_capture(request, response, profiler, trigger, user, duration_ms)
+            response['X-Profile-Id'] = str(capture.pk)
+        except Exception:
+            # Profiling must never break the request it was observing
+            logger.exception('Failed to store profile for %s', request.path)
+        return response
+
+    def _should_profile(self, request):
+        wants_profile = request.META.get('HTTP_X_PROFILE') == '1' or request.GET.get('_profile') == '1'
+        if wants_profile:
+            user = _resolve_user(request)
+            if user is not None and user.is_staff:
+                return 'staff', user
+        rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0.0)
+        if rate > 0 and random.random() < rate:
+            return 'sampled', None
+        return None, None
+
+
+def _resolve_user(request):
+    """Session user (admin) or JWT bearer - middleware runs before DRF authenticates."""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user
+    from accounts.authentication import CachedJWTAuthentication
+    try:
+        result = CachedJWTAuthentication().authenticate(request)
+    except Exception:
+        return None
+    return result[0] if result else None
+
+
+def _save_capture(request, response, profiler, trigger, user, duration_ms):
+    from django.core.files.base import ContentFile
+    from .models import ProfileCapture
+
+    capture = ProfileCapture(
+        kind=settings.PROFILING_MODE,
+        trigger=trigger,
+        method=request.method,
+        path=request.path[:500],
+        route=_route_name(request)[:200],
+        status_code=response.status_code,
+        duration_ms=round(duration_ms, 2),
+        user=user,
+        breakdown=profiler.breakdown(),
+        summary=profiler.summary(),
+    )
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    capture.file.save(f'{stamp}-{capture.route.replace(":", "-") or "request"}.{profiler.file_extension}',
+                      ContentFile(profiler.dump()), save=False)
+    capture.save()
+
+    # Only keep the most recent PROFILING_MAX_CAPTURES around
+    stale = ProfileCapture.objects.order_by('-created_at')[settings.PROFILING_MAX_CAPTURES:]
+    for old in stale:
+        old.file.delete(save=False)
+        old.delete()
+    return capture
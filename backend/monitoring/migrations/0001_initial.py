@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:45
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import monitoring.models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileCapture',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('cprofile', 'cProfile (.prof)'), ('sampling', 'Stack samples (collapsed)')], max_length=20)),
+                ('trigger', models.CharField(choices=[('staff', 'Requested by staff'), ('sampled', 'Random sample')], max_length=20)),
+                ('method', models.CharField(max_length=10)),
+                ('path', models.CharField(max_length=500)),
+                ('route', models.CharField(blank=True, max_length=200)),
+                ('status_code', models.PositiveSmallIntegerField()),
+                ('duration_ms', models.FloatField()),
+                ('breakdown', models.JSONField(default=dict)),
+                ('summary', models.TextField(blank=True)),
+                ('file', models.FileField(storage=monitoring.models.profile_storage, upload_to='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
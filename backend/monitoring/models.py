@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import models
+
+
+def profile_storage():
+    # Kept outside MEDIA_ROOT so captures are never served publicly
+    return FileSystemStorage(location=settings.PROFILING_DIR)
+
+
+class ProfileCapture(models.Model):
+    """One profiled request, kept so slow production requests can be inspected later."""
+    KIND_CHOICES = [
+        ('cprofile', 'cProfile (.prof)'),
+        ('sampling', 'Stack samples (collapsed)'),
+    ]
+    TRIGGER_CHOICES = [
+        ('staff', 'Requested by staff'),
+        ('sampled', 'Random sample'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    trigger = models.CharField(max_length=20, choices=TRIGGER_CHOICES)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=500)
+    route = models.CharField(max_length=200, blank=True)
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    # Milliseconds spent in our app code, the ORM, serialization and everything else
+    breakdown = models.JSONField(default=dict)
+    summary = models.TextField(blank=True)
+    file = models.FileField(storage=profile_storage)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} ms)"
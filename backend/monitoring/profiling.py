@@ -0,0 +1,128 @@
+"""
+On-demand request profilers.
+
+Two flavours, picked with PROFILING_MODE:
+  - 'cprofile': deterministic cProfile run saved as a .prof file
+    (open with snakeviz, or `python -m pstats`).
+  - 'sampling': a background thread samples the request thread's stack every
+    few milliseconds and saves collapsed stacks ("a;b;c 42" per line), ready
+    for flamegraph.pl or speedscope.
+
+Both also summarise where time went - our own app code (e.g. reports.views
+loops), the ORM, or DRF serialization - so the admin list is useful at a glance.
+"""
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+# Buckets for the time breakdown, matched against the source file path
+APP_PACKAGES = ('accounts', 'customers', 'inventory', 'notifications', 'orders', 'reports', 'warehouses')
+CATEGORIES = (
+    ('serialization', (os.sep + os.path.join('rest_framework', 'serializers'), os.sep + os.path.join('rest_framework', 'fields'))),
+    ('orm', (os.sep + os.path.join('django', 'db') + os.sep,)),
+)
+
+
+def categorize(filename):
+    """Map a source file to 'app', 'orm', 'serialization' or 'other'."""
+    for category, markers in CATEGORIES:
+        if any(marker in filename for marker in markers):
+            return category
+    base_dir = str(settings.BASE_DIR) + os.sep
+    if filename.startswith(base_dir):
+        package = filename[len(base_dir):].split(os.sep, 1)[0]
+        if package in APP_PACKAGES:
+            return 'app'
+    return 'other'
+
+
+class CProfileCapture:
+    file_extension = 'prof'
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+
+    def start(self):
+        self.profiler.enable()
+
+    def stop(self):
+        self.profiler.disable()
+
+    def dump(self):
+        """Return the raw .prof bytes (the same marshal format pstats.dump_stats writes)."""
+        return marshal.dumps(pstats.Stats(self.profiler).stats)
+
+    def breakdown(self):
+        """Self time (ms) per category."""
+        totals = Counter()
+        for (filename, _, _), (_, _, tottime, _, _) in pstats.Stats(self.profiler).stats.items():
+            totals[categorize(filename)] += tottime * 1000
+        return {category: round(ms, 2) for category, ms in totals.items()}
+
+    def summary(self, limit=30):
+        out = io.StringIO()
+        pstats.Stats(self.profiler, stream=out).sort_stats('cumulative').print_stats(limit)
+        return out.getvalue()
+
+
+class StackSampler:
+    """Samples one thread's Python stack on an interval from a helper thread."""
+    file_extension = 'collapsed'
+
+    def __init__(self, interval=None):
+        self.interval = interval or settings.PROFILING_SAMPLE_INTERVAL
+        self.target = threading.get_ident()
+        self.stacks = Counter()
+        self.leaf_categories = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.is_set():
+            frame = sys._current_frames().get(self.target)
+            if frame is not None:
+                self._record(frame)
+            time.sleep(self.interval)
+
+    def _record(self, frame):
+        stack = []
+        leaf_file = frame.f_code.co_filename
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+            frame = frame.f_back
+        self.stacks[';'.join(reversed(stack))] += 1
+        self.leaf_categories[categorize(leaf_file)] += 1
+
+    def dump(self):
+        """Return collapsed stacks, one 'frame;frame;frame count' line each."""
+        lines = (f'{stack} {count}' for stack, count in self.stacks.most_common())
+        return '\n'.join(lines).encode() + b'\n'
+
+    def breakdown(self):
+        """Estimated time (ms) per category, from which code was on top of the stack."""
+        return {category: round(count * self.interval * 1000, 2) for category, count in self.leaf_categories.items()}
+
+    def summary(self, limit=30):
+        return '\n'.join(f'{count:6d}  {stack[-300:]}' for stack, count in self.stacks.most_common(limit))
+
+
+PROFILERS = {
+    'cprofile': CProfileCapture,
+    'sampling': StackSampler,
+}
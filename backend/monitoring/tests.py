@@ -0,0 +1,126 @@
+import json
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import FileSystemStorage
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient, APITestCase
+
+from config.testing import make_user
+
+from .metrics import MetricsRegistry, registry
+from .middleware import _QueryRecorder
+from .models import ProfileCapture
+
+User = get_user_model()
+
+
+class QueryRecorderTests(TestCase):
+    def test_counts_repeated_sql_as_duplicates(self):
+        recorder = _QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            for _ in range(3):
+                User.objects.filter(pk=1).exists()
+            User.objects.count()
+        self.assertEqual(recorder.count, 4)
+        self.assertEqual(recorder.duplicates, 2)
+
+
+class MetricsRegistryTests(TestCase):
+    def test_histogram_buckets_are_cumulative(self):
+        metrics = MetricsRegistry()
+        metrics.observe('GET', 'orders-list', 200, 0.004, 0.001, 3, 1)
+        metrics.observe('GET', 'orders-list', 201, 0.3, 0.1, 5, 0)
+        text = metrics.render()
+        labels = 'method="GET",route="orders-list",status="2xx"'
+        self.assertIn(f'http_request_duration_seconds_bucket{{{labels},le="0.005"}} 1', text)
+        self.assertIn(f'http_request_duration_seconds_bucket{{{labels},le="0.5"}} 2', text)
+        self.assertIn(f'http_request_duration_seconds_count{{{labels}}} 2', text)
+        self.assertIn(f'http_request_queries_total{{{labels}}} 8', text)
+        self.assertIn(f'http_request_duplicate_queries_total{{{labels}}} 1', text)
+
+
+@override_settings(PERF_INSTRUMENTATION=True, PERF_METRICS_TOKEN='scrape-token')
+class PerformanceMiddlewareTests(APITestCase):
+    def setUp(self):
+        registry.reset()
+        self.user = make_user('perf')
+
+    def test_server_timing_and_metrics(self):
+        self.client.force_authenticate(self.user)
+        with self.assertLogs('monitoring.requests') as logs:
+            response = self.client.get('/api/reports/reorder/')
+        self.assertEqual(response.status_code, 200)
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual((line['route'], line['status']), ('reorder-suggestions', 200))
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'^total;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries, \d+ dup", ser;dur=[\d.]+$')
+
+        self.client.force_authenticate(None)
+        with self.assertLogs('monitoring.requests'):
+            response = self.client.get('/api/_metrics', HTTP_AUTHORIZATION='Bearer scrape-token')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('route="reorder-suggestions",status="2xx"', response.content.decode())
+
+    def test_metrics_need_staff_or_the_token(self):
+        with self.assertLogs('monitoring.requests'):
+            self.assertEqual(self.client.get('/api/_metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+            self.client.force_authenticate(self.user)
+            self.assertEqual(self.client.get('/api/_metrics').status_code, 403)
+
+
+@override_settings(PERF_INSTRUMENTATION=True)
+class ParallelReportTimingTests(TransactionTestCase):
+    client_class = APIClient
+
+    # Outside a test transaction, so the reports actually go to the thread pool
+    def test_pool_queries_are_counted(self):
+        user = make_user('perf')
+        self.client.force_authenticate(user)
+        counts = {}
+        for workers in (1, 4):
+            with override_settings(REPORTS_PARALLEL_WORKERS=workers), self.assertLogs('monitoring.requests') as logs:
+                response = self.client.get('/api/reports/dashboard/')
+            self.assertEqual(response.status_code, 200)
+            counts[workers] = json.loads(logs.records[0].getMessage())['queries']
+            self.assertIn(f'desc="{counts[workers]} queries', response['Server-Timing'])
+        self.assertGreater(counts[1], 5)
+        self.assertEqual(counts[4], counts[1])
+
+
+@override_settings(PROFILING_ENABLED=True, PROFILING_MODE='cprofile', PROFILING_SAMPLE_RATE=0.0, PROFILING_MAX_CAPTURES=2)
+class ProfilingMiddlewareTests(APITestCase):
+    def setUp(self):
+        self.storage_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.storage_dir)
+        field = ProfileCapture._meta.get_field('file')
+        patcher = mock.patch.object(field, 'storage', FileSystemStorage(location=self.storage_dir))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.staff = make_user('staff', is_staff=True)
+        self.user = make_user('plain')
+
+    def test_staff_request_is_captured(self):
+        self.client.force_login(self.staff)
+        response = self.client.get('/api/reports/reorder/', HTTP_X_PROFILE='1')
+        capture = ProfileCapture.objects.get(pk=response['X-Profile-Id'])
+        self.assertEqual((capture.trigger, capture.route, capture.user), ('staff', 'reorder-suggestions', self.staff))
+        self.assertTrue(capture.file.storage.exists(capture.file.name))
+        self.assertTrue(set(capture.breakdown) <= {'app', 'orm', 'serialization', 'other'})
+
+    def test_others_are_not_profiled(self):
+        self.client.force_login(self.user)
+        response = self.client.get('/api/reports/reorder/', HTTP_X_PROFILE='1')
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertFalse(ProfileCapture.objects.exists())
+
+    def test_only_the_latest_captures_are_kept(self):
+        self.client.force_login(self.staff)
+        for _ in range(3):
+            self.client.get('/api/reports/reorder/?_profile=1')
+        self.assertEqual(ProfileCapture.objects.count(), 2)
+        self.assertEqual(len(os.listdir(self.storage_dir)), 2)
@@ -0,0 +1,41 @@
+import hmac
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.permissions import BasePermission, IsAdminUser
+from accounts.authentication import CachedJWTAuthentication
+
+from .metrics import registry
+
+METRICS_AUTH = 'metrics-token'
+
+
+class MetricsTokenAuthentication(BaseAuthentication):
+    """
+    Lets a Prometheus scraper in with `Authorization: Bearer <PERF_METRICS_TOKEN>`.
+    Anything else falls through to the normal JWT check.
+    """
+
+    def authenticate(self, request):
+        expected = getattr(settings, 'PERF_METRICS_TOKEN', '')
+        supplied = request.META.get('HTTP_AUTHORIZATION', '')
+        if expected and hmac.compare_digest(supplied, f'Bearer {expected}'):
+            return (AnonymousUser(), METRICS_AUTH)
+        return None
+
+
+class HasMetricsToken(BasePermission):
+    def has_permission(self, request, view):
+        return request.auth == METRICS_AUTH
+
+
+# GET /api/_metrics - Prometheus scrape endpoint (staff users or the metrics token)
+@api_view(['GET'])
+@authentication_classes([MetricsTokenAuthentication, CachedJWTAuthentication])
+@permission_classes([HasMetricsToken | IsAdminUser])
+def metrics(request):
+    """Per-route latency histograms and query counters in Prometheus text format."""
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -11,5 +11,6 @@ class OrderAdmin(admin.ModelAdmin):
 
 @admin.register(OrderItem)
 class OrderItemAdmin(admin.ModelAdmin):
-    list_display = ('order', 'product', 'quantity', 'unit_price', 'subtotal')
+    list_display = ('order', 'product', 'warehouse', 'quantity', 'unit_price', 'subtotal')
+    list_filter = ('warehouse',)
 
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('warehouses', '0001_initial'),
+        ('orders', '0002_order_tracking_number'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='warehouse',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='order_items', to='warehouses.warehouse'),
+        ),
+    ]
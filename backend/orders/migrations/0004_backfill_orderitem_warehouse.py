@@ -0,0 +1,28 @@
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_warehouse(apps, schema_editor):
+    """
+    Older order items never recorded where their stock came from.
+    Order creation always drew from the first inventory row holding the product,
+    so attribute each item to that warehouse - done as one UPDATE ... SELECT.
+    """
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    InventoryItem = apps.get_model('inventory', 'InventoryItem')
+    first_stock = InventoryItem.objects.filter(product_id=OuterRef('product_id')).order_by('id')
+    OrderItem.objects.filter(warehouse__isnull=True).update(
+        warehouse_id=Subquery(first_stock.values('warehouse_id')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0002_product_image'),
+        ('orders', '0003_orderitem_warehouse'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_warehouse, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_backfill_orderitem_warehouse'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['updated_at', 'id'], name='orders_orde_updated_40110c_idx'),
+        ),
+    ]
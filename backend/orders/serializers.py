@@ -1,8 +1,20 @@
 from rest_framework import serializers
 from django.db import transaction
+from django.db.models import Prefetch
 from .models import Order, OrderItem
 from inventory.models import Product
-from inventory.serializers import ProductSerializer
+from inventory.serializers import ProductSerializer, stock_prefetch
+from inventory.stock import refresh_stock_status
+from customers.credit import open_amount, reserve_credit
+from reservations.holds import active_holds, take_stock
+
+
+def order_prefetches(lookup='items'):
+    """Prefetches for everything OrderSerializer embeds - a fixed number of queries however many orders."""
+    return [
+        Prefetch(lookup, queryset=OrderItem.objects.select_related('product__category')),
+        stock_prefetch(f'{lookup}__product__inventory_items'),
+    ]
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
@@ -14,22 +26,26 @@ class OrderItemSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = OrderItem
-        fields = ('id', 'product', 'product_id', 'quantity', 'unit_price', 'subtotal')
+        fields = ('id', 'product', 'product_id', 'warehouse', 'quantity', 'unit_price', 'subtotal')
+        read_only_fields = ('warehouse',)
 
 
 class OrderSerializer(serializers.ModelSerializer):
     items = OrderItemSerializer(many=True)
     customer_name = serializers.CharField(source='customer.name', read_only=True)
     total_amount = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+    # Stock holds (reservations app) this order turns into real stock - at most one per product
+    hold_ids = serializers.ListField(child=serializers.IntegerField(), write_only=True, required=False)
 
     class Meta:
         model = Order
         fields = ('id', 'order_number', 'tracking_number', 'customer', 'customer_name', 'status', 'total_amount', 
-                  'items', 'created_at', 'updated_at')
+                  'items', 'hold_ids', 'created_at', 'updated_at')
         read_only_fields = ('id', 'order_number', 'created_at', 'updated_at', 'total_amount')
 
     def create(self, validated_data):
         items_data = validated_data.pop('items')
+        hold_ids = set(validated_data.pop('hold_ids', []))
         
         # Calculate total amount using product prices from DB for security
         total_amount = sum(item['quantity'] * item['product'].price for item in items_data)
@@ -43,7 +59,27 @@ class OrderSerializer(serializers.ModelSerializer):
         validated_data['total_amount'] = total_amount
         
         with transaction.atomic():
+            # Counts against the credit limit straight away - refused orders roll back before touching stock
+            customer = validated_data['customer']
+            status = validated_data.get('status', 'pending')
+            if not reserve_credit(customer.id, open_amount(status, total_amount)):
+                raise serializers.ValidationError({
+                    'customer': f"Order total {total_amount} exceeds the available credit for '{customer.name}'."
+                })
+
             order = Order.objects.create(**validated_data)
+            touched_products = set()
+
+            # Locked so two orders can't both consume the same hold
+            holds = {
+                hold.product_id: hold
+                for hold in active_holds().select_for_update().filter(id__in=hold_ids, user=order.user)
+            } if hold_ids else {}
+            ordered = {item['product'].id for item in items_data}
+            if len(holds) != len(hold_ids) or not holds.keys() <= ordered:
+                raise serializers.ValidationError({
+                    'hold_ids': 'Holds must be your own, unexpired, one per product and for products in this order.'
+                })
             
             # Create Order Items and Update Inventory
             for item_data in items_data:
@@ -53,42 +89,26 @@ class OrderSerializer(serializers.ModelSerializer):
                 unit_price = product.price
                 subtotal = quantity * unit_price
                 
-                # Check for sufficient stock in ANY warehouse
-                # Logic: Find first warehouse with enough stock
-                # In a real app, you'd likely select specific warehouse logic
-                from inventory.models import InventoryItem
-                
-                inventory_item = InventoryItem.objects.filter(
-                    product=product,
-                    quantity__gte=quantity
-                ).first()
-                
-                if not inventory_item:
+                # A held line comes from its hold's warehouse; otherwise the first warehouse
+                # with enough stock that isn't held for someone else
+                warehouse_id = take_stock(product.id, quantity, holds.pop(product.id, None))
+                if warehouse_id is None:
                     raise serializers.ValidationError(
                         f"Insufficient stock for product '{product.name}'. Requested: {quantity}"
                     )
-                
-                # Decrement stock
-                inventory_item.quantity -= quantity
-                inventory_item.save()
-                
-                # Update product status based on total stock
-                total_stock = sum(item.quantity for item in product.inventory_items.all())
-                if total_stock == 0:
-                    product.status = 'out_of_stock'
-                elif total_stock < 10: # Threshold
-                    product.status = 'low_stock'
-                else:
-                    product.status = 'in_stock'
-                product.save()
+                touched_products.add(product.id)
 
                 OrderItem.objects.create(
                     order=order, 
                     product=product, 
+                    warehouse_id=warehouse_id,
                     quantity=quantity,
                     unit_price=unit_price,
                     subtotal=subtotal
                 )
+
+            # One set-based status check for everything this order drew down
+            refresh_stock_status(touched_products, user=order.user)
             
         return order
 
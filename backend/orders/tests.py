@@ -0,0 +1,120 @@
+import threading
+from decimal import Decimal
+from unittest import mock
+
+from django.db import connection
+from django.test import TransactionTestCase
+
+from config.testing import FixtureTestCase, make_customer, make_stock
+from customers.credit import order_changed, reserve_credit
+from customers.models import Customer
+from .models import Order, OrderItem
+from .views import OrderViewSet
+
+
+class OrderTestCase(FixtureTestCase):
+    """Orders placed through the API for the Acme customer, one line of the SKU-1 widget."""
+    username = 'orders'
+
+    def stock(self, warehouse, quantity):
+        return make_stock(self.product, warehouse, quantity)
+
+    def create_order(self, quantity, **extra):
+        return self.client.post('/api/orders/', {
+            'customer': self.customer.id,
+            'items': [{'product_id': self.product.id, 'quantity': quantity, 'unit_price': '10.00'}],
+            **extra,
+        }, format='json')
+
+
+class WarehouseAttributionTests(OrderTestCase):
+    def test_line_records_the_warehouse_it_drew_from(self):
+        east, west = self.stock(self.east, 3), self.stock(self.west, 50)
+        response = self.create_order(5)
+        self.assertEqual(response.status_code, 201, response.data)
+
+        # East can't cover 5, so the whole line comes from West
+        item = OrderItem.objects.get(order_id=response.data['id'])
+        self.assertEqual(item.warehouse_id, self.west.id)
+        self.assertEqual(response.data['items'][0]['warehouse'], self.west.id)
+        east.refresh_from_db()
+        west.refresh_from_db()
+        self.assertEqual((east.quantity, west.quantity), (3, 45))
+
+    def test_insufficient_stock_rolls_back(self):
+        self.stock(self.east, 3)
+        response = self.create_order(5)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Order.objects.exists())
+
+
+class CreditTests(OrderTestCase):
+    def setUp(self):
+        super().setUp()
+        self.stock(self.east, 100)
+        Customer.objects.filter(pk=self.customer.pk).update(credit_limit=100)
+
+    def open_balance(self):
+        self.customer.refresh_from_db()
+        return self.customer.open_balance
+
+    def test_order_over_the_limit_is_refused(self):
+        self.assertEqual(self.create_order(8).status_code, 201)
+        response = self.create_order(3)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('customer', response.data)
+        self.assertEqual(self.open_balance(), Decimal('80'))
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_delivery_releases_the_exposure_once(self):
+        order_id = self.create_order(8).data['id']
+        for _ in range(2):
+            response = self.client.patch(f'/api/orders/{order_id}/update_status/', {'status': 'delivered'}, format='json')
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.open_balance(), Decimal('0'))
+
+    def test_status_is_read_under_the_lock(self):
+        order_id = self.create_order(8).data['id']
+        get_object = OrderViewSet.get_object
+
+        def delivered_meanwhile(view):
+            # Another request delivers the order after this one has loaded it
+            order = get_object(view)
+            stale_status = order.status
+            Order.objects.filter(pk=order.pk).update(status='delivered')
+            order_changed(Order.objects.get(pk=order.pk), order.customer_id, stale_status)
+            return order
+
+        for method, url, data in (
+            ('patch', f'/api/orders/{order_id}/update_status/', {'status': 'delivered'}),
+            ('patch', f'/api/orders/{order_id}/', {'status': 'cancelled'}),
+        ):
+            Order.objects.filter(pk=order_id).update(status='pending')
+            Customer.objects.filter(pk=self.customer.pk).update(open_balance=80)
+            with mock.patch.object(OrderViewSet, 'get_object', delivered_meanwhile):
+                response = getattr(self.client, method)(url, data, format='json')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(self.open_balance(), Decimal('0'), url)
+
+
+class ConcurrentCreditTests(TransactionTestCase):
+    def test_concurrent_reservations_never_pass_the_limit(self):
+        customer = make_customer(credit_limit=100)
+        start, results = threading.Barrier(6), []
+
+        def checkout():
+            start.wait(5)
+            try:
+                results.append(reserve_credit(customer.id, Decimal('30')))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=checkout) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        customer.refresh_from_db()
+        self.assertEqual(sorted(results), [False, False, False, True, True, True])
+        self.assertEqual(customer.open_balance, Decimal('90'))
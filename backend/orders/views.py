@@ -3,8 +3,18 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from .models import Order, OrderItem
-from .serializers import OrderSerializer
+from .serializers import OrderSerializer, order_prefetches
 from notifications.utils import create_notification
+from sync.feeds import ChangeFeedMixin
+from idempotency.decorators import idempotent
+from webhooks.events import publish_order_created, publish_order_status_changed
+from customers.credit import order_changed, order_deleted
+from django.db import transaction
+
+
+def locked_order(order):
+    """The order's current row, locked until the end of the transaction (call inside atomic)."""
+    return Order.objects.select_for_update().get(pk=order.pk)
 
 
 # This ViewSet automatically gives us CRUD operations for orders
@@ -13,7 +23,8 @@ from notifications.utils import create_notification
 # GET /orders/{id}/ - get specific order
 # PUT /orders/{id}/ - update order
 # DELETE /orders/{id}/ - delete order
-class OrderViewSet(viewsets.ModelViewSet):
+# GET /orders/changes/?updated_since=... - what changed since the last sync
+class OrderViewSet(ChangeFeedMixin, viewsets.ModelViewSet):
     """ViewSet for Order CRUD operations."""
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]  # Must be logged in
@@ -21,7 +32,7 @@ class OrderViewSet(viewsets.ModelViewSet):
     # Only show orders that belong to the current user
     # select_related and prefetch_related optimize database queries
     def get_queryset(self):
-        queryset = Order.objects.filter(user=self.request.user).select_related('customer').prefetch_related('items')
+        queryset = Order.objects.filter(user=self.request.user).select_related('customer').prefetch_related(*order_prefetches())
         
         # Filter by status (e.g. /orders/?status=pending)
         status = self.request.query_params.get('status')
@@ -40,9 +51,17 @@ class OrderViewSet(viewsets.ModelViewSet):
             
         return queryset
 
+    # Retried POSTs with the same Idempotency-Key get the original order back instead of a duplicate
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
     # When creating an order, automatically assign it to the current user
+    # The webhook outbox row commits together with the order
     def perform_create(self, serializer):
-        order = serializer.save(user=self.request.user)
+        with transaction.atomic():
+            order = serializer.save(user=self.request.user)
+            publish_order_created(order)
         create_notification(
             user=self.request.user,
             title="New Order Created",
@@ -52,16 +71,38 @@ class OrderViewSet(viewsets.ModelViewSet):
 
     # Custom action - updates just the order status
     # Accessible at PATCH /orders/{id}/update_status/
+    # Status or customer edits move the order's credit exposure with it. The old values are
+    # re-read under a row lock, so two concurrent edits can't both release the same exposure
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            serializer.instance = locked_order(serializer.instance)
+            old_customer_id, old_status = serializer.instance.customer_id, serializer.instance.status
+            order = serializer.save()
+            order_changed(order, old_customer_id, old_status)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance = locked_order(instance)
+            order_deleted(instance)
+            instance.delete()
+
     @action(detail=True, methods=['patch'])
+    @idempotent
     def update_status(self, request, pk=None):
         """Update order status."""
         order = self.get_object()
         new_status = request.data.get('status')
         # Make sure it's a valid status (pending, processing, shipped, etc.)
         if new_status in dict(Order.STATUS_CHOICES):
-            old_status = order.status
-            order.status = new_status
-            order.save()
+            with transaction.atomic():
+                order = locked_order(order)
+                old_status = order.status
+                order.status = new_status
+                order.save()
+                if old_status != new_status:
+                    # Delivery or cancellation releases the order's credit exposure
+                    order_changed(order, order.customer_id, old_status)
+                    publish_order_status_changed(order, old_status)
             
             if old_status != new_status:
                 create_notification(
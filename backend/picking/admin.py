@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import PickWave
+
+
+@admin.register(PickWave)
+class PickWaveAdmin(admin.ModelAdmin):
+    list_display = ('id', 'warehouse', 'user', 'status', 'order_count', 'unit_count', 'created_at', 'released_at')
+    list_filter = ('status', 'warehouse')
+    raw_id_fields = ('orders',)
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:29
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('warehouses', '0001_initial'),
+        ('orders', '0005_order_updated_at_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PickWave',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('planned', 'Planned'), ('released', 'Released')], default='planned', max_length=20)),
+                ('order_count', models.PositiveIntegerField(default=0)),
+                ('unit_count', models.PositiveIntegerField(default=0)),
+                ('pick_list', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('released_at', models.DateTimeField(blank=True, null=True)),
+                ('orders', models.ManyToManyField(related_name='pick_waves', to='orders.order')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pick_waves', to=settings.AUTH_USER_MODEL)),
+                ('warehouse', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pick_waves', to='warehouses.warehouse')),
+            ],
+            options={
+                'ordering': ['-created_at', 'id'],
+                'indexes': [models.Index(fields=['user', 'status'], name='picking_pic_user_id_ba33bf_idx')],
+            },
+        ),
+    ]
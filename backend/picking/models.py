@@ -0,0 +1,37 @@
+from django.db import models
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+class PickWave(models.Model):
+    """
+    A batch of open orders picked together at one warehouse (see picking/waves.py).
+    An order with lines at several warehouses is in one wave per warehouse.
+    """
+    PLANNED = 'planned'
+    RELEASED = 'released'
+    STATUS_CHOICES = [
+        (PLANNED, 'Planned'),
+        (RELEASED, 'Released'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='pick_waves')
+    warehouse = models.ForeignKey('warehouses.Warehouse', on_delete=models.CASCADE, related_name='pick_waves')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PLANNED)
+    orders = models.ManyToManyField('orders.Order', related_name='pick_waves')
+    order_count = models.PositiveIntegerField(default=0)
+    unit_count = models.PositiveIntegerField(default=0)
+    # [{product_id, sku, name, location, quantity, order_ids}] - one line per product, in bin order
+    pick_list = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+    released_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at', 'id']
+        indexes = [
+            models.Index(fields=['user', 'status']),
+        ]
+
+    def __str__(self):
+        return f"Wave {self.pk} - {self.warehouse.name} ({self.order_count} orders)"
@@ -0,0 +1,20 @@
+from rest_framework import serializers
+from .models import PickWave
+
+
+class PickWaveSerializer(serializers.ModelSerializer):
+    warehouse_name = serializers.CharField(source='warehouse.name', read_only=True)
+    order_ids = serializers.PrimaryKeyRelatedField(source='orders', many=True, read_only=True)
+
+    class Meta:
+        model = PickWave
+        fields = ('id', 'warehouse', 'warehouse_name', 'status', 'order_count', 'unit_count',
+                  'order_ids', 'pick_list', 'created_at', 'released_at')
+        read_only_fields = fields
+
+
+class PlanWavesSerializer(serializers.Serializer):
+    """Options for POST /picking/waves/plan/ - the limits default to PICK_WAVE_MAX_ORDERS/UNITS."""
+    warehouse_ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    max_orders = serializers.IntegerField(required=False, min_value=1)
+    max_units = serializers.IntegerField(required=False, min_value=1)
@@ -0,0 +1,65 @@
+from config.testing import FixtureTestCase, make_order, make_product, make_stock
+from orders.models import Order
+from .models import PickWave
+
+
+class WaveTests(FixtureTestCase):
+    username = 'picking'
+
+    def setUp(self):
+        super().setUp()
+        self.products = {}
+        # Created out of bin order, so sorting by id would give a different walk
+        for sku, location in (('SKU-C', 'C-01'), ('SKU-A', 'A-01'), ('SKU-B', 'B-01')):
+            self.products[sku] = make_product(sku, sku)
+            make_stock(self.products[sku], self.east, 100, location=location)
+
+    def order(self, *lines, status='pending'):
+        return make_order(self.user, self.customer, [(self.products[sku], quantity) for sku, quantity in lines],
+                          status=status, warehouse=self.east)
+
+    def plan(self, **options):
+        response = self.client.post('/api/picking/waves/plan/', options, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data
+
+    def test_pick_list_is_consolidated_in_bin_order(self):
+        first, second = self.order(('SKU-C', 2), ('SKU-A', 1)), self.order(('SKU-A', 3))
+        self.order(('SKU-B', 5), status='shipped')  # Not open
+
+        [wave] = self.plan()
+        self.assertEqual((sorted(wave['order_ids']), wave['unit_count']), ([first.id, second.id], 6))
+        self.assertEqual(
+            [(line['sku'], line['location'], line['quantity'], line['order_ids']) for line in wave['pick_list']],
+            [('SKU-A', 'A-01', 4, [first.id, second.id]), ('SKU-C', 'C-01', 2, [first.id])],
+        )
+
+    def test_orders_in_the_same_aisles_share_a_wave(self):
+        a1, c, a2 = self.order(('SKU-A', 1)), self.order(('SKU-C', 1)), self.order(('SKU-A', 1))
+        waves = self.plan(max_orders=2)
+        self.assertEqual(sorted(sorted(wave['order_ids']) for wave in waves), [[a1.id, a2.id], [c.id]])
+
+        # Unit limit: an order over it still gets a wave of its own
+        self.order(('SKU-B', 50))
+        waves = self.plan(max_units=10)
+        self.assertEqual(sorted(wave['unit_count'] for wave in waves), [1, 2, 50])
+        # Replanning replaced the first plan
+        self.assertEqual(PickWave.objects.count(), 3)
+
+    def test_release(self):
+        kept, cancelled = self.order(('SKU-A', 1), ('SKU-B', 2)), self.order(('SKU-B', 3))
+        [wave] = self.plan()
+        Order.objects.filter(pk=cancelled.pk).update(status='cancelled')
+
+        response = self.client.post(f"/api/picking/waves/{wave['id']}/release/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['status'], response.data['orders_moved']), ('released', 1))
+        # The cancelled order's units came off the pick list
+        self.assertEqual(response.data['order_ids'], [kept.id])
+        self.assertEqual([line['quantity'] for line in response.data['pick_list']], [1, 2])
+        kept.refresh_from_db()
+        self.assertEqual(kept.status, 'processing')
+
+        self.assertEqual(self.client.post(f"/api/picking/waves/{wave['id']}/release/").status_code, 400)
+        # Released orders aren't planned again
+        self.assertEqual(self.plan(), [])
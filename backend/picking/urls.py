@@ -0,0 +1,10 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import PickWaveViewSet
+
+router = DefaultRouter()
+router.register(r'waves', PickWaveViewSet, basename='pick-wave')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
@@ -0,0 +1,48 @@
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from .models import PickWave
+from .serializers import PickWaveSerializer, PlanWavesSerializer
+from .waves import plan_waves, release_wave, save_waves
+
+
+# GET /picking/waves/ - the user's waves (?status=planned, ?warehouse=3)
+# GET /picking/waves/{id}/ - one wave with its pick list
+# POST /picking/waves/plan/ - batch open orders into new waves (replaces unreleased ones)
+# POST /picking/waves/{id}/release/ - start picking: the wave's pending orders move to processing
+class PickWaveViewSet(viewsets.ReadOnlyModelViewSet):
+    """Pick waves planned from the user's open orders."""
+    serializer_class = PickWaveSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = PickWave.objects.filter(user=self.request.user).select_related('warehouse').prefetch_related('orders')
+        wave_status = self.request.query_params.get('status')
+        if wave_status:
+            queryset = queryset.filter(status=wave_status)
+        warehouse = self.request.query_params.get('warehouse')
+        if warehouse:
+            queryset = queryset.filter(warehouse_id=warehouse)
+        return queryset
+
+    @action(detail=False, methods=['post'])
+    def plan(self, request):
+        options = PlanWavesSerializer(data=request.data)
+        options.is_valid(raise_exception=True)
+        warehouse_ids = options.validated_data.get('warehouse_ids')
+        waves = plan_waves(
+            request.user, warehouse_ids,
+            options.validated_data.get('max_orders'), options.validated_data.get('max_units'),
+        )
+        created = save_waves(request.user, waves, warehouse_ids)
+        saved = self.get_queryset().filter(id__in=[wave.id for wave in created]).order_by('warehouse__name', 'id')
+        return Response(PickWaveSerializer(saved, many=True).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['post'])
+    def release(self, request, pk=None):
+        wave, moved = release_wave(self.get_object().pk, request.user)
+        if wave is None:
+            return Response({'error': 'Wave already released'}, status=status.HTTP_400_BAD_REQUEST)
+        data = PickWaveSerializer(self.get_queryset().get(pk=wave.pk)).data
+        return Response({**data, 'orders_moved': moved})
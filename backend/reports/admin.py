@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import ReorderSuggestion
+
+
+@admin.register(ReorderSuggestion)
+class ReorderSuggestionAdmin(admin.ModelAdmin):
+    list_display = ('product', 'forecast_daily', 'reorder_point', 'on_hand', 'suggested_quantity', 'days_of_cover', 'computed_at')
+    list_filter = ('method',)
+    search_fields = ('product__sku', 'product__name')
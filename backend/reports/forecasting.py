@@ -0,0 +1,156 @@
+"""
+Demand forecasting and reorder-point suggestions.
+
+Daily unit sales per (product, warehouse) are pulled out of OrderItem in a
+single grouped query and packed into a (SKU x day) NumPy matrix, so the
+forecast, safety stock and reorder point for every SKU come out of a handful
+of array operations instead of a per-product Python loop.
+"""
+import math
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from inventory.models import InventoryItem
+from orders.models import OrderItem
+from .models import ReorderSuggestion
+
+FORECAST_METHODS = ('sma', 'ses')
+
+
+def load_daily_sales(history_days):
+    """
+    Return (product_ids, warehouse_ids, sales) where sales[i, d] is the units of
+    product_ids[i] shipped from warehouse_ids[i] on day d of the window
+    (oldest first, today last).
+    """
+    today = timezone.now().date()
+    start = today - timedelta(days=history_days - 1)
+
+    rows = (
+        OrderItem.objects
+        .filter(order__created_at__date__gte=start, warehouse__isnull=False)
+        .exclude(order__status='cancelled')
+        .annotate(day=TruncDate('order__created_at'))
+        .values_list('product_id', 'warehouse_id', 'day')
+        .annotate(units=Sum('quantity'))
+        .order_by()
+    )
+    rows = list(rows)
+    if not rows:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.zeros((0, history_days), dtype=np.float32)
+
+    product_col = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+    warehouse_col = np.fromiter((r[1] for r in rows), dtype=np.int64, count=len(rows))
+    day_col = np.fromiter(((r[2] - start).days for r in rows), dtype=np.int64, count=len(rows))
+    units_col = np.fromiter((r[3] for r in rows), dtype=np.float32, count=len(rows))
+
+    # Fold (product, warehouse) into one int64 key so np.unique can index the rows
+    stride = int(warehouse_col.max()) + 1
+    keys, row_index = np.unique(product_col * stride + warehouse_col, return_inverse=True)
+    sales = np.zeros((len(keys), history_days), dtype=np.float32)
+    np.add.at(sales, (row_index, day_col), units_col)
+    return keys // stride, keys % stride, sales
+
+
+def forecast_demand(sales, method='sma', window=28, alpha=0.3):
+    """
+    Forecast next-day demand for every row of the sales matrix.
+
+    'sma' is a simple moving average over the last `window` days, 'ses' is
+    simple exponential smoothing with smoothing factor `alpha`.
+    Returns (forecast, sigma) - the daily demand forecast and its spread.
+    """
+    if method not in FORECAST_METHODS:
+        raise ValueError(f"Unknown forecast method '{method}'")
+
+    recent = sales[:, -window:]
+    sigma = recent.std(axis=1)
+    if method == 'sma':
+        return recent.mean(axis=1), sigma
+
+    # Smoothing runs along the time axis, but each step updates every SKU at once
+    level = sales[:, 0].copy()
+    for day in range(1, sales.shape[1]):
+        level = alpha * sales[:, day] + (1 - alpha) * level
+    return level, sigma
+
+
+def compute_reorder_points(forecast, sigma, on_hand, lead_time_days, service_z):
+    """
+    Classic reorder point: expected demand over the lead time plus safety stock.
+    Suggested quantity tops stock back up to the reorder point plus one more
+    lead time of demand, and is zero while stock is still above the reorder point.
+    """
+    lead_demand = forecast * lead_time_days
+    safety_stock = service_z * sigma * math.sqrt(lead_time_days)
+    reorder_point = np.ceil(lead_demand + safety_stock)
+    order_up_to = reorder_point + np.ceil(lead_demand)
+    suggested = np.where(on_hand <= reorder_point, np.maximum(order_up_to - on_hand, 0), 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        days_of_cover = np.where(forecast > 0, on_hand / forecast, np.nan)
+    return safety_stock, reorder_point, suggested, days_of_cover
+
+
+def build_suggestions(history_days=None, lead_time_days=None, service_z=None, method=None, window=None, alpha=None):
+    """Run the whole pipeline and return a list of unsaved ReorderSuggestion rows."""
+    history_days = history_days or settings.FORECAST_HISTORY_DAYS
+    lead_time_days = lead_time_days or settings.FORECAST_LEAD_TIME_DAYS
+    service_z = service_z if service_z is not None else settings.FORECAST_SERVICE_LEVEL_Z
+    method = method or settings.FORECAST_METHOD
+    window = min(window or settings.FORECAST_WINDOW_DAYS, history_days)
+    alpha = alpha if alpha is not None else settings.FORECAST_SMOOTHING_ALPHA
+
+    product_ids, warehouse_ids, sales = load_daily_sales(history_days)
+    if not len(product_ids):
+        return []
+
+    # Current stock for the same (product, warehouse) pairs in one query
+    stock = {
+        (product_id, warehouse_id): quantity
+        for product_id, warehouse_id, quantity in InventoryItem.objects
+        .filter(product_id__in=np.unique(product_ids).tolist())
+        .values_list('product_id', 'warehouse_id', 'quantity')
+    }
+    pairs = list(zip(product_ids.tolist(), warehouse_ids.tolist()))
+    on_hand = np.fromiter((stock.get(pair, 0) for pair in pairs), dtype=np.float32, count=len(pairs))
+
+    forecast, sigma = forecast_demand(sales, method=method, window=window, alpha=alpha)
+    safety_stock, reorder_point, suggested, days_of_cover = compute_reorder_points(
+        forecast, sigma, on_hand, lead_time_days, service_z
+    )
+
+    now = timezone.now()
+    return [
+        ReorderSuggestion(
+            product_id=pid,
+            warehouse_id=wid,
+            method=method,
+            forecast_daily=round(float(f), 3),
+            safety_stock=round(float(ss), 3),
+            reorder_point=int(rp),
+            on_hand=int(oh),
+            suggested_quantity=int(sq),
+            days_of_cover=None if math.isnan(dc) else round(float(dc), 1),
+            computed_at=now,
+        )
+        for (pid, wid), f, ss, rp, oh, sq, dc in zip(
+            pairs, forecast.tolist(), safety_stock.tolist(), reorder_point.tolist(),
+            on_hand.tolist(), suggested.tolist(), days_of_cover.tolist(),
+        )
+    ]
+
+
+def refresh_suggestions(**options):
+    """Replace the stored snapshot with a fresh run. Returns the number of rows written."""
+    suggestions = build_suggestions(**options)
+    with transaction.atomic():
+        ReorderSuggestion.objects.all().delete()
+        ReorderSuggestion.objects.bulk_create(suggestions, batch_size=5000)
+    return len(suggestions)
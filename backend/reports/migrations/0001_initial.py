@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('inventory', '0002_product_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReorderSuggestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('method', models.CharField(choices=[('sma', 'Simple moving average'), ('ses', 'Exponential smoothing')], default='sma', max_length=10)),
+                ('forecast_daily', models.FloatField(default=0)),
+                ('safety_stock', models.FloatField(default=0)),
+                ('reorder_point', models.PositiveIntegerField(default=0)),
+                ('on_hand', models.PositiveIntegerField(default=0)),
+                ('suggested_quantity', models.PositiveIntegerField(default=0)),
+                ('days_of_cover', models.FloatField(blank=True, null=True)),
+                ('computed_at', models.DateTimeField()),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reorder_suggestions', to='inventory.product')),
+            ],
+            options={
+                'ordering': [models.OrderBy(models.F('days_of_cover'), nulls_last=True)],
+                'indexes': [models.Index(fields=['suggested_quantity'], name='reports_reo_suggest_00f7ab_idx')],
+            },
+        ),
+    ]
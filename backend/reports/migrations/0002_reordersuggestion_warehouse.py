@@ -0,0 +1,25 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def clear_snapshot(apps, schema_editor):
+    # The snapshot is rebuilt by `manage.py forecast_reorder`; old per-product rows have no warehouse
+    apps.get_model('reports', 'ReorderSuggestion').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('warehouses', '0001_initial'),
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_snapshot, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='reordersuggestion',
+            name='warehouse',
+            field=models.ForeignKey(default=0, on_delete=django.db.models.deletion.CASCADE, related_name='reorder_suggestions', to='warehouses.warehouse'),
+            preserve_default=False,
+        ),
+    ]
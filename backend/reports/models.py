@@ -0,0 +1,29 @@
+from django.db import models
+
+
+class ReorderSuggestion(models.Model):
+    """Latest demand forecast and reorder point for a product at one warehouse (rebuilt nightly)."""
+    METHOD_CHOICES = [
+        ('sma', 'Simple moving average'),
+        ('ses', 'Exponential smoothing'),
+    ]
+
+    product = models.ForeignKey('inventory.Product', on_delete=models.CASCADE, related_name='reorder_suggestions')
+    warehouse = models.ForeignKey('warehouses.Warehouse', on_delete=models.CASCADE, related_name='reorder_suggestions')
+    method = models.CharField(max_length=10, choices=METHOD_CHOICES, default='sma')
+    forecast_daily = models.FloatField(default=0)
+    safety_stock = models.FloatField(default=0)
+    reorder_point = models.PositiveIntegerField(default=0)
+    on_hand = models.PositiveIntegerField(default=0)
+    suggested_quantity = models.PositiveIntegerField(default=0)
+    days_of_cover = models.FloatField(null=True, blank=True)
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        ordering = [models.F('days_of_cover').asc(nulls_last=True)]
+        indexes = [
+            models.Index(fields=['suggested_quantity']),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id}@{self.warehouse_id}: reorder at {self.reorder_point}"
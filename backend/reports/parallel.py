@@ -0,0 +1,64 @@
+"""
+Run independent report queries side by side.
+
+DRF views here are synchronous, so instead of async ORM calls the composite
+report endpoints hand their independent sections to a small, bounded thread
+pool. Each section gets its own database connection, so page latency ends up
+close to the slowest query rather than the sum of all of them. Works the same
+under WSGI and ASGI. Queries run in the pool still show up in the request's
+Server-Timing and metrics: each task records its worker connection's queries
+and adds them to the request's totals (monitoring.middleware.worker_queries).
+"""
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+from monitoring.middleware import worker_queries
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.REPORTS_PARALLEL_WORKERS,
+                thread_name_prefix='reports',
+            )
+    return _executor
+
+
+def _run_in_worker(func):
+    try:
+        # Worker queries count towards the request's DB time and query total (PERF_INSTRUMENTATION)
+        with worker_queries():
+            return func()
+    finally:
+        # Pool threads are long-lived, so treat each task like a request:
+        # keep the connection for reuse unless it's broken or past CONN_MAX_AGE
+        close_old_connections()
+
+
+def run_parallel(**sections):
+    """
+    Call every keyword's function and return {name: result}.
+
+    Falls back to running them one after another when the pool is disabled
+    (REPORTS_PARALLEL_WORKERS <= 1) or when the caller is inside a transaction,
+    since other connections can't see its uncommitted rows.
+    """
+    if settings.REPORTS_PARALLEL_WORKERS <= 1 or connection.in_atomic_block:
+        return {name: func() for name, func in sections.items()}
+
+    executor = _get_executor()
+    # Copy the request's context so worker queries follow the same database routing
+    futures = {
+        name: executor.submit(contextvars.copy_context().run, _run_in_worker, func)
+        for name, func in sections.items()
+    }
+    return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,119 @@
+import threading
+
+import numpy as np
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from config.testing import make_customer, make_order, make_product, make_stock, make_user, make_warehouse
+from .forecasting import build_suggestions, compute_reorder_points, forecast_demand
+from .models import ReorderSuggestion
+from .parallel import run_parallel
+
+
+class ForecastingTests(APITestCase):
+    def test_moving_average_and_smoothing(self):
+        sales = np.array([[0, 0, 10, 10], [4, 4, 4, 4]], dtype=np.float32)
+        forecast, sigma = forecast_demand(sales, method='sma', window=2)
+        np.testing.assert_allclose(forecast, [10, 4])
+        np.testing.assert_allclose(sigma, [0, 0])
+
+        forecast, _ = forecast_demand(sales, method='ses', alpha=0.5)
+        # 0 -> 0 -> 5 -> 7.5 for the first row; a flat series stays flat
+        np.testing.assert_allclose(forecast, [7.5, 4])
+
+        with self.assertRaises(ValueError):
+            forecast_demand(sales, method='arima')
+
+    def test_reorder_points(self):
+        forecast = np.array([2.0, 2.0, 0.0])
+        sigma = np.zeros(3)
+        on_hand = np.array([5.0, 50.0, 10.0])
+        _, reorder_point, suggested, days_of_cover = compute_reorder_points(forecast, sigma, on_hand, 7, 1.65)
+        np.testing.assert_allclose(reorder_point, [14, 14, 0])
+        # Below the reorder point: top up to it plus another lead time of demand
+        np.testing.assert_allclose(suggested, [23, 0, 0])
+        self.assertEqual(days_of_cover[0], 2.5)
+        self.assertTrue(np.isnan(days_of_cover[2]))
+
+    def test_suggestions_are_per_warehouse(self):
+        user, customer, product = make_user('forecast'), make_customer(), make_product('SKU-F', 'Forecast')
+        east, west = make_warehouse('East'), make_warehouse('West')
+        make_stock(product, east, 7)
+        make_stock(product, west, 500)
+        make_order(user, customer, [(product, 28)], warehouse=east)
+        make_order(user, customer, [(product, 280)], warehouse=west)
+
+        rows = {s.warehouse_id: s for s in build_suggestions(history_days=28, method='sma', window=28)}
+        self.assertEqual(set(rows), {east.id, west.id})
+        self.assertAlmostEqual(rows[east.id].forecast_daily, 1.0)
+        self.assertAlmostEqual(rows[west.id].forecast_daily, 10.0)
+        self.assertEqual((rows[east.id].on_hand, rows[west.id].on_hand), (7, 500))
+
+
+class ReorderSuggestionViewTests(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(make_user('reports'))
+        warehouse = make_warehouse()
+        now = timezone.now()
+        for i in range(3):
+            product = make_product(f'SKU-{i}', f'Product {i}')
+            ReorderSuggestion.objects.create(
+                product=product, warehouse=warehouse, suggested_quantity=i, days_of_cover=i, computed_at=now,
+            )
+
+    def test_limit(self):
+        response = self.client.get('/api/reports/reorder/', {'limit': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 2)
+
+        response = self.client.get('/api/reports/reorder/', {'needs_reorder': 'true'})
+        self.assertEqual([row['suggested_quantity'] for row in response.data], [1, 2])
+
+    def test_bad_limit_is_a_400(self):
+        for limit in ('abc', '0', '-5'):
+            response = self.client.get('/api/reports/reorder/', {'limit': limit})
+            self.assertEqual(response.status_code, 400, limit)
+            self.assertIn('limit', response.data)
+
+
+class RunParallelTests(SimpleTestCase):
+    def test_sections_run_side_by_side(self):
+        # Each section waits for the other, so this only finishes if they overlap
+        barrier = threading.Barrier(2, timeout=5)
+
+        def section(value):
+            barrier.wait()
+            return value, threading.current_thread().name
+
+        with override_settings(REPORTS_PARALLEL_WORKERS=2):
+            results = run_parallel(first=lambda: section(1), second=lambda: section(2))
+        self.assertEqual([results['first'][0], results['second'][0]], [1, 2])
+        self.assertTrue(all(name.startswith('reports') for _, name in results.values()))
+
+    @override_settings(REPORTS_PARALLEL_WORKERS=1)
+    def test_pool_disabled_runs_inline(self):
+        results = run_parallel(only=lambda: threading.current_thread().name)
+        self.assertEqual(results, {'only': threading.current_thread().name})
+
+    def test_errors_reach_the_caller(self):
+        def broken():
+            raise ZeroDivisionError
+
+        with self.assertRaises(ZeroDivisionError):
+            run_parallel(ok=lambda: 1, broken=broken)
+
+
+class DashboardTests(APITestCase):
+    def test_dashboard_sections(self):
+        # Inside the test transaction the sections run one after another on this connection
+        user = make_user('dash')
+        customer, product = make_customer(created_by=user), make_product()
+        make_order(user, customer, [(product, 4)], status='delivered')
+        make_order(user, customer, [(product, 6)])
+        self.client.force_authenticate(user)
+        response = self.client.get('/api/reports/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_orders'], 2)
+        self.assertEqual(len(response.data['recent_orders']), 2)
+        self.assertEqual(response.data['total_customers'], 1)
@@ -7,5 +7,6 @@ urlpatterns = [
     path('products/', views.product_performance, name='product-performance'),
     path('category/', views.category_performance, name='category-performance'),
     path('warehouses/', views.warehouse_performance, name='warehouse-performance'),
+    path('reorder/', views.reorder_suggestions, name='reorder-suggestions'),
 ]
 
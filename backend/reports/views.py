@@ -1,14 +1,44 @@
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from django.db.models import Sum, Count, Q, F
+from django.db.models import Sum, Count, Q, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, TruncDate, TruncMonth
+from decimal import Decimal
 from django.utils import timezone
 from datetime import timedelta
-from orders.models import Order, OrderItem
+from orders.models import Order
 from inventory.models import Product, InventoryItem
 from customers.models import Customer
 from warehouses.models import Warehouse
 from orders.serializers import OrderSerializer
+from archive.reads import history_sources, sum_aggregates, sum_rows
+from config.params import positive_int
+from .models import ReorderSuggestion
+from .parallel import run_parallel
+
+
+# Orders that count towards sales figures (everything except cancelled)
+SALES_STATUSES = ['delivered', 'shipped', 'pending', 'processing']
+
+
+def _product_sales(sources, user, limit, with_orders=False):
+    """Revenue and units per product across the user's non-cancelled orders, best sellers first."""
+    rowsets = []
+    for _, items in sources:
+        rows = (
+            items.objects
+            .filter(order__user=user, order__status__in=SALES_STATUSES)
+            .values('product_id', 'product__name', 'product__status')
+            .annotate(revenue=Sum('subtotal'), sales=Sum('quantity'))
+        )
+        if with_orders:
+            rows = rows.annotate(orders=Count('order', distinct=True))
+        rowsets.append(rows.order_by('-revenue'))
+    if len(rowsets) == 1:
+        return list(rowsets[0][:limit])
+    # Ranking across live and archived sales needs every product's totals from both
+    fields = ['revenue', 'sales', 'orders'] if with_orders else ['revenue', 'sales']
+    return sorted(sum_rows(rowsets, 'product_id', fields), key=lambda row: row['revenue'], reverse=True)[:limit]
 
 
 @api_view(['GET'])
@@ -19,124 +49,123 @@ def dashboard_stats(request):
     
     # Filter orders by user
     user_orders = Order.objects.filter(user=user)
+    # All-time figures include archived orders; the recent ones (weekly chart, latest orders) never reach that far back
+    sources = history_sources(user)
+    
+    today = timezone.now().date()
+    week_ago = today - timedelta(days=7)
+    two_weeks_ago = today - timedelta(days=14)
+    this_week = Q(created_at__date__gte=week_ago, created_at__date__lte=today)
+    last_week = Q(created_at__date__gte=two_weeks_ago, created_at__date__lt=week_ago)
     
-    # Total revenue (all time)
-    total_revenue = sum(order.total_amount for order in user_orders)
+    # Each section below is an independent query, so they all run at the same time
+    def order_totals():
+        # All-time revenue, order count and this/last week revenue in a single pass per table
+        return sum_aggregates([
+            orders.objects.filter(user=user).aggregate(
+                total_revenue=Coalesce(Sum('total_amount'), Value(Decimal('0'))),
+                total_orders=Count('id'),
+                revenue_this_week=Coalesce(Sum('total_amount', filter=this_week), Value(Decimal('0'))),
+                revenue_last_week=Coalesce(Sum('total_amount', filter=last_week), Value(Decimal('0'))),
+            )
+            for orders, _ in sources
+        ])
     
-    # Orders count
-    total_orders = user_orders.count()
+    def recent_orders():
+        recent = user_orders.select_related('customer').prefetch_related(
+            'items__product__category', 'items__product__inventory_items__warehouse'
+        )[:5]
+        return OrderSerializer(recent, many=True).data
     
-    # Recent orders (last 5)
-    recent_orders = user_orders[:5]
-    recent_orders_data = OrderSerializer(recent_orders, many=True).data
+    def total_products():
+        return Product.objects.count()
     
-    # Inventory stats
-    inventory_items = InventoryItem.objects.filter(
-        warehouse__is_active=True
-    )
-    total_products = Product.objects.count()
-    total_stock = sum(item.quantity for item in inventory_items)
+    def total_stock():
+        return InventoryItem.objects.filter(
+            warehouse__is_active=True
+        ).aggregate(total=Coalesce(Sum('quantity'), 0))['total']
     
-    # Top products by revenue
-    top_products_data = []
-    products_with_revenue = {}
-    for order in user_orders.filter(status__in=['delivered', 'shipped', 'pending', 'processing']):
-        for item in order.items.all():
-            product_id = item.product.id
-            if product_id not in products_with_revenue:
-                products_with_revenue[product_id] = {
-                    'name': item.product.name,
-                    'revenue': 0,
-                    'sales': 0
-                }
-            products_with_revenue[product_id]['revenue'] += float(item.subtotal)
-            products_with_revenue[product_id]['sales'] += item.quantity
+    def top_products():
+        return [
+            {'name': row['product__name'], 'revenue': float(row['revenue']), 'sales': row['sales']}
+            for row in _product_sales(sources, user, 5)
+        ]
     
-    top_products = sorted(
-        products_with_revenue.values(),
-        key=lambda x: x['revenue'],
-        reverse=True
-    )[:5]
+    def weekly_data():
+        # Last 7 days grouped by day in one query, then filled in so empty days still show up
+        rows = user_orders.filter(
+            created_at__date__gte=today - timedelta(days=6)
+        ).annotate(day=TruncDate('created_at')).values('day').annotate(
+            revenue=Sum('total_amount'), orders=Count('id')
+        ).order_by()
+        by_day = {row['day']: row for row in rows}
+        data = []
+        for i in range(6, -1, -1):
+            day = today - timedelta(days=i)
+            row = by_day.get(day, {})
+            data.append({
+                'name': day.strftime('%a')[0],  # First letter of day
+                'value': float(row.get('revenue') or 0),
+                'orders': row.get('orders', 0)
+            })
+        return data
     
-    # Weekly sales data (last 7 days)
-    weekly_data = []
-    for i in range(6, -1, -1):
-        day = timezone.now() - timedelta(days=i)
-        day_orders = user_orders.filter(
-            created_at__date=day.date()
+    def customer_counts():
+        return Customer.objects.filter(created_by=user).aggregate(
+            total=Count('id'),
+            this_week=Count('id', filter=this_week),
+            last_week=Count('id', filter=last_week),
         )
-        revenue = sum(order.total_amount for order in day_orders)
-        weekly_data.append({
-            'name': day.strftime('%a')[0],  # First letter of day
-            'value': float(revenue),
-            'orders': day_orders.count()
-        })
+    
+    def avg_response_seconds():
+        # Time from order creation to its latest update, averaged over up to 100 orders
+        spans = list(user_orders.filter(
+            updated_at__gt=F('created_at')
+        ).values_list('created_at', 'updated_at')[:100])
+        if not spans:
+            return 0
+        return int(sum((updated - created).total_seconds() for created, updated in spans) / len(spans))
+    
+    results = run_parallel(
+        totals=order_totals,
+        recent_orders=recent_orders,
+        total_products=total_products,
+        total_stock=total_stock,
+        top_products=top_products,
+        weekly_data=weekly_data,
+        customers=customer_counts,
+        avg_response_time=avg_response_seconds,
+    )
+    totals = results['totals']
+    customers = results['customers']
     
     # Calculate growth metrics
     # 1. Conversion Rate: orders per customer
-    total_customers = Customer.objects.filter(user=user).count()
+    total_orders = totals['total_orders']
+    total_customers = customers['total']
     conversion_rate = (total_orders / total_customers * 100) if total_customers > 0 else 0
     
     # 2. Customer Growth: compare this week vs last week
-    today = timezone.now().date()
-    week_ago = today - timedelta(days=7)
-    two_weeks_ago = today - timedelta(days=14)
-    
-    customers_this_week = Customer.objects.filter(
-        user=user,
-        created_at__date__gte=week_ago,
-        created_at__date__lte=today
-    ).count()
-    
-    customers_last_week = Customer.objects.filter(
-        user=user,
-        created_at__date__gte=two_weeks_ago,
-        created_at__date__lt=week_ago
-    ).count()
-    
-    customer_growth = ((customers_this_week - customers_last_week) / customers_last_week * 100) if customers_last_week > 0 else 0
+    customers_last_week = customers['last_week']
+    customer_growth = ((customers['this_week'] - customers_last_week) / customers_last_week * 100) if customers_last_week > 0 else 0
     
     # 3. Revenue Growth: compare this week vs last week
-    revenue_this_week = sum(
-        order.total_amount for order in user_orders.filter(
-            created_at__date__gte=week_ago,
-            created_at__date__lte=today
-        )
-    )
-    
-    revenue_last_week = sum(
-        order.total_amount for order in user_orders.filter(
-            created_at__date__gte=two_weeks_ago,
-            created_at__date__lt=week_ago
-        )
-    )
-    
-    revenue_growth = ((revenue_this_week - revenue_last_week) / revenue_last_week * 100) if revenue_last_week > 0 else 0
-    
-    # 4. Average Response Time: time from order creation to first status change
-    # Calculate average time between order creation and first update
-    avg_response_seconds = 0
-    orders_with_updates = user_orders.filter(updated_at__gt=timezone.F('created_at'))[:100]
-    if orders_with_updates.exists():
-        total_seconds = sum(
-            (order.updated_at - order.created_at).total_seconds() 
-            for order in orders_with_updates
-        )
-        avg_response_seconds = int(total_seconds / orders_with_updates.count())
+    revenue_last_week = totals['revenue_last_week']
+    revenue_growth = ((totals['revenue_this_week'] - revenue_last_week) / revenue_last_week * 100) if revenue_last_week > 0 else 0
     
     return Response({
-        'total_revenue': float(total_revenue),
+        'total_revenue': float(totals['total_revenue']),
         'total_orders': total_orders,
-        'total_products': total_products,
-        'total_stock': total_stock,
-        'recent_orders': recent_orders_data,
-        'top_products': top_products,
-        'weekly_data': weekly_data,
+        'total_products': results['total_products'],
+        'total_stock': results['total_stock'],
+        'recent_orders': results['recent_orders'],
+        'top_products': results['top_products'],
+        'weekly_data': results['weekly_data'],
         # Growth metrics
         'conversion_rate': round(conversion_rate, 1),
         'customer_growth': round(customer_growth, 1),
-        'revenue_growth': round(revenue_growth, 1),
-        'avg_response_time': avg_response_seconds,
+        'revenue_growth': round(float(revenue_growth), 1),
+        'avg_response_time': results['avg_response_time'],
         'total_customers': total_customers,
     })
 
@@ -150,27 +179,33 @@ def revenue_report(request):
     end_date = timezone.now()
     start_date = end_date - timedelta(days=30 * months)
     
-    orders = Order.objects.filter(
-        user=user,
-        created_at__gte=start_date,
-        created_at__lte=end_date
-    )
+    # One grouped query for every month instead of two queries per month (per table, when some are archived)
+    rowsets = [
+        orders.objects.filter(
+            user=user,
+            created_at__gte=start_date,
+            created_at__lte=end_date
+        ).annotate(month=TruncMonth('created_at')).values('month').annotate(
+            revenue=Sum('total_amount'), orders=Count('id')
+        ).order_by()
+        for orders, _ in history_sources(user)
+    ]
+    by_month = {
+        (row['month'].year, row['month'].month): row
+        for row in sum_rows(rowsets, 'month', ['revenue', 'orders'])
+    }
     
-    # Group by month
+    # Walk the months so ones without orders still appear
     monthly_data = []
     current = start_date.replace(day=1) 
     # Use day 28 for comparison to ensure we don't skip the last month if end_date is early in month
     target_end = end_date.replace(day=28)
     while current <= target_end:
-        month_orders = orders.filter(
-            created_at__year=current.year,
-            created_at__month=current.month
-        )
-        revenue = sum(order.total_amount for order in month_orders)
+        row = by_month.get((current.year, current.month), {})
         monthly_data.append({
             'month': current.strftime('%b'),
-            'revenue': float(revenue),
-            'orders': month_orders.count()
+            'revenue': float(row.get('revenue') or 0),
+            'orders': row.get('orders', 0)
         })
         
         # Move to next month safely
@@ -178,19 +213,6 @@ def revenue_report(request):
             current = current.replace(year=current.year + 1, month=1)
         else:
             current = current.replace(month=current.month + 1)
-            
-    # Post-loop check using target_end to be consistent
-    if monthly_data and monthly_data[-1]['month'] != target_end.strftime('%b'):
-         month_orders = orders.filter(
-            created_at__year=target_end.year,
-            created_at__month=target_end.month
-        )
-         revenue = sum(order.total_amount for order in month_orders)
-         monthly_data.append({
-            'month': target_end.strftime('%b'),
-            'revenue': float(revenue),
-            'orders': month_orders.count()
-        })
     
     return Response(monthly_data)
 
@@ -200,44 +222,34 @@ def revenue_report(request):
 def product_performance(request):
     """Get product performance data."""
     user = request.user
-    user_orders = Order.objects.filter(user=user)
-    
-    # Get products from user's orders
-    products_with_data = {}
-    total_revenue = 0
+    sources = history_sources(user)
     
-    for order in user_orders.filter(status__in=['delivered', 'shipped', 'pending', 'processing']):
-        for item in order.items.all():
-            product_id = item.product.id
-            if product_id not in products_with_data:
-                products_with_data[product_id] = {
-                    'name': item.product.name,
-                    'revenue': 0,
-                    'orders': set(),
-                    'sales': 0,
-                    'status': item.product.status
-                }
-            products_with_data[product_id]['revenue'] += float(item.subtotal)
-            products_with_data[product_id]['orders'].add(order.id)
-            products_with_data[product_id]['sales'] += item.quantity
-            total_revenue += float(item.subtotal)
+    # Top 10 products and the overall total are independent queries - run them together
+    results = run_parallel(
+        top=lambda: _product_sales(sources, user, 10, with_orders=True),
+        total_revenue=lambda: sum(
+            items.objects.filter(
+                order__user=user, order__status__in=SALES_STATUSES
+            ).aggregate(total=Sum('subtotal'))['total'] or 0
+            for _, items in sources
+        ),
+    )
+    total_revenue = float(results['total_revenue'])
     
-    # Convert to list and calculate percentages
     data = []
-    for product_data in products_with_data.values():
-        percentage = (product_data['revenue'] / total_revenue * 100) if total_revenue > 0 else 0
+    for row in results['top']:
+        revenue = float(row['revenue'])
+        percentage = (revenue / total_revenue * 100) if total_revenue > 0 else 0
         data.append({
-            'name': product_data['name'],
-            'revenue': product_data['revenue'],
-            'orders': len(product_data['orders']),
-            'sales': product_data['sales'],
-            'status': product_data['status'],
+            'name': row['product__name'],
+            'revenue': revenue,
+            'orders': row['orders'],
+            'sales': row['sales'],
+            'status': row['product__status'],
             'percentage': round(percentage, 1)
         })
     
-    # Sort by revenue and take top 10
-    data.sort(key=lambda x: x['revenue'], reverse=True)
-    return Response(data[:10])
+    return Response(data)
 
 
 @api_view(['GET'])
@@ -245,18 +257,43 @@ def product_performance(request):
 def warehouse_performance(request):
     """Get warehouse performance data."""
     user = request.user
-    warehouses = Warehouse.objects.filter(is_active=True)
-    user_orders = Order.objects.filter(user=user, status__in=['delivered', 'shipped'])
+    
+    # Only count the user's shipped/delivered order lines, attributed to the warehouse that fulfilled them
+    fulfilled = Q(
+        order_items__order__user=user,
+        order_items__order__status__in=['delivered', 'shipped'],
+    )
+    # Stock on hand comes from a correlated subquery so it doesn't multiply with the order join
+    stock_on_hand = InventoryItem.objects.filter(
+        warehouse=OuterRef('pk')
+    ).values('warehouse').annotate(total=Sum('quantity')).values('total')
+    
+    # Everything in one grouped query - no per-warehouse round trips
+    warehouses = Warehouse.objects.filter(is_active=True).annotate(
+        orders_count=Count('order_items__order', filter=fulfilled, distinct=True),
+        revenue=Coalesce(Sum('order_items__subtotal', filter=fulfilled), Value(Decimal('0'))),
+        units_shipped=Coalesce(Sum('order_items__quantity', filter=fulfilled), 0),
+        used_space=Coalesce(Subquery(stock_on_hand), 0),
+    )
+    
+    # Archived lines don't hang off Warehouse.order_items, so their share is grouped separately and added on
+    archived = {}
+    sources = history_sources(user)
+    if len(sources) > 1:
+        _, archived_items = sources[1]
+        archived = {
+            row['warehouse_id']: row
+            for row in archived_items.objects.filter(
+                order__user=user, order__status__in=['delivered', 'shipped'], warehouse__isnull=False,
+            ).values('warehouse_id').annotate(
+                orders=Count('order', distinct=True), revenue=Sum('subtotal'), units=Sum('quantity'),
+            ).order_by()
+        }
     
     data = []
     for warehouse in warehouses:
-        # Count inventory items in this warehouse
-        inventory_items = InventoryItem.objects.filter(warehouse=warehouse)
-        # Calculate currently used space (sum of all product quantities)
-        used_space = sum(item.quantity for item in inventory_items)
-        
-        # Get orders count (simplified distribution)
-        orders_count = user_orders.count() // warehouses.count() if warehouses.count() > 0 else 0
+        used_space = warehouse.used_space
+        old = archived.get(warehouse.id, {'orders': 0, 'revenue': 0, 'units': 0})
         
         # Calculate real efficiency based on Warehouse capacity
         if warehouse.capacity > 0:
@@ -269,14 +306,13 @@ def warehouse_performance(request):
         # Cap at 100%
         efficiency = min(100, efficiency)
         
-        # Revenue from orders (distributed evenly for simplicity as we don't track source warehouse yet)
-        revenue = float(sum(order.total_amount for order in user_orders)) / warehouses.count() if warehouses.count() > 0 else 0
-        
         data.append({
+            'id': warehouse.id,
             'name': warehouse.name,
-            'orders': orders_count,
+            'orders': warehouse.orders_count + old['orders'],
+            'units_shipped': warehouse.units_shipped + old['units'],
             'efficiency': efficiency,
-            'revenue': revenue
+            'revenue': float(warehouse.revenue + old['revenue'])
         })
     
     return Response(data)
@@ -287,41 +323,62 @@ def warehouse_performance(request):
 def category_performance(request):
     """Get performance data grouped by category."""
     user = request.user
-    user_orders = Order.objects.filter(user=user)
     
-    # helper for category name
-    def get_category_name(product):
-        return product.category.name if product.category else 'Uncategorized'
-
-    categories_data = {}
-    total_revenue = 0
+    # Grouped by category in the database - one row per category (per table, when some are archived)
+    rowsets = [
+        items.objects.filter(
+            order__user=user, order__status__in=SALES_STATUSES
+        ).values('product__category__name').annotate(
+            revenue=Sum('subtotal'), sales=Sum('quantity')
+        ).order_by('-revenue')
+        for _, items in history_sources(user)
+    ]
+    rows = sorted(sum_rows(rowsets, 'product__category__name', ['revenue', 'sales']), key=lambda row: row['revenue'], reverse=True)
+    total_revenue = float(sum(row['revenue'] for row in rows))
     
-    for order in user_orders.filter(status__in=['delivered', 'shipped', 'pending', 'processing']):
-        for item in order.items.all():
-            cat_name = get_category_name(item.product)
-            
-            if cat_name not in categories_data:
-                categories_data[cat_name] = {
-                    'name': cat_name,
-                    'revenue': 0,
-                    'sales': 0
-                }
-            
-            categories_data[cat_name]['revenue'] += float(item.subtotal)
-            categories_data[cat_name]['sales'] += item.quantity
-            total_revenue += float(item.subtotal)
-            
     # Format for chart
     data = []
-    for cat in categories_data.values():
-         percentage = (cat['revenue'] / total_revenue * 100) if total_revenue > 0 else 0
-         data.append({
-             'name': cat['name'],
-             'revenue': cat['revenue'],
-             'sales': cat['sales'],
-             'percentage': round(percentage, 1),
-             'value': cat['revenue'] # for Recharts
-         })
-         
+    for row in rows:
+        revenue = float(row['revenue'])
+        percentage = (revenue / total_revenue * 100) if total_revenue > 0 else 0
+        data.append({
+            'name': row['product__category__name'] or 'Uncategorized',
+            'revenue': revenue,
+            'sales': row['sales'],
+            'percentage': round(percentage, 1),
+            'value': revenue  # for Recharts
+        })
+    
     return Response(data)
 
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def reorder_suggestions(request):
+    """Get the latest forecast and reorder points (rebuilt by `manage.py forecast_reorder`)."""
+    suggestions = ReorderSuggestion.objects.select_related('product', 'warehouse')
+    
+    # Only SKUs that are at or below their reorder point (e.g. /reorder/?needs_reorder=true)
+    if request.query_params.get('needs_reorder') == 'true':
+        suggestions = suggestions.filter(suggested_quantity__gt=0)
+    
+    limit = positive_int(request, 'limit', 100)
+    data = [
+        {
+            'product_id': s.product_id,
+            'sku': s.product.sku,
+            'name': s.product.name,
+            'warehouse_id': s.warehouse_id,
+            'warehouse': s.warehouse.name,
+            'method': s.method,
+            'forecast_daily': s.forecast_daily,
+            'safety_stock': s.safety_stock,
+            'reorder_point': s.reorder_point,
+            'on_hand': s.on_hand,
+            'suggested_quantity': s.suggested_quantity,
+            'days_of_cover': s.days_of_cover,
+            'computed_at': s.computed_at,
+        }
+        for s in suggestions[:limit]
+    ]
+    return Response(data)
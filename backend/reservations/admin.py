@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import StockHold
+
+
+@admin.register(StockHold)
+class StockHoldAdmin(admin.ModelAdmin):
+    list_display = ('product', 'warehouse', 'quantity', 'user', 'reference', 'created_at', 'expires_at')
+    list_filter = ('warehouse',)
+    search_fields = ('product__sku', 'reference')
+    raw_id_fields = ('product', 'user')
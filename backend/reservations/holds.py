@@ -0,0 +1,137 @@
+"""
+Stock holds.
+
+InventoryItem.quantity is what's on the shelf. A StockHold sets some of it
+aside for a while (a draft order, a partner waiting on a confirmation) without
+consuming it, so
+
+    available to promise = quantity - active holds
+
+where active means not expired yet. Placing a hold, and taking stock for an
+order, lock that one InventoryItem row just long enough to add up its active
+holds (a range scan on the (product, warehouse, expires_at) index) and write.
+The row is never locked for the lifetime of a hold, so a busy SKU is only
+ever locked for milliseconds at a time. An order created with hold_ids
+consumes those holds: their units leave stock and the holds are deleted.
+
+Expired holds stop counting straight away - every sum filters on expires_at.
+`manage.py expire_stock_holds` (scheduled every minute) deletes them in bulk
+so the table stays about the size of the holds actually in play.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from inventory.models import InventoryItem
+from .models import StockHold
+
+
+def active_holds(now=None):
+    return StockHold.objects.filter(expires_at__gt=now or timezone.now())
+
+
+def held_quantity(product_id, warehouse_id, now=None, exclude_ids=()):
+    """Units of a stock row under active holds."""
+    holds = active_holds(now).filter(product_id=product_id, warehouse_id=warehouse_id)
+    if exclude_ids:
+        holds = holds.exclude(id__in=exclude_ids)
+    return holds.aggregate(total=Coalesce(Sum('quantity'), 0))['total']
+
+
+def lock_stock(product_id, warehouse_id):
+    """The stock row, locked until the transaction ends (None if the product isn't stocked there)."""
+    return InventoryItem.objects.select_for_update().filter(product_id=product_id, warehouse_id=warehouse_id).first()
+
+
+def candidate_warehouses(product_id, quantity):
+    # Rows that can't cover the line even with nothing held are never locked
+    return list(
+        InventoryItem.objects.filter(product_id=product_id, quantity__gte=quantity)
+        .order_by('warehouse_id').values_list('warehouse_id', flat=True)
+    )
+
+
+def available_to_promise(product_ids):
+    """[{product_id, warehouse_id, quantity, held, available}] for every stock row of these products, in two queries."""
+    held = {
+        (row['product_id'], row['warehouse_id']): row['total']
+        for row in active_holds().filter(product_id__in=product_ids)
+        .values('product_id', 'warehouse_id').annotate(total=Sum('quantity')).order_by()
+    }
+    rows = []
+    for product_id, warehouse_id, quantity in (
+        InventoryItem.objects.filter(product_id__in=product_ids)
+        .order_by('product_id', 'warehouse_id').values_list('product_id', 'warehouse_id', 'quantity')
+    ):
+        on_hold = held.get((product_id, warehouse_id), 0)
+        rows.append({
+            'product_id': product_id, 'warehouse_id': warehouse_id,
+            'quantity': quantity, 'held': on_hold, 'available': max(quantity - on_hold, 0),
+        })
+    return rows
+
+
+def place_hold(user, product_id, quantity, ttl_seconds, warehouse_id=None, reference=''):
+    """
+    Hold units at warehouse_id, or at the first warehouse that has them
+    available. Returns the StockHold, or None when no warehouse can cover it.
+    """
+    now = timezone.now()
+    warehouses = [warehouse_id] if warehouse_id else candidate_warehouses(product_id, quantity)
+    for candidate in warehouses:
+        # One short transaction per warehouse tried, so a miss doesn't keep its row locked
+        with transaction.atomic():
+            item = lock_stock(product_id, candidate)
+            if item is not None and item.quantity - held_quantity(product_id, candidate, now) >= quantity:
+                return StockHold.objects.create(
+                    product_id=product_id, warehouse_id=candidate, user=user, quantity=quantity,
+                    reference=reference, expires_at=now + timedelta(seconds=ttl_seconds),
+                )
+    return None
+
+
+def take_stock(product_id, quantity, hold=None):
+    """
+    Take units out of stock for an order line and return the warehouse id,
+    or None when nothing can cover it. With a hold (active, already locked by
+    the caller), the line comes from the hold's warehouse and its units count
+    towards the line; the hold is deleted. Otherwise it comes from the first
+    warehouse with enough available after everyone else's holds.
+    Call inside the transaction that creates the order.
+    """
+    now = timezone.now()
+    warehouses = [hold.warehouse_id] if hold else candidate_warehouses(product_id, quantity)
+    for candidate in warehouses:
+        item = lock_stock(product_id, candidate)
+        if item is None:
+            continue
+        others = held_quantity(product_id, candidate, now, exclude_ids=[hold.id] if hold else ())
+        if item.quantity - others >= quantity:
+            InventoryItem.objects.filter(pk=item.pk).update(quantity=F('quantity') - quantity, updated_at=now)
+            if hold:
+                hold.delete()
+            return candidate
+    return None
+
+
+def expire_holds(batch_size=None):
+    """Delete expired holds in batches. Returns how many went."""
+    batch_size = batch_size or settings.STOCK_HOLD_SWEEP_BATCH
+    now = timezone.now()
+    total = 0
+    while True:
+        ids = list(
+            StockHold.objects.filter(expires_at__lte=now).order_by('expires_at')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        StockHold.objects.filter(id__in=ids).delete()
+        total += len(ids)
+        if len(ids) < batch_size:
+            break
+    return total
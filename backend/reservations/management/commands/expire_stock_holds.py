@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from reservations.holds import expire_holds
+
+
+class Command(BaseCommand):
+    """
+    Delete expired stock holds. They already stopped counting against
+    availability when they expired - this only keeps the table small.
+    Scheduled every minute through the job worker.
+    """
+    help = 'Delete expired stock holds in bulk.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='Holds deleted per statement (default STOCK_HOLD_SWEEP_BATCH).')
+
+    def handle(self, *args, **options):
+        count = expire_holds(options['batch_size'])
+        self.stdout.write(f'Expired {count} hold(s).')
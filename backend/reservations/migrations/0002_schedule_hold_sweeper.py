@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:36
+
+from django.db import migrations
+
+NAME = 'Expire stock holds'
+
+
+def add_schedule(apps, schema_editor):
+    PeriodicJob = apps.get_model('jobs', 'PeriodicJob')
+    PeriodicJob.objects.get_or_create(name=NAME, defaults={
+        'task': 'jobs.tasks.run_command',
+        'kwargs': {'command': 'expire_stock_holds'},
+        'interval_seconds': 60,
+    })
+
+
+def remove_schedule(apps, schema_editor):
+    PeriodicJob = apps.get_model('jobs', 'PeriodicJob')
+    PeriodicJob.objects.filter(name=NAME).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0001_initial'),
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_schedule, remove_schedule),
+    ]
@@ -0,0 +1,32 @@
+from django.db import models
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+class StockHold(models.Model):
+    """
+    Units of a product set aside at one warehouse until expires_at, without
+    taking them out of stock (see reservations/holds.py). A hold stops counting
+    the moment it expires; the sweeper deletes it later.
+    """
+    product = models.ForeignKey('inventory.Product', on_delete=models.CASCADE, related_name='holds')
+    warehouse = models.ForeignKey('warehouses.Warehouse', on_delete=models.CASCADE, related_name='holds')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='stock_holds')
+    quantity = models.PositiveIntegerField()
+    # Free-form - a draft order or partner reference to find the hold by
+    reference = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['expires_at']
+        indexes = [
+            # Active holds per stock row: SUM(quantity) WHERE product, warehouse and expires_at > now
+            models.Index(fields=['product', 'warehouse', 'expires_at']),
+            # The sweeper deletes in expiry order
+            models.Index(fields=['expires_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} x {self.product_id} @ {self.warehouse_id} until {self.expires_at:%Y-%m-%d %H:%M}"
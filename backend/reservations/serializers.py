@@ -0,0 +1,26 @@
+from django.conf import settings
+from rest_framework import serializers
+from .models import StockHold
+
+
+class StockHoldSerializer(serializers.ModelSerializer):
+    sku = serializers.CharField(source='product.sku', read_only=True)
+
+    class Meta:
+        model = StockHold
+        fields = ('id', 'product', 'sku', 'warehouse', 'quantity', 'reference', 'created_at', 'expires_at')
+        read_only_fields = fields
+
+
+class PlaceHoldSerializer(serializers.Serializer):
+    """POST /reservations/holds/ - warehouse_id is optional (first warehouse with the units available)."""
+    product_id = serializers.IntegerField()
+    warehouse_id = serializers.IntegerField(required=False)
+    quantity = serializers.IntegerField(min_value=1)
+    ttl_seconds = serializers.IntegerField(required=False, min_value=1)
+    reference = serializers.CharField(required=False, allow_blank=True, max_length=100, default='')
+
+    def validate_ttl_seconds(self, value):
+        if value > settings.STOCK_HOLD_MAX_TTL_SECONDS:
+            raise serializers.ValidationError(f'At most {settings.STOCK_HOLD_MAX_TTL_SECONDS} seconds.')
+        return value
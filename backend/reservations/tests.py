@@ -0,0 +1,145 @@
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection
+from django.test import TransactionTestCase, skipUnlessDBFeature
+from django.utils import timezone
+
+from config.testing import make_product, make_stock, make_user, make_warehouse
+from orders.models import Order
+from orders.tests import OrderTestCase
+from . import holds
+from .holds import available_to_promise, expire_holds, place_hold, take_stock
+from .models import StockHold
+
+
+class HoldTestCase(OrderTestCase):
+    username = 'holds'
+
+    def setUp(self):
+        super().setUp()
+        self.east_stock = self.stock(self.east, 10)
+
+    def hold(self, quantity, **data):
+        return self.client.post('/api/reservations/holds/', {
+            'product_id': self.product.id, 'quantity': quantity, **data,
+        }, format='json')
+
+    def available(self):
+        return {row['warehouse_id']: row['available'] for row in available_to_promise([self.product.id])}
+
+
+class HoldTests(HoldTestCase):
+    def test_holds_reduce_available_to_promise(self):
+        response = self.hold(6, reference='draft-1')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['warehouse'], self.east.id)
+        self.assertEqual(self.available(), {self.east.id: 4})
+        self.east_stock.refresh_from_db()
+        self.assertEqual(self.east_stock.quantity, 10)  # Set aside, not consumed
+
+        self.assertEqual(self.hold(5).status_code, 400)
+        availability = self.client.get(f'/api/reservations/holds/availability/?product={self.product.id}').data
+        self.assertEqual(availability, [{'product_id': self.product.id, 'warehouse_id': self.east.id,
+                                         'quantity': 10, 'held': 6, 'available': 4}])
+
+    def test_a_hold_falls_through_to_the_next_warehouse(self):
+        self.stock(self.west, 10)
+        self.hold(8)
+        self.assertEqual(self.hold(8).data['warehouse'], self.west.id)
+        self.assertEqual(self.hold(3).status_code, 400)
+
+    def test_orders_cannot_take_held_stock(self):
+        self.hold(6)
+        self.assertEqual(self.create_order(5).status_code, 400)
+        self.assertEqual(self.create_order(4).status_code, 201)
+        self.east_stock.refresh_from_db()
+        self.assertEqual(self.east_stock.quantity, 6)
+
+    def test_an_order_consumes_its_hold(self):
+        hold_id = self.hold(8).data['id']
+        response = self.create_order(8, hold_ids=[hold_id])
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertFalse(StockHold.objects.exists())
+        self.east_stock.refresh_from_db()
+        self.assertEqual(self.east_stock.quantity, 2)
+        # A consumed hold can't be used again
+        self.assertEqual(self.create_order(1, hold_ids=[hold_id]).status_code, 400)
+
+    def test_someone_elses_hold_is_refused(self):
+        other = make_user('other')
+        hold = place_hold(other, self.product.id, 2, 60)
+        self.assertEqual(self.create_order(2, hold_ids=[hold.id]).status_code, 400)
+        self.assertEqual(Order.objects.count(), 0)
+
+    def test_a_hold_placed_after_the_candidates_were_listed(self):
+        listed = holds.candidate_warehouses
+
+        def raced(product_id, quantity):
+            # Another request holds 8 units after this one picked its candidates, before it locks
+            warehouses = listed(product_id, quantity)
+            StockHold.objects.create(product=self.product, warehouse=self.east, user=self.user, quantity=8,
+                                     expires_at=timezone.now() + timedelta(minutes=5))
+            return warehouses
+
+        with mock.patch.object(holds, 'candidate_warehouses', raced):
+            self.assertIsNone(place_hold(self.user, self.product.id, 5, 60))
+        with mock.patch.object(holds, 'candidate_warehouses', raced):
+            self.assertIsNone(take_stock(self.product.id, 5))
+        self.east_stock.refresh_from_db()
+        self.assertEqual(self.east_stock.quantity, 10)
+
+
+class ExpiryTests(HoldTestCase):
+    def expire(self, hold_id):
+        StockHold.objects.filter(pk=hold_id).update(expires_at=timezone.now() - timedelta(seconds=1))
+
+    def test_expired_holds_stop_counting_before_the_sweep(self):
+        hold_id = self.hold(6).data['id']
+        self.expire(hold_id)
+        self.assertEqual(self.available(), {self.east.id: 10})
+        self.assertEqual(self.create_order(10).status_code, 201)
+        self.assertEqual(self.client.get('/api/reservations/holds/').data['results'], [])
+        self.assertEqual(expire_holds(batch_size=1), 1)
+        self.assertFalse(StockHold.objects.exists())
+
+    def test_extend(self):
+        hold_id = self.hold(2, ttl_seconds=60).data['id']
+        response = self.client.post(f'/api/reservations/holds/{hold_id}/extend/', {'ttl_seconds': 3600}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(StockHold.objects.get(pk=hold_id).expires_at, timezone.now() + timedelta(minutes=59))
+        self.assertEqual(
+            self.client.post(f'/api/reservations/holds/{hold_id}/extend/', {'ttl_seconds': 0}, format='json').status_code,
+            400,
+        )
+        # A hold that expires between the lookup and the update can't come back
+        self.expire(hold_id)
+        hold = StockHold.objects.get(pk=hold_id)
+        with mock.patch('reservations.views.StockHoldViewSet.get_object', return_value=hold):
+            response = self.client.post(f'/api/reservations/holds/{hold_id}/extend/', {}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class ConcurrentHoldTests(TransactionTestCase):
+    def test_concurrent_holds_never_oversell(self):
+        user, product = make_user('holds'), make_product()
+        make_stock(product, make_warehouse(), 10)
+        start, results = threading.Barrier(6), []
+
+        def reserve():
+            start.wait(5)
+            try:
+                results.append(place_hold(user, product.id, 3, 60) is not None)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=reserve) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results.count(True), 3)
+        self.assertEqual(available_to_promise([product.id])[0]['available'], 1)
@@ -0,0 +1,10 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import StockHoldViewSet
+
+router = DefaultRouter()
+router.register(r'holds', StockHoldViewSet, basename='stock-hold')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
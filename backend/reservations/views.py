@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import mixins, viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from idempotency.decorators import idempotent
+from .holds import active_holds, available_to_promise, place_hold
+from .models import StockHold
+from .serializers import PlaceHoldSerializer, StockHoldSerializer
+
+
+# GET /reservations/holds/ - the user's active holds (?reference=...)
+# POST /reservations/holds/ - hold stock without consuming it
+# DELETE /reservations/holds/{id}/ - let it go early
+# POST /reservations/holds/{id}/extend/ - push the expiry out (ttl_seconds from now)
+# GET /reservations/holds/availability/?product=1,2 - quantity, held and available per warehouse
+class StockHoldViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, mixins.DestroyModelMixin,
+                       viewsets.GenericViewSet):
+    """Time-limited stock holds (see reservations/holds.py)."""
+    serializer_class = StockHoldSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        # Expired holds are gone as far as clients are concerned, swept or not
+        queryset = active_holds().filter(user=self.request.user).select_related('product')
+        reference = self.request.query_params.get('reference')
+        if reference:
+            queryset = queryset.filter(reference=reference)
+        return queryset
+
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        params = PlaceHoldSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+        hold = place_hold(
+            request.user, data['product_id'], data['quantity'],
+            data.get('ttl_seconds', settings.STOCK_HOLD_TTL_SECONDS), data.get('warehouse_id'), data['reference'],
+        )
+        if hold is None:
+            return Response(
+                {'error': f"Not enough available stock to hold {data['quantity']} of product {data['product_id']}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(StockHoldSerializer(hold).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['post'])
+    def extend(self, request, pk=None):
+        hold = self.get_object()
+        try:
+            ttl = int(request.data.get('ttl_seconds', settings.STOCK_HOLD_TTL_SECONDS))
+        except (TypeError, ValueError):
+            ttl = 0
+        if not 0 < ttl <= settings.STOCK_HOLD_MAX_TTL_SECONDS:
+            return Response({'error': f'ttl_seconds must be 1-{settings.STOCK_HOLD_MAX_TTL_SECONDS}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        # Only while it's still active, so an expired hold can't come back over stock sold since
+        now = timezone.now()
+        expires_at = now + timedelta(seconds=ttl)
+        if not StockHold.objects.filter(pk=hold.pk, expires_at__gt=now).update(expires_at=expires_at):
+            return Response({'error': 'Hold has expired'}, status=status.HTTP_400_BAD_REQUEST)
+        hold.expires_at = expires_at
+        return Response(StockHoldSerializer(hold).data)
+
+    @action(detail=False, methods=['get'])
+    def availability(self, request):
+        try:
+            product_ids = [int(value) for value in request.query_params.get('product', '').split(',') if value]
+        except ValueError:
+            product_ids = []
+        if not product_ids:
+            return Response({'error': 'product (comma-separated ids) required'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(available_to_promise(product_ids))
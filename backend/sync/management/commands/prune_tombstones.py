@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from sync.models import Tombstone
+
+
+class Command(BaseCommand):
+    """
+    Drop tombstones older than SYNC_TOMBSTONE_RETENTION_DAYS.
+    Clients that haven't synced for longer than that get a 410 and do a full sync.
+    Run daily from cron.
+    """
+    help = 'Delete tombstones past the sync retention window.'
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+        deleted, _ = Tombstone.objects.filter(deleted_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} tombstone(s).'))
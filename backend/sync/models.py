@@ -0,0 +1,24 @@
+from django.db import models
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+class Tombstone(models.Model):
+    """
+    Record of a deleted row, so change-feed clients can drop it from their copy.
+    `owner` is set for per-user data (orders) and left empty for shared data.
+    """
+    model = models.CharField(max_length=100)  # app_label.model, e.g. 'orders.order'
+    object_id = models.BigIntegerField()
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['deleted_at']
+        indexes = [
+            models.Index(fields=['model', 'deleted_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.model} #{self.object_id}"
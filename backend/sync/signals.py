@@ -0,0 +1,47 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models.signals import post_delete
+
+from customers.models import Customer
+from inventory.models import InventoryItem, Product
+from orders.models import Order
+from .models import Tombstone
+
+# Models served by a change feed, and the field (if any) that says whose row it was
+TRACKED_MODELS = {
+    Order: 'user_id',
+    Product: None,
+    InventoryItem: None,
+    Customer: None,
+}
+
+
+_suppressed = ContextVar('sync_tombstones_suppressed', default=False)
+
+
+@contextmanager
+def without_tombstones():
+    """Deletes in this block aren't sent to change-feed clients - for rows that live on elsewhere (archiving)."""
+    token = _suppressed.set(True)
+    try:
+        yield
+    finally:
+        _suppressed.reset(token)
+
+
+def record_tombstone(sender, instance, **kwargs):
+    # Also fires for cascaded deletes (e.g. a product's inventory rows)
+    if _suppressed.get():
+        return
+    owner_field = TRACKED_MODELS[sender]
+    Tombstone.objects.create(
+        model=sender._meta.label_lower,
+        object_id=instance.pk,
+        owner_id=getattr(instance, owner_field) if owner_field else None,
+    )
+
+
+# Connected per model: a sender-less receiver would stop Django from fast-deleting every other model
+for model in TRACKED_MODELS:
+    post_delete.connect(record_tombstone, sender=model, dispatch_uid=f'sync.tombstone.{model._meta.label_lower}')
@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from config.testing import make_customer, make_order, make_product, make_user
+from .models import Tombstone
+
+
+class ChangeFeedTests(APITestCase):
+    path = '/api/inventory/products/changes/'
+
+    def setUp(self):
+        self.user = make_user('sync')
+        self.client.force_authenticate(self.user)
+        self.products = [make_product(f'SKU-{i}', f'Product {i}') for i in range(3)]
+
+    def test_pages_walk_every_row_once(self):
+        seen, params = [], {'limit': 2}
+        while True:
+            response = self.client.get(self.path, params)
+            self.assertEqual(response.status_code, 200)
+            seen += [row['id'] for row in response.data['results']]
+            if not response.data['next_cursor']:
+                break
+            params = {'limit': 2, 'cursor': response.data['next_cursor']}
+        self.assertEqual(seen, [p.pk for p in self.products])
+
+    def test_bad_limit_is_a_400(self):
+        for limit in ('0', '-5', 'abc'):
+            response = self.client.get(self.path, {'limit': limit})
+            self.assertEqual(response.status_code, 400, limit)
+            self.assertIn('limit', response.data)
+        # Too big is just capped
+        self.assertEqual(self.client.get(self.path, {'limit': 10 ** 6}).status_code, 200)
+
+    def test_deletes_show_up_once(self):
+        since = (timezone.now() - timedelta(minutes=1)).isoformat()
+        deleted = self.products[0].pk
+        self.products[0].delete()
+        response = self.client.get(self.path, {'updated_since': since, 'limit': 1})
+        self.assertEqual(response.data['deleted'], [deleted])
+        response = self.client.get(self.path, {'cursor': response.data['next_cursor']})
+        self.assertEqual(response.data['deleted'], [])
+
+    def test_order_deletes_are_only_sent_to_their_owner(self):
+        other = make_user('other')
+        since = (timezone.now() - timedelta(minutes=1)).isoformat()
+        make_order(other, make_customer()).delete()
+        self.assertEqual(Tombstone.objects.get(model='orders.order').owner, other)
+        response = self.client.get('/api/orders/changes/', {'updated_since': since})
+        self.assertEqual(response.data['deleted'], [])
@@ -7,10 +7,13 @@ def geocode_address(address: str, city: str, state: str, country: str = 'USA') -
     Geocode an address using Nominatim (OpenStreetMap) API.
     Returns (latitude, longitude) tuple or None if geocoding fails.
     """
+    # Construct full address
+    return geocode(f"{address}, {city}, {state}, {country}")
+
+
+def geocode(full_address: str) -> Optional[Tuple[float, float]]:
+    """Geocode a free-form address (e.g. a customer's address field) - (latitude, longitude) or None."""
     try:
-        # Construct full address
-        full_address = f"{address}, {city}, {state}, {country}"
-        
         # Nominatim API endpoint
         url = "https://nominatim.openstreetmap.org/search"
         params = {
@@ -0,0 +1,167 @@
+"""
+Delivery routes out of a warehouse.
+
+Outbound orders (shipped by default) with lines from the warehouse are grouped
+into one stop per customer, using the coordinates stored on the customer. The
+routing itself never calls out - customers that haven't been geocoded yet are
+listed as unlocated instead of routed.
+
+  1. distance matrix: great-circle (haversine) km between the warehouse and
+     every stop, as one NumPy broadcast
+  2. one tour through every stop: nearest neighbour from the warehouse, then
+     best-improvement 2-opt (each pass scores every segment reversal at once
+     and applies the best one)
+  3. split that tour into vehicle routes that fit ROUTE_VEHICLE_CAPACITY units:
+     the split is an exact shortest-path over where to cut the tour, so routes
+     are consecutive runs of the tour that start and end at the warehouse
+  4. 2-opt each route again on its own
+
+500 stops route in about a second.
+"""
+import numpy as np
+from django.db.models import Sum
+
+from orders.models import OrderItem
+
+EARTH_RADIUS_KM = 6371.0088
+IMPROVEMENT_KM = 1e-9  # Smaller 2-opt gains are float noise
+
+
+def haversine_matrix(lat, lng):
+    """Great-circle distance in km between every pair of points (degrees in)."""
+    lat, lng = np.radians(lat), np.radians(lng)
+    dlat = lat[:, None] - lat[None, :]
+    dlng = lng[:, None] - lng[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def nearest_neighbour(distances):
+    """Tour from node 0 through every node, always to the closest unvisited one. Starts and ends at 0."""
+    n = len(distances)
+    tour = [0]
+    visited = np.zeros(n, dtype=bool)
+    visited[0] = True
+    for _ in range(n - 1):
+        row = np.where(visited, np.inf, distances[tour[-1]])
+        nxt = int(np.argmin(row))
+        tour.append(nxt)
+        visited[nxt] = True
+    tour.append(0)
+    return np.array(tour)
+
+
+def two_opt(tour, distances):
+    """
+    Best-improvement 2-opt on a closed tour (first and last node fixed).
+    Reversing tour[i+1..j] swaps edges (i, i+1), (j, j+1) for (i, j), (i+1, j+1);
+    every such gain is computed in one matrix per pass.
+    """
+    tour = tour.copy()
+    if len(tour) < 5:
+        return tour
+    while True:
+        a, b = tour[:-1], tour[1:]
+        edges = distances[a, b]
+        gain = distances[a[:, None], a[None, :]] + distances[b[:, None], b[None, :]] - edges[:, None] - edges[None, :]
+        # Only j >= i + 2 (adjacent edges share a node)
+        gain[np.tril_indices(len(a), 1)] = np.inf
+        i, j = np.unravel_index(np.argmin(gain), gain.shape)
+        if gain[i, j] > -IMPROVEMENT_KM:
+            return tour
+        tour[i + 1:j + 1] = tour[i + 1:j + 1][::-1]
+
+
+def split_tour(tour, demand, distances, capacity):
+    """
+    Cut a tour (without its depot ends) into depot-to-depot routes of at most
+    `capacity` units, choosing the cuts that minimise total distance (Prins'
+    split: a shortest path over cut positions). A single stop over capacity
+    gets a route of its own. Returns a list of stop arrays.
+    """
+    n = len(tour)
+    load = np.r_[0, np.cumsum(demand[tour])]
+    # Distance along the tour from its first stop to each stop
+    along = np.r_[0, np.cumsum(distances[tour[:-1], tour[1:]])]
+    to_depot = distances[0, tour]
+    best = np.full(n + 1, np.inf)
+    best[0] = 0
+    cut = np.zeros(n + 1, dtype=np.int64)
+    for i in range(n):
+        # Routes tour[i..j], as long as they fit (always at least one stop)
+        last = max(i, np.searchsorted(load, load[i] + capacity, side='right') - 2)
+        j = np.arange(i, last + 1)
+        cost = best[i] + to_depot[i] + (along[j] - along[i]) + to_depot[j]
+        better = cost < best[j + 1]
+        best[j[better] + 1] = cost[better]
+        cut[j[better] + 1] = i
+    routes = []
+    end = n
+    while end > 0:
+        routes.append(tour[cut[end]:end])
+        end = cut[end]
+    return routes[::-1]
+
+
+def route_length(route, distances):
+    path = np.r_[0, route, 0]
+    return float(distances[path[:-1], path[1:]].sum())
+
+
+def plan_routes(warehouse, user, statuses, capacity):
+    """
+    Vehicle routes for the user's outbound orders from this warehouse.
+    Returns {'routes': [...], 'unlocated': [...], 'total_distance_km': ...}.
+    """
+    rows = list(
+        OrderItem.objects.filter(warehouse=warehouse, order__user=user, order__status__in=statuses)
+        .values('order_id', 'order__customer_id', 'order__customer__name', 'order__customer__address',
+                'order__customer__latitude', 'order__customer__longitude')
+        .annotate(units=Sum('quantity')).order_by()
+    )
+    stops = {}
+    for row in rows:
+        stop = stops.setdefault(row['order__customer_id'], {
+            'customer_id': row['order__customer_id'],
+            'customer_name': row['order__customer__name'],
+            'address': row['order__customer__address'],
+            'latitude': row['order__customer__latitude'],
+            'longitude': row['order__customer__longitude'],
+            'order_ids': [],
+            'units': 0,
+        })
+        stop['order_ids'].append(row['order_id'])
+        stop['units'] += row['units']
+    for stop in stops.values():
+        stop['order_ids'].sort()
+
+    located = [s for s in stops.values() if s['latitude'] is not None and s['longitude'] is not None]
+    unlocated = [s for s in stops.values() if s['latitude'] is None or s['longitude'] is None]
+    result = {'routes': [], 'unlocated': sorted(unlocated, key=lambda s: s['customer_id']), 'total_distance_km': 0.0}
+    if not located:
+        return result
+
+    # Node 0 is the warehouse, node k is located[k - 1]
+    lat = np.array([float(warehouse.latitude)] + [float(s['latitude']) for s in located])
+    lng = np.array([float(warehouse.longitude)] + [float(s['longitude']) for s in located])
+    distances = haversine_matrix(lat, lng)
+    demand = np.array([0] + [s['units'] for s in located], dtype=np.int64)
+
+    tour = two_opt(nearest_neighbour(distances), distances)[1:-1]
+    for number, route in enumerate(split_tour(tour, demand, distances, capacity), start=1):
+        route = two_opt(np.r_[0, route, 0], distances)[1:-1]
+        legs = distances[np.r_[0, route[:-1]], route]
+        distance = route_length(route, distances)
+        result['routes'].append({
+            'vehicle': number,
+            'load': int(demand[route].sum()),
+            'distance_km': round(distance, 2),
+            'return_km': round(float(distances[route[-1], 0]), 2),
+            'stops': [
+                {'sequence': position, **located[node - 1], 'distance_from_previous_km': round(float(leg), 2)}
+                for position, (node, leg) in enumerate(zip(route.tolist(), legs.tolist()), start=1)
+            ],
+        })
+        result['total_distance_km'] += distance
+    result['total_distance_km'] = round(result['total_distance_km'], 2)
+    return result
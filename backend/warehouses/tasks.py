@@ -0,0 +1,18 @@
+from django.utils import timezone
+
+from jobs.queue import task
+from .geocoding import geocode_address
+from .models import Warehouse
+
+
+@task
+def geocode_warehouse(warehouse_id):
+    """Look up and store coordinates for a warehouse (Nominatim can take seconds)."""
+    warehouse = Warehouse.objects.filter(pk=warehouse_id).first()
+    if warehouse is None:
+        return
+    coords = geocode_address(warehouse.address, warehouse.city, warehouse.state, warehouse.country)
+    if coords:
+        Warehouse.objects.filter(pk=warehouse_id).update(
+            latitude=coords[0], longitude=coords[1], updated_at=timezone.now()
+        )
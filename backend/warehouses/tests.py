@@ -0,0 +1,97 @@
+from itertools import combinations
+
+import numpy as np
+from django.test import SimpleTestCase
+from rest_framework.test import APITestCase
+
+from config.testing import make_customer, make_order, make_product, make_user, make_warehouse
+from .models import Warehouse
+from .routing import haversine_matrix, nearest_neighbour, route_length, split_tour, two_opt
+
+
+class RoutingTests(SimpleTestCase):
+    def test_haversine(self):
+        distances = haversine_matrix(np.array([0.0, 1.0, 0.0]), np.array([0.0, 0.0, 180.0]))
+        self.assertAlmostEqual(distances[0, 1], 111.195, places=2)  # One degree of latitude
+        self.assertAlmostEqual(distances[0, 2], np.pi * 6371.0088, places=2)
+        self.assertTrue(np.allclose(distances, distances.T))
+
+    def test_two_opt_uncrosses_a_tour(self):
+        # Depot and the corners of a unit square, visited in a crossing order
+        points = np.array([[0, 0], [0, 1], [1, 0], [1, 1]], dtype=float)
+        distances = np.linalg.norm(points[:, None] - points[None, :], axis=2)
+        crossed = np.array([0, 3, 1, 2, 0])
+        tour = two_opt(crossed, distances)
+        self.assertAlmostEqual(route_length(tour[1:-1], distances), 4.0)
+        self.assertEqual((tour[0], tour[-1]), (0, 0))
+
+    def test_split_is_optimal_and_fits_capacity(self):
+        rng = np.random.default_rng(7)
+        points = rng.random((9, 2))
+        distances = np.linalg.norm(points[:, None] - points[None, :], axis=2)
+        demand = np.r_[0, rng.integers(1, 6, 8)]
+        tour = nearest_neighbour(distances)[1:-1]
+        capacity = 9
+
+        routes = split_tour(tour, demand, distances, capacity)
+        self.assertEqual(np.concatenate(routes).tolist(), tour.tolist())
+        self.assertTrue(all(demand[route].sum() <= capacity for route in routes))
+
+        # Against every way of cutting the tour into consecutive routes
+        best = np.inf
+        for count in range(len(tour)):
+            for cuts in combinations(range(1, len(tour)), count):
+                parts = np.split(tour, cuts)
+                if all(demand[part].sum() <= capacity for part in parts):
+                    best = min(best, sum(route_length(part, distances) for part in parts))
+        self.assertAlmostEqual(sum(route_length(route, distances) for route in routes), best)
+
+    def test_a_stop_over_capacity_gets_its_own_route(self):
+        distances = np.ones((3, 3)) - np.eye(3)
+        routes = split_tour(np.array([1, 2]), np.array([0, 50, 5]), distances, 10)
+        self.assertEqual([route.tolist() for route in routes], [[1], [2]])
+
+
+class RouteEndpointTests(APITestCase):
+    def setUp(self):
+        self.user = make_user('routes')
+        self.client.force_authenticate(self.user)
+        self.warehouse = make_warehouse(latitude=0, longitude=0)
+        self.product = make_product()
+
+    def customer(self, name, longitude):
+        return make_customer(name, latitude=None if longitude is None else 0, longitude=longitude)
+
+    def ship(self, customer, quantity, status='shipped'):
+        return make_order(self.user, customer, [(self.product, quantity)], status=status, warehouse=self.warehouse)
+
+    def routes(self, query=''):
+        return self.client.get(f'/api/warehouses/{self.warehouse.id}/routes/{query}')
+
+    def test_stops_are_grouped_sequenced_and_split(self):
+        near, far, middle = self.customer('Near', 0.1), self.customer('Far', 0.3), self.customer('Middle', 0.2)
+        first, second = self.ship(near, 2), self.ship(near, 3)
+        self.ship(far, 4)
+        self.ship(middle, 4)
+        self.ship(middle, 9, status='processing')  # Not shipped yet
+        nowhere = self.customer('Nowhere', None)
+        self.ship(nowhere, 1)
+
+        data = self.routes().data
+        [route] = data['routes']
+        self.assertEqual([stop['customer_name'] for stop in route['stops']], ['Near', 'Middle', 'Far'])
+        self.assertEqual(route['stops'][0]['order_ids'], [first.id, second.id])
+        self.assertEqual(route['load'], 13)
+        self.assertAlmostEqual(route['distance_km'], 2 * 0.3 * 111.195, places=1)
+        self.assertEqual([stop['customer_id'] for stop in data['unlocated']], [nowhere.id])
+
+        # Five units a vehicle: no two stops fit together
+        data = self.routes('?capacity=5').data
+        self.assertEqual([route['load'] for route in data['routes']], [5, 4, 4])
+        self.assertEqual(len(self.routes('?status=processing,shipped').data['routes']), 1)
+
+    def test_bad_requests(self):
+        for query in ('?capacity=0', '?capacity=x', '?status=delivered'):
+            self.assertEqual(self.routes(query).status_code, 400, query)
+        Warehouse.objects.filter(pk=self.warehouse.pk).update(latitude=None)
+        self.assertEqual(self.routes().status_code, 400)
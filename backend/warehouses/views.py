@@ -1,35 +1,30 @@
-from rest_framework import viewsets
+from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from .models import Warehouse
 from .serializers import WarehouseSerializer
-from .geocoding import geocode_address
+from .tasks import geocode_warehouse
+from .routing import plan_routes
 from inventory.models import InventoryItem
 from orders.models import Order
+from django.conf import settings
 from django.db.models import Sum
+from config.conditional import ConditionalGetMixin
+from jobs.queue import enqueue
 
-class WarehouseViewSet(viewsets.ModelViewSet):
+class WarehouseViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for Warehouse CRUD operations."""
     serializer_class = WarehouseSerializer
     permission_classes = [IsAuthenticated]
     queryset = Warehouse.objects.filter(is_active=True)
 
+    # Geocoding calls out to Nominatim, so it runs as a background job after the save
     def perform_create(self, serializer):
         """Auto-geocode address if coordinates not provided."""
-        if not serializer.validated_data.get('latitude') or not serializer.validated_data.get('longitude'):
-            coords = geocode_address(
-                serializer.validated_data.get('address', ''),
-                serializer.validated_data.get('city', ''),
-                serializer.validated_data.get('state', ''),
-                serializer.validated_data.get('country', 'USA')
-            )
-            if coords:
-                serializer.save(latitude=coords[0], longitude=coords[1])
-            else:
-                serializer.save()
-        else:
-            serializer.save()
+        warehouse = serializer.save()
+        if not warehouse.latitude or not warehouse.longitude:
+            enqueue(geocode_warehouse, kwargs={'warehouse_id': warehouse.id})
 
     def perform_update(self, serializer):
         """Auto-geocode address if coordinates not provided and address changed."""
@@ -40,19 +35,9 @@ class WarehouseViewSet(viewsets.ModelViewSet):
             serializer.validated_data.get('state') != instance.state
         )
         
+        warehouse = serializer.save()
         if address_changed and (not serializer.validated_data.get('latitude') or not serializer.validated_data.get('longitude')):
-            coords = geocode_address(
-                serializer.validated_data.get('address', instance.address),
-                serializer.validated_data.get('city', instance.city),
-                serializer.validated_data.get('state', instance.state),
-                serializer.validated_data.get('country', instance.country)
-            )
-            if coords:
-                serializer.save(latitude=coords[0], longitude=coords[1])
-            else:
-                serializer.save()
-        else:
-            serializer.save()
+            enqueue(geocode_warehouse, kwargs={'warehouse_id': warehouse.id})
 
     @action(detail=False, methods=['get'])
     def stats(self, request):
@@ -76,3 +61,31 @@ class WarehouseViewSet(viewsets.ModelViewSet):
             'warehouseCount': Warehouse.objects.count()
         })
 
+    # GET /warehouses/{id}/routes/?status=shipped&capacity=300
+    # Delivery routes for the user's outbound orders from this warehouse
+    @action(detail=True, methods=['get'])
+    def routes(self, request, pk=None):
+        """Sequenced stops per vehicle, split by capacity (see warehouses/routing.py)."""
+        warehouse = self.get_object()
+        if warehouse.latitude is None or warehouse.longitude is None:
+            return Response({'error': 'Warehouse has no coordinates yet'}, status=status.HTTP_400_BAD_REQUEST)
+
+        statuses = request.query_params.get('status', 'shipped').split(',')
+        if not set(statuses) <= {'processing', 'shipped'}:
+            return Response({'error': 'status must be processing and/or shipped'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            capacity = int(request.query_params.get('capacity', settings.ROUTE_VEHICLE_CAPACITY))
+        except ValueError:
+            capacity = 0
+        if capacity < 1:
+            return Response({'error': 'capacity must be a positive integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        result = plan_routes(warehouse, request.user, statuses, capacity)
+        return Response({
+            'warehouse': {
+                'id': warehouse.id, 'name': warehouse.name,
+                'latitude': warehouse.latitude, 'longitude': warehouse.longitude,
+            },
+            'capacity': capacity,
+            **result,
+        })
@@ -0,0 +1,34 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import OutboxEvent, WebhookDelivery, WebhookEndpoint
+
+
+@admin.register(WebhookEndpoint)
+class WebhookEndpointAdmin(admin.ModelAdmin):
+    list_display = ('name', 'url', 'events', 'is_active', 'created_at')
+    list_filter = ('is_active',)
+    search_fields = ('name', 'url')
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ('id', 'event_type', 'created_at')
+    list_filter = ('event_type',)
+    readonly_fields = ('event_type', 'payload', 'created_at')
+
+
+@admin.register(WebhookDelivery)
+class WebhookDeliveryAdmin(admin.ModelAdmin):
+    list_display = ('id', 'event', 'endpoint', 'status', 'attempts', 'last_status_code', 'next_attempt_at', 'delivered_at')
+    list_filter = ('status', 'endpoint')
+    list_select_related = ('event', 'endpoint')
+    readonly_fields = [field.name for field in WebhookDelivery._meta.fields]
+    actions = ['retry_now']
+
+    @admin.action(description='Retry selected deliveries now')
+    def retry_now(self, request, queryset):
+        # Not ones a sender is holding right now - they'd go out twice
+        count = queryset.exclude(status__in=[WebhookDelivery.DELIVERED, WebhookDelivery.SENDING]).update(
+            status=WebhookDelivery.PENDING, next_attempt_at=timezone.now(), attempts=0
+        )
+        self.message_user(request, f'{count} delivery(ies) queued.')
@@ -0,0 +1,191 @@
+"""
+Sending webhook deliveries.
+
+Pending deliveries are claimed with SKIP LOCKED (so overlapping senders never
+double-send), grouped by endpoint and POSTed in batches of up to
+WEBHOOK_BATCH_SIZE events over one pooled requests.Session. Endpoints are
+served in parallel, up to WEBHOOK_MAX_CONCURRENCY at a time, but each endpoint
+only ever has one request in flight. Failed batches back off exponentially.
+
+A claim is a lease: the sender renews lease_expires_at before every POST, and
+a delivery only goes back to pending once its lease has run out - so a slow
+endpoint never gets the same event from two senders. The lease value doubles
+as the claim's token; a sender that finds it changed has lost the claim and stops.
+
+Each POST body is {"events": [{"id", "type", "created_at", "data"}, ...]} and carries
+
+    X-Shipra-Signature: t=<unix time>,v1=<hex HMAC-SHA256 of "<t>.<body>" with the endpoint secret>
+"""
+import hashlib
+import hmac
+import json
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from itertools import groupby
+
+import requests
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+
+from .models import WebhookDelivery
+
+logger = logging.getLogger('webhooks')
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Shared keep-alive session, sized so every sender thread gets its own pooled connection."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=settings.WEBHOOK_MAX_CONCURRENCY,
+                pool_maxsize=settings.WEBHOOK_MAX_CONCURRENCY,
+                max_retries=0,  # Retries are ours, with backoff
+            )
+            _session.mount('http://', adapter)
+            _session.mount('https://', adapter)
+            _session.headers['User-Agent'] = 'Shipra-Webhooks/1.0'
+    return _session
+
+
+def sign(secret, timestamp, body):
+    return hmac.new(secret.encode(), f'{timestamp}.'.encode() + body, hashlib.sha256).hexdigest()
+
+
+def retry_delay(attempts):
+    delay = min(settings.WEBHOOK_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.WEBHOOK_RETRY_MAX_SECONDS)
+    return timedelta(seconds=delay * random.uniform(1, 1.25))
+
+
+def new_lease():
+    return timezone.now() + timedelta(seconds=settings.WEBHOOK_LEASE_SECONDS)
+
+
+def claim_deliveries(limit):
+    """Lease up to `limit` due deliveries. Returns their ids and the lease they're held under."""
+    now = timezone.now()
+    lease = new_lease()
+    with transaction.atomic():
+        # Put back anything whose sender stopped renewing (crashed or killed)
+        WebhookDelivery.objects.filter(
+            status=WebhookDelivery.SENDING, lease_expires_at__lt=now,
+        ).update(status=WebhookDelivery.PENDING, lease_expires_at=None)
+        ids = list(
+            WebhookDelivery.objects.select_for_update(skip_locked=True)
+            .filter(status=WebhookDelivery.PENDING, next_attempt_at__lte=now)
+            .order_by('id')
+            .values_list('id', flat=True)[:limit]
+        )
+        if ids:
+            WebhookDelivery.objects.filter(id__in=ids).update(status=WebhookDelivery.SENDING, lease_expires_at=lease)
+    return ids, lease
+
+
+def renew_lease(ids, lease):
+    """Extend the lease on deliveries still held under `lease`. Returns the new lease, or None if any were lost."""
+    renewed = new_lease()
+    held = WebhookDelivery.objects.filter(
+        id__in=ids, status=WebhookDelivery.SENDING, lease_expires_at=lease,
+    ).update(lease_expires_at=renewed)
+    if held == len(ids):
+        return renewed
+    # Taken back after we stalled past the lease - whatever we still hold goes back to pending
+    WebhookDelivery.objects.filter(id__in=ids, lease_expires_at=renewed).update(
+        status=WebhookDelivery.PENDING, lease_expires_at=None
+    )
+    return None
+
+
+def _post_batch(endpoint, batch):
+    """POST one batch. Returns (status_code, error) - error is '' on a 2xx."""
+    body = json.dumps({
+        'events': [
+            {'id': d.event_id, 'type': d.event.event_type, 'created_at': d.event.created_at, 'data': d.event.payload}
+            for d in batch
+        ],
+    }, cls=DjangoJSONEncoder).encode()
+    timestamp = int(time.time())
+    try:
+        response = get_session().post(
+            endpoint.url,
+            data=body,
+            headers={
+                'Content-Type': 'application/json',
+                'X-Shipra-Signature': f't={timestamp},v1={sign(endpoint.secret, timestamp, body)}',
+            },
+            timeout=settings.WEBHOOK_TIMEOUT_SECONDS,
+        )
+    except requests.RequestException as e:
+        return None, str(e)
+    if 200 <= response.status_code < 300:
+        return response.status_code, ''
+    return response.status_code, f'HTTP {response.status_code}: {response.text[:500]}'
+
+
+def _deliver_to_endpoint(endpoint, deliveries, lease):
+    """Send an endpoint its deliveries batch by batch; stop at the first failure and reschedule the rest."""
+    try:
+        size = settings.WEBHOOK_BATCH_SIZE
+        batches = [deliveries[i:i + size] for i in range(0, len(deliveries), size)]
+        for index, batch in enumerate(batches):
+            lease = renew_lease([d.id for remaining in batches[index:] for d in remaining], lease)
+            if lease is None:
+                logger.warning('Lost the lease on deliveries to %s; leaving them to the next sender', endpoint.url)
+                return
+            status_code, error = _post_batch(endpoint, batch)
+            ids = [d.id for d in batch]
+            if not error:
+                WebhookDelivery.objects.filter(id__in=ids, lease_expires_at=lease).update(
+                    status=WebhookDelivery.DELIVERED, delivered_at=timezone.now(),
+                    last_status_code=status_code, last_error='', lease_expires_at=None,
+                )
+                continue
+
+            logger.warning('Webhook %s failed: %s', endpoint.url, error)
+            # One retry time for the whole lot, so the batch stays together next time
+            next_attempt_at = timezone.now() + retry_delay(max(d.attempts for d in batch) + 1)
+            for delivery in [d for remaining in batches[index:] for d in remaining]:
+                attempts = delivery.attempts + (1 if delivery in batch else 0)
+                gave_up = attempts >= settings.WEBHOOK_MAX_ATTEMPTS
+                WebhookDelivery.objects.filter(id=delivery.id, lease_expires_at=lease).update(
+                    status=WebhookDelivery.FAILED if gave_up else WebhookDelivery.PENDING,
+                    attempts=attempts,
+                    next_attempt_at=next_attempt_at,
+                    last_status_code=status_code if delivery in batch else delivery.last_status_code,
+                    last_error=error if delivery in batch else delivery.last_error,
+                    lease_expires_at=None,
+                )
+            break
+    finally:
+        close_old_connections()
+
+
+def deliver_pending():
+    """Send everything that is due. Returns the number of deliveries attempted."""
+    ids, lease = claim_deliveries(settings.WEBHOOK_CLAIM_LIMIT)
+    if not ids:
+        return 0
+    deliveries = (
+        WebhookDelivery.objects.filter(id__in=ids)
+        .select_related('endpoint', 'event')
+        .order_by('endpoint_id', 'id')
+    )
+    by_endpoint = [(endpoint_id, list(group)) for endpoint_id, group in groupby(deliveries, key=lambda d: d.endpoint_id)]
+
+    workers = min(settings.WEBHOOK_MAX_CONCURRENCY, len(by_endpoint))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='webhooks') as pool:
+        futures = [pool.submit(_deliver_to_endpoint, group[0].endpoint, group, lease) for _, group in by_endpoint]
+        for future in futures:
+            future.result()
+    return len(ids)
@@ -0,0 +1,117 @@
+"""
+Publishing webhook events.
+
+Call publish() inside the transaction that makes the change. The outbox row,
+one delivery row per subscribed endpoint and the job that sends them all
+commit (or roll back) together with the change, so partners are never told
+about something that didn't happen and never miss something that did.
+"""
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from inventory.models import InventoryItem, Product
+from jobs.models import Job
+from jobs.queue import enqueue
+from .models import OutboxEvent, WebhookDelivery, WebhookEndpoint
+
+ORDER_CREATED = 'order.created'
+ORDER_STATUS_CHANGED = 'order.status_changed'
+STOCK_CHANGED = 'stock.changed'
+EVENT_TYPES = [ORDER_CREATED, ORDER_STATUS_CHANGED, STOCK_CHANGED]
+
+
+def subscribers(event_type):
+    return [endpoint for endpoint in WebhookEndpoint.objects.filter(is_active=True) if endpoint.subscribes_to(event_type)]
+
+
+def publish(event_type, payloads, endpoints=None):
+    """
+    Record one event per payload for every endpoint subscribed to event_type.
+    Returns the number of events written (0 when nobody is listening).
+    """
+    endpoints = subscribers(event_type) if endpoints is None else endpoints
+    if not endpoints or not payloads:
+        return 0
+
+    # Round-trip through JSON so Decimals/datetimes are stored the way they'll be sent
+    events = OutboxEvent.objects.bulk_create([
+        OutboxEvent(event_type=event_type, payload=json.loads(json.dumps(payload, cls=DjangoJSONEncoder)))
+        for payload in payloads
+    ])
+    WebhookDelivery.objects.bulk_create([
+        WebhookDelivery(endpoint=endpoint, event=event)
+        for event in events
+        for endpoint in endpoints
+    ])
+
+    # One queued sender is enough - it drains every pending delivery
+    from .tasks import deliver_webhooks
+    if not Job.objects.filter(task=deliver_webhooks.task_name, status=Job.QUEUED).exists():
+        enqueue(deliver_webhooks)
+    return len(events)
+
+
+def order_payload(order):
+    return {
+        'id': order.id,
+        'order_number': order.order_number,
+        'status': order.status,
+        'customer_id': order.customer_id,
+        'total_amount': order.total_amount,
+        'created_at': order.created_at,
+        'items': [
+            {
+                'product_id': item.product_id,
+                'warehouse_id': item.warehouse_id,
+                'quantity': item.quantity,
+                'unit_price': item.unit_price,
+            }
+            for item in order.items.all()
+        ],
+    }
+
+
+def publish_order_created(order):
+    publish(ORDER_CREATED, [order_payload(order)])
+
+
+def publish_order_status_changed(order, old_status):
+    publish_orders_status_changed([order], old_status)
+
+
+def publish_orders_status_changed(orders, old_status):
+    """One event per order, for bulk status moves (e.g. releasing a pick wave)."""
+    publish(ORDER_STATUS_CHANGED, [
+        {
+            'id': order.id,
+            'order_number': order.order_number,
+            'old_status': old_status,
+            'status': order.status,
+            'updated_at': order.updated_at,
+        }
+        for order in orders
+    ])
+
+
+def publish_stock_changed(product_ids):
+    """Current stock per warehouse for each product - skipped entirely when nobody subscribes."""
+    endpoints = subscribers(STOCK_CHANGED)
+    if not endpoints or not product_ids:
+        return
+    products = Product.objects.filter(id__in=product_ids).values('id', 'sku', 'status')
+    levels = {}
+    for product_id, warehouse_id, quantity in InventoryItem.objects.filter(
+        product_id__in=product_ids
+    ).values_list('product_id', 'warehouse_id', 'quantity'):
+        levels.setdefault(product_id, []).append({'warehouse_id': warehouse_id, 'quantity': quantity})
+    publish(STOCK_CHANGED, [
+        {
+            'product_id': product['id'],
+            'sku': product['sku'],
+            'status': product['status'],
+            'total_stock': sum(level['quantity'] for level in levels.get(product['id'], [])),
+            'warehouses': levels.get(product['id'], []),
+        }
+        for product in products
+    ], endpoints=endpoints)
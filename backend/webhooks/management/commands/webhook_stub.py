@@ -0,0 +1,54 @@
+import hmac
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+from webhooks.delivery import sign
+
+
+class Command(BaseCommand):
+    """
+    Local stub receiver for trying out webhooks.
+    Point a WebhookEndpoint at http://localhost:8787/ and this prints every
+    batch it receives and whether the signature checks out. --fail-every N
+    answers every Nth request with a 500 to exercise the retry path.
+    """
+    help = 'Run a local HTTP server that receives and verifies webhook batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8787)
+        parser.add_argument('--secret', help='Endpoint secret, to verify X-Shipra-Signature.')
+        parser.add_argument('--fail-every', type=int, default=0)
+
+    def handle(self, *args, **options):
+        command = self
+        counter = {'requests': 0}
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                counter['requests'] += 1
+                verdict = 'unchecked'
+                if options['secret']:
+                    parts = dict(p.split('=', 1) for p in self.headers.get('X-Shipra-Signature', '').split(',') if '=' in p)
+                    expected = sign(options['secret'], parts.get('t', ''), body)
+                    verdict = 'valid' if hmac.compare_digest(expected, parts.get('v1', '')) else 'INVALID'
+                events = json.loads(body).get('events', [])
+                command.stdout.write(f'#{counter["requests"]}: {len(events)} event(s), signature {verdict}: '
+                                     + ', '.join(f'{e["type"]}#{e["id"]}' for e in events))
+                fail = options['fail_every'] and counter['requests'] % options['fail_every'] == 0
+                self.send_response(500 if fail else 200)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', options['port']), Handler)
+        self.stdout.write(f'Listening on http://127.0.0.1:{options["port"]}/ (Ctrl+C to stop)')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
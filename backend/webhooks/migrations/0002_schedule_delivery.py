@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:02
+
+from django.db import migrations
+
+
+def add_schedule(apps, schema_editor):
+    # Publishing queues a sender right away; this picks up retries as they come due
+    PeriodicJob = apps.get_model('jobs', 'PeriodicJob')
+    PeriodicJob.objects.get_or_create(name='Deliver webhooks', defaults={
+        'task': 'webhooks.tasks.deliver_webhooks',
+        'interval_seconds': 30,
+    })
+
+
+def remove_schedule(apps, schema_editor):
+    PeriodicJob = apps.get_model('jobs', 'PeriodicJob')
+    PeriodicJob.objects.filter(name='Deliver webhooks').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webhooks', '0001_initial'),
+        ('jobs', '0002_schedule_maintenance'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_schedule, remove_schedule),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:01
+
+from django.db import migrations, models
+
+
+def release_in_flight(apps, schema_editor):
+    # Rows mid-send have no lease to expire, so hand them back now rather than strand them
+    WebhookDelivery = apps.get_model('webhooks', 'WebhookDelivery')
+    WebhookDelivery.objects.filter(status='sending').update(status='pending')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webhooks', '0002_schedule_delivery'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='webhookdelivery',
+            name='webhooks_we_status_836f66_idx',
+        ),
+        migrations.RemoveField(
+            model_name='webhookdelivery',
+            name='locked_at',
+        ),
+        migrations.AddField(
+            model_name='webhookdelivery',
+            name='lease_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='webhookdelivery',
+            index=models.Index(fields=['status', 'lease_expires_at'], name='webhooks_we_status_9ec64f_idx'),
+        ),
+        migrations.RunPython(release_in_flight, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,76 @@
+import secrets
+
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+def generate_secret():
+    return secrets.token_hex(32)
+
+
+class WebhookEndpoint(models.Model):
+    """A partner URL that receives signed batches of events."""
+    name = models.CharField(max_length=100)
+    url = models.URLField(max_length=500)
+    secret = models.CharField(max_length=64, default=generate_secret)  # HMAC key for X-Shipra-Signature
+    events = models.JSONField(default=list, blank=True)  # e.g. ["order.created"]; empty = everything
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return f"{self.name} ({self.url})"
+
+    def subscribes_to(self, event_type):
+        return not self.events or event_type in self.events
+
+
+class OutboxEvent(models.Model):
+    """An event, written in the same transaction as the change it describes."""
+    event_type = models.CharField(max_length=50)
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.event_type} #{self.pk}"
+
+
+class WebhookDelivery(models.Model):
+    """One event still to be (or already) sent to one endpoint."""
+    PENDING = 'pending'
+    SENDING = 'sending'
+    DELIVERED = 'delivered'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (SENDING, 'Sending'),
+        (DELIVERED, 'Delivered'),
+        (FAILED, 'Failed'),
+    ]
+
+    endpoint = models.ForeignKey(WebhookEndpoint, on_delete=models.CASCADE, related_name='deliveries')
+    event = models.ForeignKey(OutboxEvent, on_delete=models.CASCADE, related_name='deliveries')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    # While a sender holds it: it renews this before every POST, and a row is only taken back once it has passed
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    last_status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-id']
+        indexes = [
+            models.Index(fields=['next_attempt_at'], condition=Q(status='pending'), name='webhooks_delivery_due_idx'),
+            models.Index(fields=['status', 'lease_expires_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.event} -> {self.endpoint.name} ({self.status})"
@@ -0,0 +1,9 @@
+from jobs.queue import task
+from .delivery import deliver_pending
+
+
+@task(max_attempts=1)
+def deliver_webhooks():
+    """Drain the webhook outbox (failed deliveries reschedule themselves)."""
+    while deliver_pending():
+        pass
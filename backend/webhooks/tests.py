@@ -0,0 +1,119 @@
+import hmac
+import json
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+
+from .delivery import claim_deliveries, deliver_pending, renew_lease, sign
+from .models import OutboxEvent, WebhookDelivery, WebhookEndpoint
+
+
+class StubReceiver:
+    """A local HTTP server that records every POST and answers with the next scripted status."""
+
+    def __init__(self, statuses=()):
+        self.requests = []
+        self.statuses = list(statuses)
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                receiver.requests.append((dict(self.headers), body))
+                self.send_response(receiver.statuses.pop(0) if receiver.statuses else 200)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/hooks'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def events(self, index):
+        return json.loads(self.requests[index][1])['events']
+
+
+# Transactional, since the sender works from its own threads and connections
+@override_settings(WEBHOOK_BATCH_SIZE=2, WEBHOOK_MAX_ATTEMPTS=2, WEBHOOK_RETRY_BASE_SECONDS=30)
+class DeliveryTests(TransactionTestCase):
+    def setUp(self):
+        self.receiver = StubReceiver()
+        self.addCleanup(self.receiver.stop)
+        self.endpoint = WebhookEndpoint.objects.create(name='Partner', url=self.receiver.url)
+
+    def queue(self, count):
+        events = [OutboxEvent.objects.create(event_type='order.created', payload={'n': i}) for i in range(count)]
+        return [WebhookDelivery.objects.create(endpoint=self.endpoint, event=event) for event in events]
+
+    def status(self, delivery):
+        delivery.refresh_from_db()
+        return delivery.status
+
+    def test_batches_are_signed_and_delivered(self):
+        deliveries = self.queue(3)
+        self.assertEqual(deliver_pending(), 3)
+
+        self.assertEqual([[e['data']['n'] for e in self.receiver.events(i)] for i in range(2)], [[0, 1], [2]])
+        headers, body = self.receiver.requests[0]
+        parts = dict(part.split('=', 1) for part in headers['X-Shipra-Signature'].split(','))
+        self.assertTrue(hmac.compare_digest(parts['v1'], sign(self.endpoint.secret, parts['t'], body)))
+        self.assertNotEqual(parts['v1'], sign('wrong-secret', parts['t'], body))
+        self.assertEqual({self.status(d) for d in deliveries}, {WebhookDelivery.DELIVERED})
+        self.assertEqual(deliver_pending(), 0)
+
+    def test_failures_back_off_then_dead_letter(self):
+        self.receiver.statuses = [500, 500]
+        delivery, = self.queue(1)
+        before = timezone.now()
+        with self.assertLogs('webhooks', 'WARNING'):
+            deliver_pending()
+        delivery.refresh_from_db()
+        self.assertEqual((delivery.status, delivery.attempts, delivery.last_status_code), ('pending', 1, 500))
+        self.assertGreaterEqual(delivery.next_attempt_at, before + timedelta(seconds=30))
+        # Not due yet
+        self.assertEqual(deliver_pending(), 0)
+
+        WebhookDelivery.objects.update(next_attempt_at=timezone.now())
+        with self.assertLogs('webhooks', 'WARNING'):
+            deliver_pending()
+        delivery.refresh_from_db()
+        self.assertEqual((delivery.status, delivery.attempts), (WebhookDelivery.FAILED, 2))
+        WebhookDelivery.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(deliver_pending(), 0)
+        self.assertEqual(len(self.receiver.requests), 2)
+
+    def test_failed_batch_holds_back_the_rest(self):
+        self.receiver.statuses = [503]
+        deliveries = self.queue(3)
+        with self.assertLogs('webhooks', 'WARNING'):
+            deliver_pending()
+        self.assertEqual(len(self.receiver.requests), 1)
+        attempts = [WebhookDelivery.objects.get(pk=d.pk).attempts for d in deliveries]
+        self.assertEqual(attempts, [1, 1, 0])
+        self.assertEqual({self.status(d) for d in deliveries}, {WebhookDelivery.PENDING})
+
+    def test_only_expired_leases_are_taken_back(self):
+        delivery, = self.queue(1)
+        ids, lease = claim_deliveries(10)
+        self.assertEqual(ids, [delivery.pk])
+
+        # Still leased, however long ago it was claimed
+        self.assertEqual(claim_deliveries(10)[0], [])
+        renewed = renew_lease(ids, lease)
+        self.assertIsNotNone(renewed)
+
+        WebhookDelivery.objects.update(lease_expires_at=timezone.now() - timedelta(seconds=1))
+        new_ids, _ = claim_deliveries(10)
+        self.assertEqual(new_ids, [delivery.pk])
+        # The first sender finds out before it sends anything
+        self.assertIsNone(renew_lease(ids, renewed))
+        self.assertEqual(self.status(delivery), WebhookDelivery.SENDING)
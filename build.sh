@@ -7,4 +7,5 @@ pip install -r requirements.txt
 
 python manage.py collectstatic --no-input
 python manage.py migrate
+python manage.py sweep_low_stock --no-alerts
 python create_superuser.py
@@ -191,7 +191,9 @@ export default function CustomerDetail() {
                   <div>
                     <p className="text-xs text-white/40 mb-1">Available Credit</p>
                     <p className="text-2xl font-bold text-emerald-400">
-                      ${(parseFloat(customer.credit_limit) - parseFloat(customer.total_spent)).toLocaleString()}
+                      {customer.available_credit === null
+                        ? 'No limit'
+                        : `$${parseFloat(customer.available_credit).toLocaleString()}`}
                     </p>
                   </div>
                   <div>
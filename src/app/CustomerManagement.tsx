@@ -27,6 +27,7 @@ import {
   Box,
   Warehouse
 } from 'lucide-react'
+import { ResponsiveContainer, BarChart, Bar, XAxis, Tooltip } from 'recharts'
 import { clsx, type ClassValue } from 'clsx'
 import { twMerge } from 'tailwind-merge'
 
@@ -82,6 +83,82 @@ function Modal({ isOpen, onClose, title, children }: { isOpen: boolean; onClose:
   )
 }
 
+// Cohort heatmap cell - brighter the more of the cohort came back that month
+function RetentionCell({ value }: { value: number }) {
+  return (
+    <td className="px-2 py-1 text-center text-xs" style={{ backgroundColor: `rgba(52, 211, 153, ${value / 100 * 0.6})` }}>
+      {value}%
+    </td>
+  )
+}
+
+function CustomerAnalyticsPanel() {
+  const [segments, setSegments] = useState<any[]>([])
+  const [cohorts, setCohorts] = useState<any[]>([])
+
+  useEffect(() => {
+    const fetchAnalytics = async () => {
+      try {
+        const [{ response: rfmRes, data: rfmData }, { response: cohortRes, data: cohortData }] = await Promise.all([
+          api.getCustomerSegments(),
+          api.getCustomerCohorts(12),
+        ])
+        if (rfmRes.ok) setSegments(rfmData.segments)
+        if (cohortRes.ok) setCohorts(cohortData.cohorts)
+      } catch (error) {
+        console.error('Error fetching customer analytics:', error)
+      }
+    }
+    fetchAnalytics()
+  }, [])
+
+  // Nothing computed yet (no orders, or the worker hasn't run)
+  if (!segments.some(s => s.customers > 0)) return null
+  const periods = Math.max(...cohorts.map(c => c.retention.length), 0)
+
+  return (
+    <div className="grid grid-cols-1 lg:grid-cols-2 gap-6 mb-8">
+      <GlassCard className="p-6">
+        <h3 className="text-lg font-bold mb-4">Customer Segments (RFM)</h3>
+        <div className="h-64">
+          <ResponsiveContainer width="100%" height="100%">
+            <BarChart data={segments}>
+              <XAxis dataKey="label" stroke="rgba(255,255,255,0.4)" fontSize={11} />
+              <Tooltip
+                contentStyle={{ backgroundColor: '#0F0F10', border: '1px solid rgba(255,255,255,0.1)', borderRadius: 12 }}
+                formatter={(value: number, name: string) => [name === 'revenue' ? `$${value.toLocaleString()}` : value, name]}
+              />
+              <Bar dataKey="customers" fill="#60a5fa" radius={[6, 6, 0, 0]} />
+            </BarChart>
+          </ResponsiveContainer>
+        </div>
+      </GlassCard>
+
+      <GlassCard className="p-6 overflow-x-auto">
+        <h3 className="text-lg font-bold mb-4">Cohort Retention</h3>
+        <table className="w-full">
+          <thead>
+            <tr className="text-xs text-white/40">
+              <th className="px-2 py-1 text-left">Cohort</th>
+              <th className="px-2 py-1 text-right">Customers</th>
+              {Array.from({ length: periods }, (_, i) => <th key={i} className="px-2 py-1">M{i}</th>)}
+            </tr>
+          </thead>
+          <tbody>
+            {cohorts.map(cohort => (
+              <tr key={cohort.cohort}>
+                <td className="px-2 py-1 text-xs text-white/60">{cohort.cohort}</td>
+                <td className="px-2 py-1 text-xs text-right">{cohort.size}</td>
+                {cohort.retention.map((value: number, i: number) => <RetentionCell key={i} value={value} />)}
+              </tr>
+            ))}
+          </tbody>
+        </table>
+      </GlassCard>
+    </div>
+  )
+}
+
 function CreateCustomerForm({ onClose, onSuccess }: { onClose: () => void; onSuccess: () => void }) {
   const [formData, setFormData] = useState({
     name: '',
@@ -358,6 +435,8 @@ export default function CustomerManagement() {
             </GlassCard>
           </div>
 
+          <CustomerAnalyticsPanel />
+
           {/* Search and Filters */}
           <GlassCard className="p-6 mb-6">
             <div className="flex flex-col md:flex-row gap-4">
@@ -56,6 +56,7 @@ import {
 import { clsx, type ClassValue } from 'clsx'
 import { twMerge } from 'tailwind-merge'
 import { SystemDock } from '../components/SystemDock'
+import { ResponsiveImage } from '../components/ResponsiveImage'
 import { api } from '../lib/api'
 
 // --- Utilities ---
@@ -79,6 +80,14 @@ function CreateOrderForm({ customers, products, onClose, onSuccess, onError }: {
   const [customerId, setCustomerId] = useState('')
   const [orderItems, setOrderItems] = useState<Array<{ product_id: number, quantity: number, unit_price: number }>>([{ product_id: 0, quantity: 1, unit_price: 0 }])
   const [isSubmitting, setIsSubmitting] = useState(false)
+  // Idempotency-Key for this submission - kept while retrying after a failure, so a
+  // request that timed out but actually went through doesn't create a second order
+  const submissionKey = useRef<string | null>(null)
+
+  // An edited form is a new submission
+  useEffect(() => {
+    submissionKey.current = null
+  }, [customerId, orderItems])
 
   const handleAddItem = () => {
     setOrderItems([...orderItems, { product_id: 0, quantity: 1, unit_price: 0 }])
@@ -112,6 +121,7 @@ function CreateOrderForm({ customers, products, onClose, onSuccess, onError }: {
 
     try {
       setIsSubmitting(true)
+      if (!submissionKey.current) submissionKey.current = crypto.randomUUID()
       const { response, data } = await api.createOrder({
         customer: parseInt(customerId),
         items: orderItems.map(item => ({
@@ -119,8 +129,10 @@ function CreateOrderForm({ customers, products, onClose, onSuccess, onError }: {
           quantity: item.quantity,
           unit_price: item.unit_price
         }))
-      })
+      }, submissionKey.current)
 
+      // Only a server error is worth retrying under the same key; anything else was a final answer
+      if (response.status < 500) submissionKey.current = null
       if (response.ok) {
         onSuccess()
       } else {
@@ -374,6 +386,12 @@ function RestockForm({ productId, product, warehouses, onClose, onSuccess, onErr
   const [quantity, setQuantity] = useState('10')
   const [warehouseId, setWarehouseId] = useState('')
   const [isSubmitting, setIsSubmitting] = useState(false)
+  // Idempotency-Key for this submission, reused if it has to be retried (see CreateOrderForm)
+  const submissionKey = useRef<string | null>(null)
+
+  useEffect(() => {
+    submissionKey.current = null
+  }, [productId, warehouseId, quantity])
 
   const handleSubmit = async () => {
     if (!productId || !warehouseId || !quantity || parseInt(quantity) <= 0) {
@@ -383,12 +401,15 @@ function RestockForm({ productId, product, warehouses, onClose, onSuccess, onErr
 
     try {
       setIsSubmitting(true)
+      if (!submissionKey.current) submissionKey.current = crypto.randomUUID()
       const { response, data } = await api.restockProduct(
         productId,
         parseInt(warehouseId),
-        parseInt(quantity)
+        parseInt(quantity),
+        submissionKey.current
       )
 
+      if (response.status < 500) submissionKey.current = null
       if (response.ok) {
         onSuccess()
       } else {
@@ -1059,8 +1080,10 @@ function InventoryGrid({ searchQuery, onRestockItem, products, isLoading, onAddP
               {/* Product Image Background */}
               {item.image ? (
                 <div className="absolute inset-0 overflow-hidden">
-                  <img 
-                    src={item.image} 
+                  <ResponsiveImage
+                    src={item.image}
+                    srcset={item.image_srcset}
+                    sizes="320px"
                     alt={item.name}
                     className="w-full h-full object-cover opacity-40 group-hover:opacity-60 group-hover:scale-110 transition-all duration-500"
                   />
@@ -1070,7 +1093,7 @@ function InventoryGrid({ searchQuery, onRestockItem, products, isLoading, onAddP
               <div className="relative z-10 flex justify-between items-start">
                 <div className="w-12 h-12 rounded-[1rem] bg-white/5 border border-white/10 flex items-center justify-center text-white/60 group-hover:text-white group-hover:bg-white/10 group-hover:border-white/20 transition-all duration-300">
                   {item.image ? (
-                    <img src={item.image} alt="" className="w-full h-full object-cover rounded-[1rem]" />
+                    <ResponsiveImage src={item.image} srcset={item.image_srcset} sizes="48px" alt="" className="w-full h-full object-cover rounded-[1rem]" />
                   ) : (
                     <Cpu size={24} />
                   )}
@@ -1357,8 +1380,10 @@ function SettingsView({ user, onLogout, onUserUpdated }: { user: any, onLogout:
               <div className="w-24 h-24 rounded-full bg-gradient-to-br from-purple-500 to-blue-500 p-[2px]">
                 <div className="w-full h-full rounded-full bg-black flex items-center justify-center overflow-hidden">
                   {!imgError && user?.avatar ? (
-                    <img 
-                      src={user.avatar} 
+                    <ResponsiveImage
+                      src={user.avatar}
+                      srcset={user.avatar_srcset}
+                      sizes="96px"
                       alt="Avatar" 
                       className="w-full h-full object-cover" 
                       onError={() => setImgError(true)}
@@ -2015,8 +2040,10 @@ export default function Dashboard() {
               onClick={() => setShowProfileMenu(!showProfileMenu)}
             >
               {!imgError && user?.avatar ? (
-                <img 
-                  src={user.avatar} 
+                <ResponsiveImage
+                  src={user.avatar}
+                  srcset={user.avatar_srcset}
+                  sizes="48px"
                   alt="Profile" 
                   className="w-full h-full object-cover" 
                   onError={() => setImgError(true)}
@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react'
 import { api } from '../lib/api'
 import { toast } from '../lib/toast'
+import { ResponsiveImage } from '../components/ResponsiveImage'
 import { useNavigate, useParams } from 'react-router-dom'
 import { motion } from 'framer-motion'
 import {
@@ -250,7 +251,7 @@ export default function OrderDetail() {
                   <div key={item.id} className="flex items-center gap-6 p-4 rounded-xl bg-white/[0.02] border border-white/5 hover:bg-white/[0.04] transition-colors">
                     <div className="w-20 h-20 rounded-xl bg-white/5 flex items-center justify-center text-white/20">
                       {item.product.image ? (
-                        <img src={item.product.image} className="w-full h-full object-cover rounded-xl" alt="" />
+                        <ResponsiveImage src={item.product.image} srcset={item.product.image_srcset} sizes="80px" className="w-full h-full object-cover rounded-xl" alt="" />
                       ) : (
                         <Package size={32} />
                       )}
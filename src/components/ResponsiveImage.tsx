@@ -0,0 +1,24 @@
+import React from 'react'
+
+// image_srcset / avatar_srcset from the API: resized copies of an upload, or null until they're generated
+export type Srcset = { webp: string; jpeg: string } | null | undefined
+
+interface ResponsiveImageProps extends React.ImgHTMLAttributes<HTMLImageElement> {
+  src: string
+  srcset?: Srcset
+  // Rendered width, e.g. "48px" - the browser picks the smallest variant that covers it
+  sizes: string
+}
+
+// Serves a WebP (or JPEG) variant sized for the slot instead of the original upload
+export function ResponsiveImage({ src, srcset, sizes, ...imgProps }: ResponsiveImageProps) {
+  if (!srcset) {
+    return <img src={src} loading="lazy" decoding="async" {...imgProps} />
+  }
+  return (
+    <picture className="contents">
+      <source type="image/webp" srcSet={srcset.webp} sizes={sizes} />
+      <img src={src} srcSet={srcset.jpeg} sizes={sizes} loading="lazy" decoding="async" {...imgProps} />
+    </picture>
+  )
+}
@@ -13,6 +13,10 @@ const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000/api'
 let accessToken: string | null = localStorage.getItem('access_token')
 let refreshToken: string | null = localStorage.getItem('refresh_token')
 
+// Last ETag and body we saw for each GET url
+// Lets the backend answer "304 Not Modified" instead of re-sending the same list
+const etagCache = new Map<string, { etag: string; body: string; contentType: string }>()
+
 // Save tokens when user logs in or registers
 export const setTokens = (access: string, refresh: string) => {
   accessToken = access
@@ -28,11 +32,38 @@ export const clearTokens = () => {
   refreshToken = null
   localStorage.removeItem('access_token')
   localStorage.removeItem('refresh_token')
+  // Cached responses belong to the old session
+  etagCache.clear()
 }
 
 // Get the current access token (useful for debugging)
 export const getAccessToken = () => accessToken
 
+// fetch() with automatic If-None-Match for GETs
+// A 304 is turned back into a normal 200 from our cached copy, so callers never see it
+async function fetchWithEtag(url: string, init: RequestInit & { headers: Record<string, string> }): Promise<Response> {
+  const isGet = !init.method || init.method.toUpperCase() === 'GET'
+  const cached = isGet ? etagCache.get(url) : undefined
+  const headers = cached ? { ...init.headers, 'If-None-Match': cached.etag } : init.headers
+
+  const response = await fetch(url, { ...init, headers })
+
+  if (response.status === 304 && cached) {
+    return new Response(cached.body, {
+      status: 200,
+      headers: { 'Content-Type': cached.contentType, 'ETag': cached.etag },
+    })
+  }
+
+  const etag = response.headers.get('ETag')
+  if (isGet && response.ok && etag) {
+    // Read a clone so the caller can still consume the original body
+    const body = await response.clone().text()
+    etagCache.set(url, { etag, body, contentType: response.headers.get('Content-Type') || 'application/json' })
+  }
+  return response
+}
+
 // This is the main function that makes all our API calls
 // It handles authentication, token refresh, and error handling automatically
 async function apiRequest(
@@ -54,7 +85,7 @@ async function apiRequest(
     headers['Authorization'] = `Bearer ${accessToken}`
   }
 
-  const response = await fetch(url, {
+  const response = await fetchWithEtag(url, {
     ...options,
     headers,
   })
@@ -70,7 +101,7 @@ async function apiRequest(
           ...headers,
           'Authorization': `Bearer ${accessToken}`
         }
-        return fetch(url, {
+        return fetchWithEtag(url, {
           ...options,
           headers: newHeaders,
         })
@@ -213,18 +244,27 @@ export const api = {
     return { response, data: await response.json() }
   },
 
+  // Delivered/cancelled orders moved out of /orders/ once they're old - read-only
+  async getArchivedOrders(page = 1) {
+    const response = await apiRequest(`/archive/orders/?page=${page}`)
+    return { response, data: await response.json() }
+  },
+
   async getOrder(id: number) {
     const response = await apiRequest(`/orders/${id}/`)
     return { response, data: await response.json() }
   },
 
+  // Make one idempotencyKey per form submission and send the same one again when
+  // retrying it - the backend then returns the order it already created instead of making a second one
   async createOrder(data: {
     customer: number
     items: Array<{ product_id: number; quantity: number; unit_price: number }>
     status?: string
-  }) {
+  }, idempotencyKey: string) {
     const response = await apiRequest('/orders/', {
       method: 'POST',
+      headers: { 'Idempotency-Key': idempotencyKey },
       body: JSON.stringify(data),
     })
     return { response, data: await response.json() }
@@ -293,9 +333,11 @@ export const api = {
     return { response, data: await response.json() }
   },
 
-  async restockProduct(id: number, warehouseId: number, quantity: number) {
+  // Same as createOrder: one idempotencyKey per submission, reused for its retries
+  async restockProduct(id: number, warehouseId: number, quantity: number, idempotencyKey: string) {
     const response = await apiRequest(`/inventory/products/${id}/restock/`, {
       method: 'POST',
+      headers: { 'Idempotency-Key': idempotencyKey },
       body: JSON.stringify({ warehouse_id: warehouseId, quantity }),
     })
     return { response, data: await response.json() }
@@ -314,6 +356,18 @@ export const api = {
     return { response, data: await response.json() }
   },
 
+  // RFM segments and cohort retention, refreshed in the background by the job worker
+  async getCustomerSegments(segment = '') {
+    const query = segment ? `?segment=${encodeURIComponent(segment)}` : ''
+    const response = await apiRequest(`/customers/rfm/${query}`)
+    return { response, data: await response.json() }
+  },
+
+  async getCustomerCohorts(months = 12) {
+    const response = await apiRequest(`/customers/cohorts/?months=${months}`)
+    return { response, data: await response.json() }
+  },
+
   async getCustomer(id: number) {
     const response = await apiRequest(`/customers/${id}/`)
     return { response, data: await response.json() }